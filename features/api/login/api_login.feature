@@ -0,0 +1,27 @@
+@api_stub
+Feature: Autenticación en la API de login
+
+  Como consumidor de los servicios de login
+  Quiero autenticarme y cerrar sesión a través de la API
+  Para acceder a los recursos protegidos con un token válido
+
+  @api
+  Scenario: Login exitoso con credenciales válidas
+    When inicio sesión en la API con el usuario "admin" y clave "admin123"
+    Then la API debería retornar un token de acceso válido
+
+  @api
+  Scenario: Login rechazado con credenciales inválidas
+    When inicio sesión en la API con el usuario "admin" y clave "clave_incorrecta"
+    Then la API no debería retornar un token de acceso
+
+  @api
+  Scenario: Cierre de sesión con un token válido
+    Given que tengo un token de acceso para el usuario "admin" con clave "admin123"
+    When cierro la sesión en la API
+    Then la API debería confirmar el cierre de sesión
+
+  @api
+  Scenario: Logins concurrentes de múltiples usuarios
+    When 20 usuarios distintos inician sesión en la API de forma concurrente
+    Then todos los usuarios deberían obtener un token de acceso válido
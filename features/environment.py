@@ -1,27 +1,64 @@
 import sys
 import os
+import time
+from collections import Counter
+from functools import partial
 from behave import *
+from behave.model_core import Status
 
 # Importaciones necesarias (todas deben ser absolutas)
 
-from src.utils.logger import get_logger, setup_logging
+from src.utils.logger import get_logger, setup_logging, shutdown_logging
+from src.utils.log_context import set_log_context, clear_log_context, lazy
 from src.config.config_reader import ConfigReader
 from src.config.webdriver_factory import WebDriverFactory
 from src.config.grid_manager import GridManager
+from src.config.driver_lifecycle import DriverLifecycle
 from src.utils.definitions import PROJECT_ROOT
 from selenium.common.exceptions import WebDriverException
 
 # No se usa directamente aquí, pero es buena práctica mantenerla si se usa en otro lugar
 
-from src.utils.screenshots import take_screenshot
-from src.utils.selenium_utils import SeleniumUtils
-from src.actions.web.orangehrm_actions import OrangeHRMAction
+from src.utils.screenshots import take_screenshot, configure_screenshot_store
+from src.utils.navigation_manager import navigation_totals
+
+# Los módulos opcionales (watchdog de pasos, monitor de recursos con psutil, métricas web, servidor API local,
+# cassettes, flight recorder, timeouts adaptativos) se importan en el hook o la rama que los usa, solo si están
+# activos. SeleniumUtils y los Page Objects/Actions web se importan en before_scenario, solo para escenarios @web,
+# y las acciones API solo para escenarios @api: no se necesitan en ejecuciones de otro tipo ni en --dry-run.
+
+# Prefijo del tag que fija el presupuesto de un escenario (step_watchdog.BUDGET_TAG_PREFIX)
+_STEP_BUDGET_TAG = 'step_timeout:'
+
+# Tag de los escenarios que solo corren contra el servidor API local (api_stub_server)
+_STUB_TAG = 'api_stub'
 
 logger = get_logger(__name__)
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
 
+def _create_web_driver(context):
+    """Crea un WebDriver con la configuración del entorno (lo invoca DriverLifecycle cuando necesita uno nuevo)."""
+
+    driver = context.webdriver_factory.get_webdriver(
+        browser_name=context.browser_name,
+        headless=context.is_headless,
+        use_manual_drivers=context.config_env.get('use_manual_drivers', True),
+        manual_drivers_path=context.config_env.get('manual_drivers_path', ''),
+        # Tamaño de ventana y timeouts viajan en la creación de la sesión (sin comandos adicionales)
+        window_size=context.config_env.get('window_size', 'maximized'),
+        implicit_wait=context.implicit_wait,
+        page_load_timeout=context.config_env.get('page_load_timeout', 60),
+        page_load_strategy=context.config_env.get('page_load_strategy', 'normal')
+    )
+
+    if driver:
+        context.logger.info(f"Navegador iniciado: {context.browser_name}")
+
+    return driver
+
+
 def before_all(context):
     """Se ejecuta una vez antes de todas las suites de features para configurar el entorno global."""
     # Asigna la ruta raíz del proyecto al contexto
@@ -61,7 +98,7 @@ def before_all(context):
     # con todos los valores ya convertidos a sus tipos correctos (int, bool, str).
 
     context.config_env = context.config_reader.get_environment_config(context.environment)
-    context.logger.info(f"Configuración del entorno '{context.environment}': {context.config_env}")
+    context.logger.info("Configuración del entorno '%s': %s", context.environment, lazy(context.config_env))
 
     # --- 4. Asignar valores comunes directamente al contexto para facilitar el acceso ---
     # Accede a los valores directamente del diccionario `context.config_env`
@@ -75,6 +112,73 @@ def before_all(context):
     context.screenshot_on_fail = context.config_env.get('screenshot_on_fail', True)  # Asegúrate de que sea booleano
     context.logger.info(f"Navegador configurado: '{context.browser_name}' (Headless: {context.is_headless})")
 
+    context.screenshot_store = configure_screenshot_store(
+        image_format=context.config_env.get('screenshot_format', 'webp'),
+        quality=context.config_env.get('screenshot_quality', 70),
+        max_age_days=context.config_env.get('screenshot_retention_days', 7),
+        max_total_mb=context.config_env.get('screenshot_max_mb', 500)
+    )
+
+    # Timeouts aprendidos por localizador para las esperas de SeleniumUtils (ver adaptive_timeouts.py)
+    context.adaptive_timeouts = None
+
+    if context.config_env.get('adaptive_timeouts', False):
+        from src.utils.adaptive_timeouts import configure_adaptive_timeouts
+        context.adaptive_timeouts = configure_adaptive_timeouts(
+            store_path=context.config_env.get('adaptive_timeout_file') or None,
+            pct=context.config_env.get('adaptive_timeout_percentile', 95.0),
+            factor=context.config_env.get('adaptive_timeout_factor', 1.5),
+            margin=context.config_env.get('adaptive_timeout_margin', 0.5),
+            min_timeout=context.config_env.get('adaptive_timeout_min', 1.0),
+            max_timeout=context.config_env.get('adaptive_timeout_max', 30.0),
+            min_samples=context.config_env.get('adaptive_timeout_min_samples', 5)
+        )
+
+    # Watchdog de pasos: aborta los pasos colgados y descarta su driver. Desactivado por defecto; el hilo
+    # se inicia en before_step con el primer paso que tenga presupuesto (step_timeout, tags o @step_timeout:N)
+    context.step_watchdog = None
+    context.step_timeout = context.config_env.get('step_timeout', 0)
+    context.step_timeout_tags = {}
+
+    if context.config_env.get('step_timeout_tags', ''):
+        from src.utils.step_watchdog import parse_tag_budgets
+        context.step_timeout_tags = parse_tag_budgets(context.config_env.get('step_timeout_tags', ''))
+
+    # Monitor de procesos del navegador/driver (RSS, CPU, reciclaje por memoria y limpieza de huérfanos)
+    context.resource_monitor = None
+
+    if context.config_env.get('resource_monitor', False):
+        from src.utils.resource_monitor import configure_resource_monitor
+        context.resource_monitor = configure_resource_monitor(
+            max_rss_mb=context.config_env.get('resource_max_rss_mb', 1500)
+        )
+
+    # Métricas de rendimiento de la aplicación (Navigation/Resource Timing, paint, LCP) por navegación y paso
+    context.web_metrics_recorder = None
+
+    if context.config_env.get('web_metrics', False):
+        from src.utils.web_metrics import configure_web_metrics
+        context.web_metrics_recorder = configure_web_metrics(context.config_env.get('web_metrics_dir') or None)
+
+    # --- Servidor API local (opcional): los escenarios @api apuntan a él en lugar de api_base_url ---
+
+    context.stub_server = None
+
+    if context.config_env.get('api_stub_server', False):
+        from src.utils.stub_api_server import StubApiServer
+        context.stub_server = StubApiServer(
+            port=context.config_env.get('api_stub_port', 0),
+            latency_ms=context.config_env.get('api_stub_latency_ms', 0),
+            jitter_ms=context.config_env.get('api_stub_jitter_ms', 0),
+            error_rate=context.config_env.get('api_stub_error_rate', 0.0),
+            seed=context.config_env.get('api_stub_seed', 42),
+            token_ttl=context.config_env.get('api_token_ttl', 300)
+        ).start()
+        context.logger.warning(f"api_stub_server activo: los escenarios @api usan el servidor local "
+                               f"{context.stub_server.url} en lugar de api_base_url "
+                               f"({context.api_base_url or 'no configurada'}).")
+        context.api_base_url = context.stub_server.url
+
     # --- 5. Configurar GridManager y WebDriverFactory ---
 
     context.grid_manager = GridManager(context.config_reader)  # Pasamos el config_reader ya inicializado
@@ -83,6 +187,12 @@ def before_all(context):
     context.webdriver_factory = WebDriverFactory(grid_manager=context.grid_manager)
     context.logger.info("WebDriverFactory inicializada.")
 
+    # Alcance del navegador por escenario, feature o worker (tags @driver_scope:..., ver driver_lifecycle.py)
+    context.driver_lifecycle = DriverLifecycle(
+        create_driver=partial(_create_web_driver, context),
+        default_scope=context.config_env.get('driver_scope', 'scenario')
+    )
+
     if context.config_env.get('grid_active', False):  # Usa .get() para booleanos
         context.logger.info(f"Configurado para usar Selenium Grid en: {context.config_env['grid_hub_url']}")
 
@@ -93,177 +203,414 @@ def before_all(context):
         context.logger.info("Selenium Grid no está configurado o no está activo para el entorno actual.")
 
 
+def before_feature(context, feature):
+    """Se ejecuta antes de cada feature. Registra la feature en el contexto de correlación de logs."""
+
+    set_log_context(feature=feature.name)
+
+    context.feature_name = feature.name
+
+
+def _skip_without_stub(context, scenario) -> bool:
+    """
+    Los escenarios @api_stub están escritos contra el servidor API local (sus usuarios y contratos): sin
+    api_stub_server activo se omiten en lugar de fallar contra un api_base_url que no los conoce.
+    """
+
+    if _STUB_TAG not in scenario.effective_tags or context.stub_server is not None:
+        return False
+
+    scenario.skip("Requiere el servidor API local: ENVIRONMENT=stub o AUTOMATION_API_STUB_SERVER=true")
+
+    return True
+
+
+def _prepare_web_driver(context, scenario, reused: bool):
+    """Navegación inicial, métricas web, conteo de comandos del setup y flight recorder del driver del escenario."""
+
+    # Los contadores son del driver: con @driver_scope:feature/worker acumulan los escenarios anteriores, así que
+    # se toma una foto al inicio y al final se registra solo la diferencia
+    command_counter = getattr(context.driver, 'command_counter', None)
+
+    if command_counter is not None:
+        command_counter.mark('scenario')
+
+    # --- Navegación (deduplicada: los pasos que vuelven a pedir la misma URL no recargan la página) ---
+    if getattr(context.driver, 'navigation', None) is None:
+        from src.utils.navigation_manager import NavigationManager
+        context.driver.navigation = NavigationManager(context.driver)
+
+    context.navigation_stats_start = Counter(context.driver.navigation.stats)
+
+    try:
+        context.logger.info(f"Navegando a URL: {context.base_url}")
+        context.driver.navigation.navigate(context.base_url)
+    except WebDriverException as e:
+        context.logger.critical(f"Error de conexión al navegar a {context.base_url}. El sitio puede estar caído.")
+        raise e # Re-lanzar para que el bloque externo lo maneje, pero ya con log claro
+
+    if context.web_metrics_recorder is not None:
+        if getattr(context.driver, 'web_metrics', None) is None:
+            from src.utils.web_metrics import WebMetricsCollector
+            context.driver.web_metrics = WebMetricsCollector(context.driver, context.web_metrics_recorder)
+        context.driver.web_metrics.collect(f"navegación: {context.base_url}", scenario=scenario.name)
+
+    if command_counter is not None:
+        context.logger.info(f"Comandos WebDriver de setup (incluida la primera navegación): "
+                            f"{command_counter.since('scenario')}"
+                            f"{' (driver reutilizado)' if reused else ''}")
+        command_counter.mark('setup')
+
+    # --- Flight recorder (capturas en memoria, volcadas solo si el escenario falla) ---
+    if context.config_env.get('flight_recorder', False) and \
+            getattr(context.driver, 'flight_recorder', None) is None:
+        from src.utils.flight_recorder import FlightRecorder
+        context.driver.flight_recorder = FlightRecorder(
+            capacity=context.config_env.get('flight_recorder_size', 20),
+            mode=context.config_env.get('flight_recorder_mode', 'page')
+        )
+
+
+def _start_web_scenario(context, scenario):
+
+    context.logger.info(f"Escenario con tag '@web'. Inicializando WebDriver para: {context.browser_name}")
+
+    try:
+        # Driver nuevo o compartido según el alcance del escenario (@driver_scope:scenario|feature|worker)
+        context.driver, context.driver_scope, reused = context.driver_lifecycle.acquire(scenario)
+
+        if not context.driver:
+            raise WebDriverException(
+                "WebDriver no pudo ser inicializado por WebDriverFactory. get_webdriver retornó None.")
+
+        _prepare_web_driver(context, scenario, reused)
+
+        # --- Inicialización de Page Objects ---
+        from src.utils.selenium_utils import SeleniumUtils
+        from src.actions.web.orangehrm_actions import OrangeHRMAction
+
+        context.selenium_utils = SeleniumUtils(context.driver, context.wait_timeout)
+        context.orangehrm_action = OrangeHRMAction(context.driver)
+        context.current_scenario_type = 'web'
+
+    except WebDriverException as e:
+        context.logger.critical(f"Fallo crítico en setup WEB: {e}")
+        scenario.skip(f"Setup Fallido: {e}")
+        # Un driver que falló en el setup no se reutiliza
+        context.driver_lifecycle.release(context.driver, context.driver_scope, failed=True)
+        context.driver = None  # Asegurarse de que el driver sea None si falla
+
+    except Exception as e:  # Captura cualquier otra excepción inesperada
+
+        context.logger.critical(f"Error genérico al inicializar WebDriver para {context.browser_name}: {e}",
+                                exc_info=True)
+
+        scenario.skip(f"Fallo inesperado al inicializar WebDriver: {e}")
+        context.driver_lifecycle.release(context.driver, context.driver_scope, failed=True)
+        context.driver = None
+
+
+def _start_api_scenario(context, scenario):
+
+    if _skip_without_stub(context, scenario):
+        return
+
+    context.logger.info(
+        f"Escenario con tag '@api'. Inicializando cliente API para el entorno: {context.environment}")
+
+    try:
+
+        # Cassette HTTP (record/replay) por escenario, según api_cassette_mode
+        cassette_mode = context.config_env.get('api_cassette_mode', 'off')
+
+        if cassette_mode != 'off':
+            from src.utils.api_cassette import activate_cassette, cassette_path
+            context.cassette = activate_cassette(
+                cassette_path(context.feature_name, scenario.name,
+                              context.config_env.get('api_cassette_dir') or None),
+                cassette_mode)
+
+        # Pasa el entorno al constructor de tus acciones API
+        from src.actions.api.login.api_login_actions import LoginActions
+        from src.actions.api.login.async_api_login_actions import AsyncLoginActions
+
+        context.api_login_actions = LoginActions(env=context.environment, base_url=context.api_base_url)
+        context.api_client = context.api_login_actions.api_utils
+        # Variante async para pasos que lanzan lotes de peticiones concurrentes (ver run_batch)
+        context.async_api_login_actions = AsyncLoginActions(env=context.environment,
+                                                            base_url=context.api_base_url)
+        context.current_scenario_type = 'api'
+        context.logger.info(f"Cliente API (LoginActions) inicializado para entorno '{context.environment}'.")
+
+    except Exception as e:
+
+        context.logger.critical(f"Error al inicializar cliente API: {e}", exc_info=True)
+        scenario.skip(f"Fallo al inicializar cliente API: {e}")
+        context.api_client = None  # Asegúrate de que sea None si falla
+
+
 def before_scenario(context, scenario):
     """
     Se ejecuta antes de cada escenario.
     Inicializa WebDriver o cliente API dependiendo de los tags del escenario.
     """
 
+    set_log_context(scenario=scenario.name, scenario_id=str(scenario.location), step=None, step_id=None)
+
     context.logger.info(f"Comenzando escenario: '{scenario.name}'")
     context.driver = None  # Inicializa a None para cada escenario
     context.api_client = None  # Inicializa a None para cada escenario
     context.current_scenario_type = 'none'  # Resetea el tipo de escenario
+    context.leased_accounts = []  # Cuentas tomadas de pools de datos (se devuelven en after_scenario)
+    context.driver_scope = 'scenario'
 
     if 'web' in scenario.tags:
+        _start_web_scenario(context, scenario)
 
-        context.logger.info(f"Escenario con tag '@web'. Inicializando WebDriver para: {context.browser_name}")
+    elif 'api' in scenario.tags:
+        _start_api_scenario(context, scenario)
 
-        try:
-            context.driver = context.webdriver_factory.get_webdriver(
-                browser_name=context.browser_name,
-                headless=context.is_headless,
-                use_manual_drivers=context.config_env.get('use_manual_drivers', True),
-                manual_drivers_path=context.config_env.get('manual_drivers_path', '')
-            )
+    else:
 
-            if not context.driver:
-                raise WebDriverException(
-                    "WebDriver no pudo ser inicializado por WebDriverFactory. get_webdriver retornó None.")
+        context.logger.info("El escenario no tiene tags @web o @api. No se inicializa WebDriver ni cliente API.")
+        context.current_scenario_type = 'none'
 
-            # --- Configuración del Navegador ---
-            context.driver.maximize_window()
-            # Es buena práctica configurar el implicit wait ANTES de navegar
-            context.driver.implicitly_wait(context.implicit_wait)            
-            context.logger.info(f"Navegador iniciado: {context.browser_name}")
 
-            # --- Navegación ---
-            try:
-                context.logger.info(f"Navegando a URL: {context.base_url}")
-                context.driver.get(context.base_url)
-            except WebDriverException as e:
-                context.logger.critical(f"Error de conexión al navegar a {context.base_url}. El sitio puede estar caído.")
-                raise e # Re-lanzar para que el bloque externo lo maneje, pero ya con log claro
+def _arm_step_watchdog(context, step):
+    """Arma el watchdog con el presupuesto del paso (step_timeout, tags o @step_timeout:N); sin ninguno, nada."""
 
-            # --- Inicialización de Page Objects ---
-            context.selenium_utils = SeleniumUtils(context.driver, context.wait_timeout)
-            context.orangehrm_action = OrangeHRMAction(context.driver)
-            context.current_scenario_type = 'web'
+    tags = context.scenario.effective_tags
 
-        except WebDriverException as e:
-            context.logger.critical(f"Fallo crítico en setup WEB: {e}")
-            scenario.skip(f"Setup Fallido: {e}")
-            context.driver = None  # Asegurarse de que el driver sea None si falla
+    if not (getattr(context, 'step_timeout', 0) > 0 or getattr(context, 'step_timeout_tags', None) or
+            any(tag.startswith(_STEP_BUDGET_TAG) for tag in tags)):
+        return
 
-        except Exception as e:  # Captura cualquier otra excepción inesperada
+    from src.utils.step_watchdog import StepWatchdog, step_budget
 
-            context.logger.critical(f"Error genérico al inicializar WebDriver para {context.browser_name}: {e}",
-                                    exc_info=True)
+    budget = step_budget(context.scenario, getattr(context, 'step_timeout', 0),
+                         getattr(context, 'step_timeout_tags', {}))
 
-            scenario.skip(f"Fallo inesperado al inicializar WebDriver: {e}")
-            context.driver = None
+    if budget <= 0:
+        return
 
+    if getattr(context, 'step_watchdog', None) is None:
+        context.step_watchdog = StepWatchdog().start()
 
+    context.step_watchdog.arm(
+        f"{step.keyword} {step.name}",
+        budget,
+        driver=getattr(context, 'driver', None),
+        scenario_name=context.scenario.name
+    )
 
 
-    elif 'api' in scenario.tags:
+def before_step(context, step):
+    """Se ejecuta antes de cada paso. Registra el paso en el contexto de correlación de logs."""
 
-        context.logger.info(
-            f"Escenario con tag '@api'. Inicializando cliente API para el entorno: {context.environment}")
+    set_log_context(step=f"{step.keyword} {step.name}", step_id=str(step.location))
 
-        try:
+    # Marca de "tiempo hasta el primer paso" para el benchmark de arranque (src/utils/startup_benchmark.py)
+    probe_file = os.environ.get('STARTUP_PROBE_FILE')
 
-            # Pasa el entorno al constructor de tus acciones API
+    if probe_file and not os.path.exists(probe_file):
+        with open(probe_file, 'w', encoding='utf-8') as probe:
+            probe.write(str(time.time()))
 
-            # context.api_login_actions = ApiLoginActions(env=context.environment)
-            context.current_scenario_type = 'api'
-            context.logger.info(f"Cliente API (LoginActions) inicializado para entorno '{context.environment}'.")
+    # Presupuesto del paso (step_timeout, step_timeout_tags o @step_timeout:N); sin ninguno no hay watchdog
+    _arm_step_watchdog(context, step)
 
-        except Exception as e:
 
-            context.logger.critical(f"Error al inicializar cliente API: {e}", exc_info=True)
-            scenario.skip(f"Fallo al inicializar cliente API: {e}")
-            context.api_client = None  # Asegúrate de que sea None si falla
+def after_step(context, step):
+    """Se ejecuta después de cada paso. Si el watchdog abortó el paso, lo marca como fallido."""
 
-    else:
+    # Se desarma antes de cualquier otro trabajo del hook: el presupuesto cubre solo el paso
+    if getattr(context, 'step_watchdog', None) is not None:
 
-        context.logger.info("El escenario no tiene tags @web o @api. No se inicializa WebDriver ni cliente API.")
-        context.current_scenario_type = 'none'
+        tripped = context.step_watchdog.disarm()
 
+        if tripped and step.status != Status.failed:
+            # El paso terminó (con o sin error propio) después de vencer el presupuesto: cuenta como fallido
+            step.status = Status.failed
+            step.error_message = tripped
 
-def after_scenario(context, scenario):
-    """
-    Se ejecuta después de cada escenario.
-    Cierra el WebDriver y maneja capturas de pantalla en caso de fallo para pruebas web.
-    """
+    web_metrics = getattr(getattr(context, 'driver', None), 'web_metrics', None)
 
-    context.logger.info(f"Finalizando escenario: '{scenario.name}'")
+    if web_metrics is not None and not getattr(context.driver, 'watchdog_killed', False):
+        web_metrics.collect(f"{step.keyword} {step.name}", step_ms=step.duration * 1000,
+                            scenario=context.scenario.name)
+
+    clear_log_context('step', 'step_id')
 
-    if context.current_scenario_type == 'web':  # Usa la variable que seteamos en before_scenario
 
-        if scenario.status == 'failed' and context.config_env.get('screenshot_on_fail', False):
+def _screenshot_on_failure(context, scenario):
 
-            context.logger.error(f"El escenario WEB '{scenario.name}' ha FALLADO.")
+    if scenario.status != 'failed' or not context.config_env.get('screenshot_on_fail', False):
+        return
 
-            try:
+    context.logger.error(f"El escenario WEB '{scenario.name}' ha FALLADO.")
 
-                screenshot_path = take_screenshot(context.driver, scenario.name)
-                context.logger.error(f"Captura de pantalla tomada en: {screenshot_path}")
+    try:
 
-            except Exception as e:
+        screenshot_path = take_screenshot(context.driver, scenario.name)
+        context.logger.error(f"Captura de pantalla tomada en: {screenshot_path}")
 
-                context.logger.warning(f"No se pudo tomar captura de pantalla para '{scenario.name}': {e}",
-                                       exc_info=True)
+    except Exception as e:
 
-                # Cierre del WebDriver
+        context.logger.warning(f"No se pudo tomar captura de pantalla para '{scenario.name}': {e}",
+                               exc_info=True)
 
-        if hasattr(context, 'driver') and context.driver:
 
-            try:
+def _log_driver_activity(context):
+    """Comandos WebDriver y navegaciones del escenario."""
 
-                context.driver.quit()
-                context.logger.info(f"WebDriver cerrado para el escenario '{scenario.name}'.")
+    command_counter = getattr(context.driver, 'command_counter', None)
 
-            except WebDriverException as e:
+    if command_counter is not None:
+        context.logger.info(f"Comandos WebDriver del escenario (sin contar el setup): "
+                            f"{command_counter.since('setup')}")
 
-                context.logger.warning(f"Error al intentar cerrar WebDriver para '{scenario.name}': {e}", exc_info=True)
+    navigation = getattr(context.driver, 'navigation', None)
 
-            except Exception as e:
+    if navigation is not None:
+        stats = navigation.stats - getattr(context, 'navigation_stats_start', Counter())
+        context.logger.info(f"Navegaciones del escenario: {stats['loads']} cargas, {stats['skipped']} omitidas")
 
-                context.logger.warning(f"Error inesperado al cerrar WebDriver para '{scenario.name}': {e}",
-                                       exc_info=True)
 
-            finally:
+def _finish_flight_recorder(context, scenario):
 
-                # Limpiar referencias del contexto
+    recorder = getattr(context.driver, 'flight_recorder', None)
 
-                context.driver = None
+    if recorder is None:
+        return
 
-                context.selenium_utils = None
+    if scenario.status == 'failed':
+        strip_dir = recorder.flush(scenario.name)
+        context.logger.error(f"Flight recorder volcado para '{scenario.name}' en: {strip_dir}")
+    else:
+        recorder.clear()
+
+
+def _finish_resource_monitor(context) -> bool:
+    """Registra el consumo de la sesión. Retorna True si el navegador debe reciclarse por memoria."""
+
+    resource_monitor = getattr(context, 'resource_monitor', None)
+
+    if resource_monitor is None:
+        return False
+
+    usage = resource_monitor.sample(context.driver)
+
+    if usage:
+        context.logger.info(f"Recursos de la sesión: RSS {usage['rss_mb']} MB "
+                            f"(pico {usage['peak_rss_mb']} MB), CPU {usage['cpu_s']}s, "
+                            f"{usage['processes']} procesos")
+
+    recycle = resource_monitor.should_recycle(context.driver)
+
+    if recycle:
+        context.logger.warning(f"La sesión supera resource_max_rss_mb "
+                               f"({resource_monitor.max_rss_mb} MB): se recicla el navegador.")
+
+    return recycle
 
-                context.orangehrm_action = None
 
+def _release_web_driver(context, scenario, recycle: bool):
+
+    try:
+
+        # Cierra el driver (alcance 'scenario', escenario fallido o reciclado) o lo limpia para el siguiente
+        closed = context.driver_lifecycle.release(context.driver, context.driver_scope,
+                                                  failed=scenario.status == 'failed', recycle=recycle)
+
+        # Al cerrarse, DriverLifecycle también termina los procesos huérfanos de la sesión
+        if closed:
+            context.logger.info(f"WebDriver cerrado para el escenario '{scenario.name}'.")
         else:
+            context.logger.info(f"WebDriver de alcance '{context.driver_scope}' limpiado para el "
+                                f"siguiente escenario.")
 
-            context.logger.debug(
-                f"No hay WebDriver para cerrar para el escenario '{scenario.name}' (posiblemente no se inicializó o falló la inicialización).")
+    except Exception as e:
 
+        context.logger.warning(f"Error inesperado al liberar WebDriver para '{scenario.name}': {e}",
+                               exc_info=True)
 
+    finally:
 
+        # Limpiar referencias del contexto
 
-    elif context.current_scenario_type == 'api':
+        context.driver = None
+
+        context.selenium_utils = None
+
+        context.orangehrm_action = None
+
+
+def _finish_web_scenario(context, scenario):
+
+    if not context.driver:
+        context.logger.debug(f"No hay WebDriver para cerrar para el escenario '{scenario.name}' "
+                             f"(posiblemente no se inicializó o falló la inicialización).")
+        return
 
-        context.logger.info(f"Escenario API '{scenario.name}' finalizado. No requiere cierre de WebDriver.")
+    _screenshot_on_failure(context, scenario)
+    _log_driver_activity(context)
+    _finish_flight_recorder(context, scenario)
+    _release_web_driver(context, scenario, recycle=_finish_resource_monitor(context))
 
-        # Aquí puedes añadir cualquier limpieza específica para el cliente API si es necesario
-        # context.api_client = None # Si es un objeto grande que necesita ser liberado explícitamente
-        # Limpieza de referencias API si es necesario (generalmente no es tan crítico como WebDriver)
 
-        if hasattr(context, 'api_login_actions'):
-            context.api_login_actions = None
+def _finish_api_scenario(context, scenario):
 
-            # Si tu api_client fuera un objeto con recursos a cerrar, lo harías aquí
+    context.logger.info(f"Escenario API '{scenario.name}' finalizado. No requiere cierre de WebDriver.")
 
-        context.api_client = None  # Para asegurarte de que quede en None si se asignó previamente
+    # Limpieza de referencias API (generalmente no es tan crítico como WebDriver)
 
+    if hasattr(context, 'api_login_actions'):
+        context.api_login_actions = None
+
+    if getattr(context, 'async_api_login_actions', None) is not None:
+        context.async_api_login_actions.close()
+        context.async_api_login_actions = None
+
+    context.api_client = None  # Para asegurarte de que quede en None si se asignó previamente
+
+    # Guarda el cassette si se estaba grabando y acumula los misses de replay
+    from src.utils.api_cassette import deactivate_cassette
+    deactivate_cassette()
+    context.cassette = None
+
+
+def _release_leased_accounts(context):
+    """Devuelve a sus pools las cuentas prestadas durante el escenario."""
+
+    for pool, account in getattr(context, 'leased_accounts', []):
+        try:
+            pool.release(account)
+        except Exception as e:
+            context.logger.warning(f"No se pudo devolver la cuenta '{account.get('username')}' al pool: {e}")
+
+    context.leased_accounts = []
+
+
+def after_scenario(context, scenario):
+    """
+    Se ejecuta después de cada escenario.
+    Cierra el WebDriver y maneja capturas de pantalla en caso de fallo para pruebas web.
+    """
+
+    context.logger.info(f"Finalizando escenario: '{scenario.name}'")
 
+    if context.current_scenario_type == 'web':  # Usa la variable que seteamos en before_scenario
+        _finish_web_scenario(context, scenario)
 
+    elif context.current_scenario_type == 'api':
+        _finish_api_scenario(context, scenario)
 
     else:  # Esto cubre 'none' o escenarios sin tags específicos
 
         context.logger.debug(
             f"El escenario '{scenario.name}' no tiene tags @web o @api. No se requiere limpieza especial.")
 
-        # Registro final del escenario
+    # Registro final del escenario
 
     context.logger.info(f"Escenario '{scenario.name}' finalizado con estado: {scenario.status}")
     context.logger.info(f"Entorno de ejecución: {context.environment}")
@@ -277,8 +624,12 @@ def after_scenario(context, scenario):
 
         context.logger.info(f"URL Base API: {context.api_base_url}")
 
+    _release_leased_accounts(context)
+
     context.logger.info("-" * 50)
 
+    clear_log_context('scenario', 'scenario_id', 'step', 'step_id')
+
 
 def after_feature(context, feature):
     """Se ejecuta después de cada feature."""
@@ -288,6 +639,71 @@ def after_feature(context, feature):
     current_logger = context.logger if hasattr(context, 'logger') else logger
     current_logger.info(f"Feature '{feature.name}' finalizada.")
 
+    # Cierra el navegador compartido por los escenarios de la feature (@driver_scope:feature)
+    if getattr(context, 'driver_lifecycle', None) is not None:
+        context.driver_lifecycle.end_scope('feature')
+
+    clear_log_context()
+
+
+def _finish_run_resource_monitor(context, current_logger):
+
+    resource_monitor = getattr(context, 'resource_monitor', None)
+
+    if resource_monitor is None:
+        return
+
+    resource_monitor.reap_all()
+
+    for session_id, usage in resource_monitor.summary().items():
+        current_logger.info(f"Sesión {session_id}: pico RSS {usage['peak_rss_mb']} MB, CPU {usage['cpu_s']}s")
+
+
+def _save_run_state(context, current_logger):
+    """Retención de capturas y timeouts aprendidos: un fallo aquí no debe impedir el resto del cierre."""
+
+    if getattr(context, 'screenshot_store', None) is not None:
+        try:
+            context.screenshot_store.apply_retention()
+        except Exception as e:
+            current_logger.warning(f"No se pudo aplicar la retención de capturas: {e}", exc_info=True)
+
+    if getattr(context, 'adaptive_timeouts', None) is not None:
+        try:
+            context.adaptive_timeouts.save()
+        except Exception as e:
+            current_logger.warning(f"No se pudieron guardar los timeouts adaptativos: {e}", exc_info=True)
+
+
+def _log_cassette_misses(current_logger):
+
+    # Cassettes y cliente API solo existen si se cargaron (algún escenario @api): no se importan solo para esto
+    api_cassette = sys.modules.get('src.utils.api_cassette')
+    cassette_misses = api_cassette.get_cassette_misses() if api_cassette is not None else {}
+
+    if not cassette_misses:
+        return
+
+    total_misses = sum(len(misses) for misses in cassette_misses.values())
+    current_logger.error(f"Cassettes: {total_misses} peticiones no grabadas en modo replay "
+                         f"(vuelva a grabar con api_cassette_mode=record):")
+
+    for path, misses in cassette_misses.items():
+        for fingerprint in misses:
+            current_logger.error(f"  {path}: {fingerprint}")
+
+
+def _close_api_clients(context):
+
+    # Cierra las conexiones keep-alive del cliente API compartido
+    api_utils = sys.modules.get('src.utils.api_utils')
+
+    if api_utils is not None:
+        api_utils.close_pooled_sessions()
+
+    if getattr(context, 'stub_server', None) is not None:
+        context.stub_server.stop()
+
 
 def after_all(context):
     """Se ejecuta una vez después de todas las suites de features."""
@@ -296,5 +712,26 @@ def after_all(context):
     current_logger.info("Fin de la ejecución de todas las features.")
     current_logger.info("Finalizada la ejecución de pruebas del framework VIBE.")
 
-    # No es común necesitar logging.shutdown() a menos que uses manejadores de archivos muy específicos
-    # que necesiten ser cerrados explícitamente y no por el recolector de basura de Python.
+    if getattr(context, 'step_watchdog', None) is not None:
+        context.step_watchdog.stop()
+
+    # Cierra los navegadores compartidos que sigan abiertos (@driver_scope:worker)
+    if getattr(context, 'driver_lifecycle', None) is not None:
+        context.driver_lifecycle.close_all()
+
+    if getattr(context, 'web_metrics_recorder', None) is not None:
+        context.web_metrics_recorder.write_summary()
+
+    _finish_run_resource_monitor(context, current_logger)
+    _save_run_state(context, current_logger)
+
+    if navigation_totals['loads'] or navigation_totals['skipped']:
+        current_logger.info(f"Navegaciones totales: {navigation_totals['loads']} cargas de página, "
+                            f"{navigation_totals['skipped']} omitidas por redundantes")
+
+    _log_cassette_misses(current_logger)
+    _close_api_clients(context)
+
+    # Vacía la cola de logging asíncrono (si está activo) y hace flush de consola/archivo
+    # antes de que Behave termine el proceso.
+    shutdown_logging()
@@ -0,0 +1,53 @@
+from behave import given, when, then
+from src.utils.logger import logger
+
+# Los módulos de la API (caché de tokens, cassettes, cliente async) se importan dentro de los pasos: behave
+# importa todos los módulos de pasos también en --dry-run y en ejecuciones solo web.
+
+@when('inicio sesión en la API con el usuario "{username}" y clave "{password}"')
+def step_impl(context, username, password):
+    context.auth_token = context.api_login_actions.get_auth_token(username, password)
+    logger.info(f"Login por API para '{username}': {'token obtenido' if context.auth_token else 'sin token'}.")
+
+@given('que tengo un token de acceso para el usuario "{username}" con clave "{password}"')
+def step_impl(context, username, password):
+    context.auth_token = context.api_login_actions.get_auth_token(username, password)
+    assert context.auth_token, f"No se pudo obtener un token para '{username}'."
+
+@then('la API debería retornar un token de acceso válido')
+def step_impl(context):
+    from src.actions.api.login.token_cache import jwt_expiry
+    from src.utils.api_cassette import reference_time
+
+    assert context.auth_token, "La API no retornó un token de acceso."
+    # Si el token es un JWT con 'exp', además debe estar vigente (en replay, a la hora en que se grabó)
+    expiry = jwt_expiry(context.auth_token)
+    assert expiry is None or expiry > reference_time(), "El token retornado ya está expirado."
+
+@then('la API no debería retornar un token de acceso')
+def step_impl(context):
+    assert not context.auth_token, "La API retornó un token con credenciales inválidas."
+
+@when('cierro la sesión en la API')
+def step_impl(context):
+    context.logout_response = context.api_login_actions.logout_user(context.auth_token)
+
+@then('la API debería confirmar el cierre de sesión')
+def step_impl(context):
+    status = context.logout_response.status_code
+    assert status in (200, 204), f"Logout no confirmado. Status: {status}"
+
+@when('{count:d} usuarios distintos inician sesión en la API de forma concurrente')
+def step_impl(context, count):
+    from src.utils.async_api_utils import run_batch
+
+    users = [(f"api.user.{i}", f"Password{i}!") for i in range(count)]
+    # Todas las autenticaciones se lanzan a la vez (acotadas por api_max_concurrency)
+    context.batch_tokens = run_batch(
+        lambda user=user: context.async_api_login_actions.get_auth_token(*user) for user in users)
+    logger.info(f"Logins concurrentes completados: {count}")
+
+@then('todos los usuarios deberían obtener un token de acceso válido')
+def step_impl(context):
+    failures = [result for result in context.batch_tokens if not isinstance(result, str) or not result]
+    assert not failures, f"{len(failures)} de {len(context.batch_tokens)} logins no obtuvieron token: {failures[:5]}"
@@ -0,0 +1,89 @@
+from behave import step
+from src.utils.logger import logger
+from src.utils.test_data_allocator import AccountPool, unique_name
+
+
+def _seed_actions(context):
+    # Se crea en el primer uso del escenario: requiere una sesión de navegador ya autenticada.
+    # El cliente REST (requests, cassettes) se importa aquí y no al cargar los pasos (también en --dry-run)
+    from src.actions.api.orangehrm.orangehrm_seed_actions import OrangeHRMSeedActions
+
+    if getattr(context, 'orangehrm_seed', None) is None or context.orangehrm_seed.driver is not context.driver:
+        context.orangehrm_seed = OrangeHRMSeedActions(
+            context.driver,
+            env=context.environment,
+            base_url=context.base_url,
+            max_workers=context.config_env.get('orangehrm_seed_concurrency', 4)
+        )
+    return context.orangehrm_seed
+
+
+def _unique_username(context, original_username):
+    # Mismo criterio que los pasos de UI: sufijo único y mapeo para los pasos que usan el nombre original
+    if not hasattr(context, 'user_map'):
+        context.user_map = {}
+    new_username = unique_name(original_username)
+    context.user_map[original_username] = new_username
+    return new_username
+
+@step('creo por API los empleados con credenciales de usuario')
+def step_impl(context):
+    records = [
+        {
+            'first_name': row['primer_nombre'],
+            'middle_name': row['segundo_nombre'],
+            'last_name': row['apellido'],
+            'username': _unique_username(context, row['nombre_usuario']),
+            'password': row['password'],
+            'enabled': row['estado'] == 'Enabled',
+        }
+        for row in context.table
+    ]
+    results = _seed_actions(context).bulk_create_employees_with_users(records)
+    failures = [result for result in results if isinstance(result, Exception)]
+    assert not failures, f"No se pudieron crear {len(failures)} de {len(records)} registros por API: {failures[0]}"
+    context.seeded_records = results
+
+@step('creo por API {count:d} empleados con usuario y clave "{password}"')
+def step_impl(context, count, password):
+    records = [
+        {
+            'first_name': 'Seed',
+            'last_name': f"Empleado{i}",
+            'username': _unique_username(context, f"seed.user{i}"),
+            'password': password,
+        }
+        for i in range(count)
+    ]
+    results = _seed_actions(context).bulk_create_employees_with_users(records)
+    failures = [result for result in results if isinstance(result, Exception)]
+    assert not failures, f"No se pudieron crear {len(failures)} de {count} registros por API: {failures[0]}"
+    context.seeded_records = results
+    logger.info(f"{count} empleados con usuario creados por API.")
+
+@step('restablezco por API la contraseña del usuario "{username}" a "{new_password}"')
+def step_impl(context, username, new_password):
+    if hasattr(context, 'user_map') and username in context.user_map:
+        username = context.user_map[username]
+
+    _seed_actions(context).reset_password(username, new_password)
+
+@step('provisiono por API {count:d} cuentas en el pool "{pool_name}" con clave "{password}"')
+def step_impl(context, count, pool_name, password):
+    # Crea las cuentas una sola vez; luego los escenarios (y workers) solo las toman del pool
+    records = [
+        {'first_name': 'Pool', 'last_name': f"Cuenta{i}", 'username': unique_name(f"{pool_name}.user"),
+         'password': password}
+        for i in range(count)
+    ]
+    results = _seed_actions(context).bulk_create_employees_with_users(records)
+    created = [{'username': record['username'], 'password': record['password']}
+               for record, result in zip(records, results) if not isinstance(result, Exception)]
+    AccountPool(pool_name).provision(created)
+    assert len(created) == count, f"Solo se provisionaron {len(created)} de {count} cuentas en '{pool_name}'."
+
+@step('inicio sesión con la cuenta tomada del pool')
+def step_impl(context):
+    account = context.pool_account
+    context.orangehrm_action.perform_login(account['username'], account['password'])
+    logger.info(f"Login realizado con la cuenta del pool: {account['username']}")
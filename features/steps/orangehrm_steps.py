@@ -1,11 +1,12 @@
-import time
 from behave import given, when, then, step
 from src.utils.logger import logger
+from src.utils.test_data_allocator import unique_name
 
 @given('que navego a la página de login de OrangeHRM')
 def step_impl(context):
-    # La navegación ya ocurre en before_scenario, pero aseguramos estar en la URL correcta
-    context.driver.get(context.base_url)
+    # La navegación ya ocurre en before_scenario; el NavigationManager solo recarga si el navegador
+    # no está en la página de login sin modificar
+    context.driver.navigation.navigate(context.base_url)
     logger.info("Navegando explícitamente a la página de login.")
 
 @when('inicio sesión como administrador')
@@ -44,8 +45,9 @@ def step_impl(context):
 
     for row in context.table:
         original_username = row['nombre_usuario']
-        # Generar nombre de usuario único para evitar duplicados en ejecuciones repetidas
-        new_username = f"{original_username}_{int(time.time())}"
+        # Generar nombre de usuario único (por corrida, worker y secuencia) para evitar duplicados
+        # en ejecuciones repetidas o paralelas
+        new_username = unique_name(original_username)
         context.user_map[original_username] = new_username
 
         context.orangehrm_action.fill_login_credentials(
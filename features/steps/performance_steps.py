@@ -0,0 +1,67 @@
+from behave import step
+from src.utils.performance_budget import PAGE_METRICS, STEP_METRIC, budgets_from_config, check_budgets
+
+# Los presupuestos se evalúan sobre las métricas ya registradas por WebMetricsCollector (web_metrics = True):
+# no se recarga la página ni se hacen llamadas adicionales al navegador.
+
+
+def _web_metrics(context):
+    web_metrics = getattr(getattr(context, 'driver', None), 'web_metrics', None)
+    if web_metrics is None:
+        raise AssertionError("No hay métricas web para este escenario: active web_metrics en environment.ini "
+                             "(o AUTOMATION_WEB_METRICS=true) y use un escenario @web.")
+    return web_metrics
+
+
+def _last_page(context):
+    record = _web_metrics(context).last_page
+    if record is None:
+        raise AssertionError("No se registró ninguna carga de página en este escenario.")
+    return record
+
+
+def _action_record(context, action):
+    # Registro más reciente del escenario cuyo paso contiene el texto de la acción
+    for record in reversed(_web_metrics(context).history):
+        if record['scenario'] == context.scenario.name and record['step_ms'] is not None \
+                and action.lower() in record['label'].lower():
+            return record
+    raise AssertionError(f"No hay métricas de un paso que contenga '{action}' en este escenario.")
+
+
+def _require_budgets(budgets, keys):
+    if not budgets:
+        raise AssertionError(f"No hay presupuestos configurados en environment.ini ({', '.join(keys)}).")
+    return budgets
+
+
+@step('la página debería cargar en menos de {limit:d} ms')
+def step_impl(context, limit):
+    check_budgets(_last_page(context), {'load_ms': limit})
+
+
+@step('la página debería cumplir los presupuestos de rendimiento')
+def step_impl(context):
+    budgets = budgets_from_config(context.config_env, PAGE_METRICS)
+    check_budgets(_last_page(context), _require_budgets(budgets, [f"budget_{metric}" for metric in PAGE_METRICS]))
+
+
+@step('el paso anterior debería completar en menos de {limit:d} ms')
+def step_impl(context, limit):
+    record = _web_metrics(context).last_step
+    if record is None:
+        raise AssertionError("No hay métricas del paso anterior.")
+    check_budgets(record, {STEP_METRIC: limit}, label=record['label'])
+
+
+@step('la acción "{action}" debería completar en menos de {limit:d} ms')
+def step_impl(context, action, limit):
+    record = _action_record(context, action)
+    check_budgets(record, {STEP_METRIC: limit}, label=record['label'])
+
+
+@step('la acción "{action}" debería completar dentro del presupuesto')
+def step_impl(context, action):
+    record = _action_record(context, action)
+    budgets = budgets_from_config(context.config_env, [STEP_METRIC])
+    check_budgets(record, _require_budgets(budgets, [f"budget_{STEP_METRIC}"]), label=record['label'])
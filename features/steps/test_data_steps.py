@@ -0,0 +1,18 @@
+from behave import step
+from src.utils.data_source import get_data_source
+from src.utils.logger import logger
+from src.utils.test_data_allocator import AccountPool
+
+@step('tomo una cuenta del pool "{pool_name}"')
+def step_impl(context, pool_name):
+    pool = AccountPool(pool_name)
+    context.pool_account = pool.checkout()
+    # Se devuelve al pool en after_scenario, aunque el escenario falle
+    context.leased_accounts.append((pool, context.pool_account))
+    logger.info(f"Escenario usando la cuenta '{context.pool_account['username']}' del pool '{pool_name}'.")
+
+@step('uso el registro con {key_field} "{key}" del dataset "{dataset}"')
+def step_impl(context, key_field, key, dataset):
+    # Solo se lee la fila pedida (índice clave -> offset), no el dataset completo
+    context.data_row = get_data_source(f"test_data/{dataset}", key_field).get(key)
+    logger.info(f"Registro {key_field}='{key}' cargado del dataset '{dataset}'.")
@@ -29,3 +29,19 @@ Feature: Gestión de Empleados (PIM) en OrangeHRM
     When inicio sesión con el usuario "juan.perez.qa" y clave "NewPass456!"
     And cierro la sesión actual
 
+
+  @web
+  Scenario: Restablecer la contraseña de un usuario creado por API
+    Given que navego a la página de login de OrangeHRM
+    When inicio sesión como administrador
+    And creo por API los empleados con credenciales de usuario
+      | primer_nombre | segundo_nombre | apellido | nombre_usuario | password    | estado  |
+      | Ana           | Maria          | Gomez    | ana.gomez.qa   | Password123 | Enabled |
+    And cierro la sesión actual
+    When inicio sesión con el usuario "ana.gomez.qa" y clave "Password123"
+    And cierro la sesión actual
+    When inicio sesión como administrador
+    And restablezco por API la contraseña del usuario "ana.gomez.qa" a "NewPass456!"
+    And cierro la sesión actual
+    When inicio sesión con el usuario "ana.gomez.qa" y clave "NewPass456!"
+    And cierro la sesión actual
@@ -1,4 +1,5 @@
 import requests
+from src.actions.api.login.token_cache import credential_fingerprint, get_token_cache
 from src.utils.api_utils import ApiUtils
 from src.utils.logger import get_logger
 
@@ -11,13 +12,23 @@ class LoginActions:
     Clase para encapsular las acciones de autenticación (login) contra una API.
     """
 
-    def __init__(self, env: str = 'qa'):
+    def __init__(self, env: str = 'qa', base_url: str = None, pool_size: int = None):
         """
         Inicializa la clase LoginActions con el entorno de API especificado.
         Args:
             env (str): El entorno de la API (ej. 'qa', 'development').
+            base_url (str): URL base explícita; si se omite se usa api_base_url del entorno.
+            pool_size (int): Conexiones del pool HTTP; si se omite se usa api_pool_size del entorno.
         """
-        self.api_utils = ApiUtils(env)
+        self.env = env
+        self.api_utils = ApiUtils(env, base_url=base_url, pool_size=pool_size)
+        env_config = self.api_utils.config_reader.get_environment_config(env)
+        # Caché de tokens compartida por todas las LoginActions del proceso
+        self.token_cache = get_token_cache(
+            default_ttl=env_config.get('api_token_ttl', 300),
+            refresh_margin=env_config.get('api_token_refresh_margin', 30),
+            store_path=env_config.get('api_token_cache_file') or None,
+        )
         logger.info(f"LoginActions inicializado para el entorno: {env} con URL base: {self.api_utils.base_url}")
 
     def login_user(self, username: str, password: str) -> dict:
@@ -87,11 +98,13 @@ class LoginActions:
 
             return {}  # Esto no se alcanzará si raise_for_status() es llamado, pero es un buen fallback.
 
-    def get_auth_token(self, username: str, password: str) -> str | None:
+    def get_auth_token(self, username: str, password: str, force_refresh: bool = False) -> str | None:
 
         """
 
-        Realiza el login y extrae el token de autenticación de la respuesta.
+        Retorna un token de autenticación vigente, haciendo login solo si no hay uno en caché
+
+        (o si el de la caché está por expirar).
 
 
 
@@ -102,6 +115,8 @@ class LoginActions:
 
             password (str): La contraseña del usuario.
 
+            force_refresh (bool): Ignora la caché y fuerza un nuevo login.
+
 
 
 
@@ -111,6 +126,20 @@ class LoginActions:
 
         """
 
+        return self.token_cache.get_or_fetch(self.env, username,
+                                             lambda: self._fetch_auth_token(username, password),
+                                             force_refresh=force_refresh,
+                                             credential=credential_fingerprint(username, password),
+                                             base_url=self.api_utils.base_url)
+
+    def _fetch_auth_token(self, username: str, password: str) -> str | None:
+
+        """
+
+        Realiza el login y extrae el token de autenticación de la respuesta.
+
+        """
+
         try:
 
             login_response = self.login_user(username, password)
@@ -167,6 +196,9 @@ class LoginActions:
 
         logger.info("Intentando cerrar sesión (logout).")
 
+        # El token deja de ser válido aunque el logout falle en el servidor
+        self.token_cache.evict_token(token)
+
         response = self.api_utils.post(endpoint, headers=headers)
 
         if response.status_code in [200, 204]:
@@ -0,0 +1,48 @@
+import requests
+
+from src.actions.api.login.api_login_actions import LoginActions
+from src.utils.async_api_utils import AsyncApiUtils
+from src.utils.logger import get_logger
+
+# Obtiene una instancia de logger para esta clase
+logger = get_logger(__name__)
+
+
+class AsyncLoginActions:
+    """
+    Contraparte asyncio de LoginActions, con la misma superficie de métodos (login_user,
+    get_auth_token, logout_user). Pensada para pasos que lanzan muchas autenticaciones a la vez.
+    """
+
+    def __init__(self, env: str = 'qa', base_url: str = None, max_concurrency: int = None,
+                 call_timeout: float = None):
+        """
+        Args:
+            env (str): El entorno de la API (ej. 'qa', 'development').
+            base_url (str): URL base explícita; si se omite se usa api_base_url del entorno.
+            max_concurrency (int): Peticiones simultáneas máximas (por defecto api_max_concurrency).
+            call_timeout (float): Timeout total por llamada en segundos (por defecto api_call_timeout).
+        """
+        self.login_actions = LoginActions(env, base_url=base_url)
+        self.async_api_utils = AsyncApiUtils(api_utils=self.login_actions.api_utils,
+                                             max_concurrency=max_concurrency, call_timeout=call_timeout)
+        logger.info(f"AsyncLoginActions inicializado para el entorno: {env}")
+
+    async def login_user(self, username: str, password: str) -> dict:
+        """Versión async de LoginActions.login_user."""
+
+        return await self.async_api_utils.run(self.login_actions.login_user, username, password)
+
+    async def get_auth_token(self, username: str, password: str) -> str | None:
+        """Versión async de LoginActions.get_auth_token."""
+
+        return await self.async_api_utils.run(self.login_actions.get_auth_token, username, password)
+
+    async def logout_user(self, token: str) -> requests.Response:
+        """Versión async de LoginActions.logout_user."""
+
+        return await self.async_api_utils.run(self.login_actions.logout_user, token)
+
+    def close(self):
+
+        self.async_api_utils.close()
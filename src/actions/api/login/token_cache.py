@@ -0,0 +1,266 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+from src.utils.file_lock import FileLock
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """
+    Retorna el claim 'exp' (epoch en segundos) de un JWT, o None si el token no es un JWT o no lo trae.
+    No verifica la firma: solo se usa para saber cuándo renovar el token.
+    """
+
+    parts = token.split('.') if isinstance(token, str) else []
+
+    if len(parts) != 3:
+        return None
+
+    try:
+        payload_b64 = parts[1] + '=' * (-len(parts[1]) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(payload_b64))
+        exp = payload.get('exp')
+        return float(exp) if exp is not None else None
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def credential_fingerprint(username: str, password: str) -> str:
+    """Huella no reversible de las credenciales, para no guardar contraseñas en la caché."""
+
+    return hashlib.sha256(f"{username}\0{password}".encode('utf-8')).hexdigest()[:32]
+
+
+class TokenCache:
+    """
+    Caché de tokens de autenticación por (entorno, URL base, usuario): el mismo usuario contra dos servidores
+    (p. ej. api_base_url y un servidor local) tiene tokens distintos.
+
+    - La expiración se toma del claim 'exp' del JWT, o de default_ttl si el token no lo trae.
+    - El token se renueva de forma proactiva refresh_margin segundos antes de expirar.
+    - Los logins concurrentes del mismo usuario y credencial se agrupan en una sola petición (entre hilos y,
+      si hay store_path, también entre procesos workers mediante un lock por usuario).
+    - Con store_path, los tokens se comparten entre workers a través de un archivo JSON local.
+    """
+
+    def __init__(self, default_ttl: int = 300, refresh_margin: int = 30, store_path: Optional[str] = None):
+
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        self.store_path = store_path or None
+        self._entries: Dict[Tuple[str, str, str], dict] = {}
+        # Logins en curso por (entorno, URL base, usuario, credencial): solo se comparte el resultado con la
+        # misma credencial
+        self._inflight: Dict[Tuple[str, str, str, Optional[str]], Future] = {}
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, entry: Optional[dict], credential: Optional[str] = None) -> bool:
+
+        return (bool(entry) and entry.get('credential') == credential
+                and entry['expires_at'] - self.refresh_margin > time.time())
+
+    @staticmethod
+    def _key(env: str, username: str, base_url: Optional[str]) -> Tuple[str, str, str]:
+
+        return env, (base_url or '').rstrip('/'), username
+
+    @staticmethod
+    def _store_key(key: Tuple[str, str, str]) -> str:
+
+        return '|'.join(key)
+
+    # --- Store compartido en archivo (opcional) ---
+
+    def _read_store(self) -> dict:
+
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as store_file:
+                return json.load(store_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _update_store(self, key: Tuple[str, str, str], entry: Optional[dict]):
+
+        with FileLock(f"{self.store_path}.lock"):
+
+            data = self._read_store()
+
+            if entry is None:
+                data.pop(self._store_key(key), None)
+            else:
+                data[self._store_key(key)] = entry
+
+            tmp_path = f"{self.store_path}.{os.getpid()}.tmp"
+
+            with open(tmp_path, 'w', encoding='utf-8') as store_file:
+                json.dump(data, store_file)
+
+            os.replace(tmp_path, self.store_path)
+
+    def _user_lock(self, key: Tuple[str, str, str]) -> FileLock:
+
+        digest = hashlib.sha1(self._store_key(key).encode('utf-8')).hexdigest()[:16]
+
+        return FileLock(f"{self.store_path}.{digest}.lock", timeout=120.0)
+
+    # --- API pública ---
+
+    def get_or_fetch(self, env: str, username: str, fetch: Callable[[], Optional[str]],
+                     force_refresh: bool = False, credential: Optional[str] = None,
+                     base_url: Optional[str] = None) -> Optional[str]:
+        """
+        Retorna un token vigente para (env, base_url, username), llamando a fetch() solo si hace falta.
+        Si otro hilo ya está haciendo login para el mismo usuario con la misma credencial, espera su resultado.
+
+        :param credential: Huella de la contraseña usada (ver credential_fingerprint). Un token solo se
+                           reutiliza si se obtuvo con la misma credencial, para que un login con una
+                           contraseña incorrecta no reciba el token de uno anterior válido.
+        :param base_url: URL base del servidor que emite el token.
+        """
+
+        key = self._key(env, username, base_url)
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if not force_refresh and self._is_fresh(entry, credential):
+                logger.debug(f"Token en caché para '{username}' ({env}).")
+                return entry['token']
+
+            inflight_key = (*key, credential)
+            future = self._inflight.get(inflight_key)
+            owner = future is None
+
+            if owner:
+                future = Future()
+                self._inflight[inflight_key] = future
+
+        if not owner:
+            logger.debug(f"Login en curso para '{username}' ({env}); esperando su resultado.")
+            return future.result()
+
+        try:
+            token = (self._fetch_shared(key, fetch, force_refresh, credential) if self.store_path
+                     else self._fetch(key, fetch, credential))
+            future.set_result(token)
+            return token
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(inflight_key, None)
+
+    def _fetch(self, key: Tuple[str, str, str], fetch: Callable[[], Optional[str]],
+               credential: Optional[str]) -> Optional[str]:
+
+        token = fetch()
+
+        if not token:
+            return None
+
+        entry = {'token': token, 'expires_at': jwt_expiry(token) or time.time() + self.default_ttl,
+                 'credential': credential}
+
+        with self._lock:
+            self._entries[key] = entry
+
+        logger.info(f"Token almacenado en caché para '{key[2]}' ({key[0]}), "
+                    f"expira en {entry['expires_at'] - time.time():.0f}s.")
+
+        return token
+
+    def _fetch_shared(self, key: Tuple[str, str, str], fetch: Callable[[], Optional[str]],
+                      force_refresh: bool, credential: Optional[str]) -> Optional[str]:
+
+        # Lock por usuario: si otro worker está haciendo login para el mismo usuario, se espera
+        # y luego se reutiliza el token que dejó en el store.
+        with self._user_lock(key):
+
+            stored = self._read_store().get(self._store_key(key))
+
+            if not force_refresh and self._is_fresh(stored, credential):
+                with self._lock:
+                    self._entries[key] = stored
+                logger.debug(f"Token para '{key[2]}' ({key[0]}) obtenido del store compartido.")
+                return stored['token']
+
+            token = self._fetch(key, fetch, credential)
+
+            if token:
+                self._update_store(key, self._entries[key])
+
+            return token
+
+    def evict(self, env: str, username: str, base_url: Optional[str] = None):
+
+        self._evict(self._key(env, username, base_url))
+
+    def _evict(self, key: Tuple[str, str, str]):
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+        if self.store_path:
+            self._update_store(key, None)
+
+    def evict_token(self, token: str):
+        """Elimina de la caché todas las entradas asociadas a un token (p. ej. tras un logout)."""
+
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry['token'] == token]
+
+        if self.store_path:
+            keys += [tuple(stored_key.split('|', 2)) for stored_key, entry in self._read_store().items()
+                     if entry.get('token') == token]
+
+        for key in set(keys):
+            self._evict(key)
+            logger.info(f"Token de '{key[2]}' ({key[0]}) eliminado de la caché.")
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+
+
+# Caché compartida por todas las LoginActions del proceso (se configura desde el entorno)
+
+_token_cache: Optional[TokenCache] = None
+
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache(default_ttl: int = 300, refresh_margin: int = 30, store_path: Optional[str] = None) -> TokenCache:
+    """
+    Retorna la caché de tokens del proceso, creándola con los parámetros indicados en el primer uso.
+
+    :raises ValueError: Si la caché ya existe con otros parámetros (p. ej. dos entornos con distinto
+                        api_token_ttl en el mismo proceso): la caché es única y no se reconfigura.
+    """
+
+    global _token_cache
+
+    store_path = store_path or None
+
+    with _token_cache_lock:
+
+        if _token_cache is None:
+            _token_cache = TokenCache(default_ttl=default_ttl, refresh_margin=refresh_margin, store_path=store_path)
+
+        current = (_token_cache.default_ttl, _token_cache.refresh_margin, _token_cache.store_path)
+
+        if current != (default_ttl, refresh_margin, store_path):
+            raise ValueError(f"La caché de tokens ya está configurada con (ttl, margen, store)={current}; "
+                             f"no se puede usar con {(default_ttl, refresh_margin, store_path)}")
+
+        return _token_cache
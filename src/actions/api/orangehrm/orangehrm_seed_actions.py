@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from src.utils.api_utils import ApiUtils
+from src.utils.logger import get_logger
+
+# Obtiene una instancia de logger para esta clase
+logger = get_logger(__name__)
+
+# Rol ESS (usuario estándar) de OrangeHRM; 1 = Admin
+ESS_ROLE_ID = 2
+
+_HEADERS = {'Accept': 'application/json'}
+
+
+class OrangeHRMSeedActions:
+    """
+    Creación de datos de prueba (empleados, usuarios y cambios de contraseña) a través de la API REST
+    de OrangeHRM (/web/index.php/api/v2), reutilizando la sesión autenticada del navegador.
+
+    Pensada para escenarios que necesitan datos pero no prueban las pantallas que los crean:
+    cada registro cuesta una o dos peticiones en lugar de varios pasos de UI.
+    """
+
+    API_PATH = 'web/index.php/api/v2'
+
+    def __init__(self, driver, env: str = 'default', base_url: Optional[str] = None, max_workers: int = 4):
+        """
+        Args:
+            driver: WebDriver con una sesión de OrangeHRM ya iniciada (se usan sus cookies).
+            env (str): Entorno de configuración (timeouts y reintentos del cliente HTTP).
+            base_url (str): Cualquier URL de la aplicación; si se omite se usa la URL actual del navegador.
+            max_workers (int): Creaciones simultáneas máximas en las operaciones masivas.
+        """
+        parts = urlsplit(base_url or driver.current_url)
+
+        self.driver = driver
+        self.max_workers = max_workers
+        self.api_utils = ApiUtils(env, base_url=f"{parts.scheme}://{parts.netloc}/{self.API_PATH}")
+        logger.info(f"OrangeHRMSeedActions inicializado con URL base: {self.api_utils.base_url}")
+
+    def session_cookies(self) -> Dict[str, str]:
+        """
+        Cookies actuales del navegador (sesión autenticada). Se leen una sola vez por operación:
+        el driver no es seguro entre hilos, así que las operaciones masivas las comparten.
+        """
+
+        return {cookie['name']: cookie['value'] for cookie in self.driver.get_cookies()}
+
+    def create_employee(self, first_name: str, last_name: str, middle_name: str = '',
+                        employee_id: Optional[str] = None, cookies: Optional[Dict[str, str]] = None) -> dict:
+        """Crea un empleado (PIM) y retorna sus datos, incluido 'empNumber'."""
+
+        payload = {'firstName': first_name, 'middleName': middle_name or '', 'lastName': last_name}
+
+        if employee_id:
+            payload['employeeId'] = employee_id
+
+        response = self.api_utils.post('pim/employees', headers=_HEADERS,
+                                       cookies=cookies or self.session_cookies(), json_data=payload)
+        employee = response.json()['data']
+
+        logger.info(f"Empleado creado por API: {first_name} {last_name} (empNumber: {employee['empNumber']})")
+
+        return employee
+
+    def create_user(self, username: str, password: str, emp_number: int, enabled: bool = True,
+                    role_id: int = ESS_ROLE_ID, cookies: Optional[Dict[str, str]] = None) -> dict:
+        """Crea las credenciales de login de un empleado existente."""
+
+        payload = {'username': username, 'password': password, 'status': enabled, 'userRoleId': role_id,
+                   'empNumber': emp_number}
+
+        response = self.api_utils.post('admin/users', headers=_HEADERS,
+                                       cookies=cookies or self.session_cookies(), json_data=payload)
+
+        logger.info(f"Usuario creado por API: {username} (empNumber: {emp_number})")
+
+        return response.json()['data']
+
+    def find_user(self, username: str, cookies: Optional[Dict[str, str]] = None) -> Optional[dict]:
+
+        response = self.api_utils.get('admin/users', headers=_HEADERS,
+                                      cookies=cookies or self.session_cookies(), params={'username': username})
+
+        return next((user for user in response.json().get('data', []) if user.get('userName') == username), None)
+
+    def reset_password(self, username: str, new_password: str, cookies: Optional[Dict[str, str]] = None) -> dict:
+        """Cambia la contraseña de un usuario existente (equivalente a Admin > Editar usuario > Cambiar contraseña)."""
+
+        cookies = cookies or self.session_cookies()
+        user = self.find_user(username, cookies=cookies)
+
+        if user is None:
+            raise ValueError(f"No existe el usuario '{username}' en OrangeHRM.")
+
+        payload = {
+            'username': username,
+            'password': new_password,
+            'changePassword': True,
+            'status': user.get('status', True),
+            'userRoleId': user['userRole']['id'],
+            'empNumber': user['employee']['empNumber'],
+        }
+
+        response = self.api_utils.put(f"admin/users/{user['id']}", headers=_HEADERS, cookies=cookies,
+                                      json_data=payload)
+
+        logger.info(f"Contraseña restablecida por API para el usuario: {username}")
+
+        return response.json()['data']
+
+    def create_employee_with_user(self, first_name: str, last_name: str, username: str, password: str,
+                                  middle_name: str = '', enabled: bool = True,
+                                  cookies: Optional[Dict[str, str]] = None) -> dict:
+        """Crea un empleado y sus credenciales de login. Retorna {'employee': ..., 'user': ...}."""
+
+        cookies = cookies or self.session_cookies()
+        employee = self.create_employee(first_name, last_name, middle_name, cookies=cookies)
+        user = self.create_user(username, password, employee['empNumber'], enabled=enabled, cookies=cookies)
+
+        return {'employee': employee, 'user': user}
+
+    def bulk_create_employees_with_users(self, records: List[dict]) -> List:
+        """
+        Crea varios empleados con usuario en paralelo (como máximo max_workers a la vez).
+
+        :param records: Diccionarios con los argumentos de create_employee_with_user.
+        :return: Resultados en el mismo orden; los registros fallidos contienen la excepción.
+        """
+
+        if not records:
+            return []
+
+        cookies = self.session_cookies()
+
+        def _create(record):
+            try:
+                return self.create_employee_with_user(cookies=cookies, **record)
+            except Exception as e:
+                logger.error(f"Fallo al crear por API el usuario '{record.get('username')}': {e}")
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(records)),
+                                thread_name_prefix='orangehrm-seed') as executor:
+            results = list(executor.map(_create, records))
+
+        failures = sum(isinstance(result, Exception) for result in results)
+        logger.info(f"Creación masiva por API: {len(records) - failures} de {len(records)} registros creados.")
+
+        return results
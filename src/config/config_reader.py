@@ -1,13 +1,102 @@
+import os
+import threading
 from pathlib import Path
+from types import MappingProxyType
 from configparser import ConfigParser, NoSectionError, NoOptionError
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Mapping, Tuple
 
 from src.utils.logger import get_logger
 from src.utils.definitions import PROJECT_ROOT
 
 
+# Definición del esquema de configuración: clave -> (tipo, valor_por_defecto)
+# Nota: Los valores por defecto aquí actúan como respaldo final si fallan el INI y la sección DEFAULT.
+
+CONFIG_SCHEMA = {
+    'browser': (str, 'chrome'),
+    'headless': (bool, False),
+    'wait_timeout': (int, 30),
+    'implicit_wait': (int, 0),
+    'page_load_timeout': (int, 60),
+    'page_load_strategy': (str, 'normal'),
+    'window_size': (str, 'maximized'),
+    'driver_scope': (str, 'scenario'),
+    'adaptive_timeouts': (bool, False),
+    'adaptive_timeout_file': (str, ''),
+    'adaptive_timeout_percentile': (float, 95.0),
+    'adaptive_timeout_factor': (float, 1.5),
+    'adaptive_timeout_margin': (float, 0.5),
+    'adaptive_timeout_min': (float, 1.0),
+    'adaptive_timeout_max': (float, 30.0),
+    'adaptive_timeout_min_samples': (int, 5),
+    'step_timeout': (int, 0),
+    'step_timeout_tags': (str, ''),
+    'resource_monitor': (bool, False),
+    'resource_max_rss_mb': (int, 1500),
+    'web_metrics': (bool, False),
+    'web_metrics_dir': (str, ''),
+    'budget_ttfb_ms': (int, 0),
+    'budget_dom_content_loaded_ms': (int, 0),
+    'budget_load_ms': (int, 0),
+    'budget_fcp_ms': (int, 0),
+    'budget_lcp_ms': (int, 0),
+    'budget_step_ms': (int, 0),
+    'screenshot_on_fail': (bool, True),
+    'api_timeout': (int, 30),
+    'api_pool_size': (int, 10),
+    'api_max_retries': (int, 3),
+    'api_backoff_factor': (float, 0.3),
+    'api_max_concurrency': (int, 10),
+    'api_call_timeout': (int, 60),
+    'api_token_ttl': (int, 300),
+    'api_token_refresh_margin': (int, 30),
+    'api_token_cache_file': (str, ''),
+    'api_cassette_mode': (str, 'off'),
+    'api_cassette_dir': (str, ''),
+    'api_stub_server': (bool, False),
+    'api_stub_port': (int, 0),
+    'api_stub_latency_ms': (int, 0),
+    'api_stub_jitter_ms': (int, 0),
+    'api_stub_error_rate': (float, 0.0),
+    'api_stub_seed': (int, 42),
+    'orangehrm_seed_concurrency': (int, 4),
+    'base_url': (str, 'https://www.saucedemo.com'),
+    'api_base_url': (str, 'http://localhost:5000/api'),
+    'grid_active': (bool, False),
+    'grid_hub_url': (str, 'http://localhost:4444/wd/hub'),
+    'use_manual_drivers': (bool, False),
+    'manual_drivers_path': (str, ''),
+    'flight_recorder': (bool, False),
+    'flight_recorder_size': (int, 20),
+    'flight_recorder_mode': (str, 'page'),
+    'screenshot_format': (str, 'webp'),
+    'screenshot_quality': (int, 70),
+    'screenshot_retention_days': (int, 7),
+    'screenshot_max_mb': (int, 500),
+}
+
+# Overlay de variables de entorno (prioridad: variable de entorno > INI > valor por defecto del esquema).
+# Cada clave se puede sobreescribir con AUTOMATION_<CLAVE> (ej. AUTOMATION_WAIT_TIMEOUT=20).
+# Alias adicionales por compatibilidad con CI y la documentación existente:
+
+ENV_VAR_ALIASES = {
+    'headless': ('HEADLESS',),
+}
+
+ENV_VAR_PREFIX = 'AUTOMATION_'
+
+
 class ConfigReader:
 
+    # Caché a nivel de proceso, compartida por todas las instancias:
+    #   - _parser_cache:   ruta del INI -> (mtime, ConfigParser ya leído)
+    #   - _snapshot_cache: (ruta del INI, entorno) -> (mtime, snapshot inmutable)
+    # Solo se invalida cuando cambia el mtime del archivo.
+
+    _cache_lock = threading.RLock()
+    _parser_cache: Dict[Path, Tuple[float, ConfigParser]] = {}
+    _snapshot_cache: Dict[Tuple[Path, str], Tuple[float, Mapping[str, Any]]] = {}
+
     def __init__(self, config_file_path: Optional[str] = None):
 
         self.logger = get_logger(__name__)
@@ -17,9 +106,9 @@ class ConfigReader:
         # Esto es mas robusto que usar rutas relativas a __file__
 
         if config_file_path:
-            self.config_file = Path(config_file_path)
+            self.config_file = Path(config_file_path).resolve()
         else:
-            self.config_file = PROJECT_ROOT / "src" / "config" / "environment.ini"
+            self.config_file = (PROJECT_ROOT / "src" / "config" / "environment.ini").resolve()
 
         self._load_config()
 
@@ -28,7 +117,12 @@ class ConfigReader:
 
 
 
-    def _load_config(self):
+    def _load_config(self) -> float:
+
+        """
+        Carga el INI desde la caché compartida, releyéndolo solo si su mtime cambió.
+        Retorna el mtime vigente del archivo.
+        """
 
         if not self.config_file.exists():
 
@@ -36,15 +130,42 @@ class ConfigReader:
 
             raise FileNotFoundError(f"environment.ini no encontrado en {self.config_file}")
 
-        try:
+        mtime = self.config_file.stat().st_mtime
 
-            self.config.read(str(self.config_file))
+        with self._cache_lock:
 
-        except Exception as e:
+            cached = self._parser_cache.get(self.config_file)
 
-            self.logger.error(f"Error al leer el archivo de configuración {self.config_file}: {e}")
+            if cached and cached[0] == mtime:
 
-            raise
+                self.config = cached[1]
+
+                return mtime
+
+            parser = ConfigParser()
+
+            try:
+
+                parser.read(str(self.config_file))
+
+            except Exception as e:
+
+                self.logger.error(f"Error al leer el archivo de configuración {self.config_file}: {e}")
+
+                raise
+
+            self._parser_cache[self.config_file] = (mtime, parser)
+
+            # Los snapshots compilados con la versión anterior del archivo quedan invalidados
+
+            for key in [key for key in self._snapshot_cache if key[0] == self.config_file]:
+                del self._snapshot_cache[key]
+
+            self.config = parser
+
+            self.logger.debug(f"Archivo de configuración leído: {self.config_file} (mtime: {mtime})")
+
+        return mtime
 
 
 
@@ -110,39 +231,104 @@ class ConfigReader:
             raise
 
 
-    def get_environment_config(self, environment_name: str) -> Dict[str, Any]:
+    @staticmethod
+    def _convert(kind: type, raw_value: str):
+
+        if kind is bool:
+
+            normalized = str(raw_value).strip().lower()
+
+            if normalized not in ConfigParser.BOOLEAN_STATES:
+                raise ValueError(f"Valor booleano inválido: '{raw_value}'")
+
+            return ConfigParser.BOOLEAN_STATES[normalized]
+
+        if kind is int:
+            return int(str(raw_value).strip())
+
+        if kind is float:
+            return float(str(raw_value).strip())
+
+        return raw_value
+
+    @staticmethod
+    def _env_override(key: str) -> Optional[Tuple[str, str]]:
+
+        """Retorna (nombre_variable, valor) si la clave está sobreescrita por una variable de entorno."""
+
+        for env_var in (f"{ENV_VAR_PREFIX}{key.upper()}",) + ENV_VAR_ALIASES.get(key, ()):
+
+            if env_var in os.environ:
+                return env_var, os.environ[env_var]
+
+        return None
+
+    def _build_snapshot(self, section_to_read: str) -> Mapping[str, Any]:
+
+        config_data = {}
+        defaulted = []
+
+        for key, (kind, default_val) in CONFIG_SCHEMA.items():
+
+            override = self._env_override(key)
+
+            try:
+
+                if override is not None:
+                    config_data[key] = self._convert(kind, override[1])
+                    self.logger.info(f"Configuración '{key}' sobreescrita por la variable de entorno {override[0]}.")
+                    continue
+
+                config_data[key] = self._convert(kind, self.config.get(section_to_read, key))
+
+            except (NoSectionError, NoOptionError):
+
+                config_data[key] = default_val
+                defaulted.append(key)
+
+            except ValueError as e:
+
+                self.logger.warning(f"Configuración '{key}' inválida en '{section_to_read}': {e}. "
+                                    f"Usando valor por defecto: {default_val}")
+                config_data[key] = default_val
+
+        if defaulted:
+            self.logger.warning(f"Configuraciones no encontradas en la sección '{section_to_read}', "
+                                f"se usan los valores por defecto del esquema: {defaulted}")
+
+        return MappingProxyType(config_data)
+
+    def get_environment_config(self, environment_name: str) -> Mapping[str, Any]:
 
         """
-        Retorna un diccionario con todas las configuraciones para un entorno dado.
-        Maneja valores por defecto si no se encuentran en el archivo INI.
+        Retorna un snapshot inmutable (solo lectura, con .get() y [] como un dict) con todas las
+        configuraciones tipadas para un entorno dado.
+
+        El snapshot se compila una sola vez por entorno y proceso (aplicando los valores por defecto
+        del esquema y el overlay de variables de entorno) y solo se recompila si cambia el mtime del INI.
         """
         # Mapear 'default' a la sección 'DEFAULT' de ConfigParser
         section_to_read = environment_name
         if environment_name.lower() == 'default':
             section_to_read = 'DEFAULT'
 
-        if section_to_read != 'DEFAULT' and not self.config.has_section(section_to_read):
-            self.logger.warning(f"Sección '{section_to_read}' no encontrada en environments.ini. Usando valores por defecto del esquema.")
-
-        # Definición del esquema de configuración: (clave, método_de_lectura, valor_por_defecto)
-        # Nota: Los valores por defecto aquí actúan como respaldo final si fallan el INI y la sección DEFAULT.
-        config_schema = {
-            'browser': (self.get_setting, 'chrome'),
-            'headless': (self.get_boolean_setting, False),
-            'wait_timeout': (self.get_int_setting, 30),
-            'implicit_wait': (self.get_int_setting, 0),
-            'screenshot_on_fail': (self.get_boolean_setting, True),
-            'api_timeout': (self.get_int_setting, 30),
-            'base_url': (self.get_setting, 'https://www.saucedemo.com'),
-            'api_base_url': (self.get_setting, 'http://localhost:5000/api'),
-            'grid_active': (self.get_boolean_setting, False),
-            'grid_hub_url': (self.get_setting, 'http://localhost:4444/wd/hub'),
-            'use_manual_drivers': (self.get_boolean_setting, False),
-            'manual_drivers_path': (self.get_setting, ''),
-        }
+        mtime = self._load_config()
+        cache_key = (self.config_file, section_to_read)
 
-        config_data = {}
-        for key, (method, default_val) in config_schema.items():
-            config_data[key] = method(section_to_read, key, default_val)
-            
-        return config_data
\ No newline at end of file
+        with self._cache_lock:
+
+            cached = self._snapshot_cache.get(cache_key)
+
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            if section_to_read != 'DEFAULT' and not self.config.has_section(section_to_read):
+                self.logger.warning(f"Sección '{section_to_read}' no encontrada en environments.ini. Usando valores por defecto del esquema.")
+
+            snapshot = self._build_snapshot(section_to_read)
+
+            self._snapshot_cache[cache_key] = (mtime, snapshot)
+
+            self.logger.info(f"Snapshot de configuración compilado para el entorno '{environment_name}'.")
+
+            return snapshot
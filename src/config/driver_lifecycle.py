@@ -0,0 +1,193 @@
+import os
+from typing import Callable, Dict
+
+from selenium.common.exceptions import WebDriverException
+
+from src.utils.downloads import clear_download_dir
+from src.utils.logger import get_logger
+from src.utils.scenario_tags import scenario_tag_value
+
+_driver_lifecycle_logger = get_logger(__name__)
+
+DRIVER_SCOPES = ('scenario', 'feature', 'worker')
+
+SCOPE_TAG_PREFIX = 'driver_scope:'
+
+
+def driver_scope_for(scenario, default: str = 'scenario') -> str:
+    """
+    Determina el alcance del driver de un escenario a partir de sus tags (@driver_scope:scenario|feature|worker).
+
+    Un tag a nivel de feature o rule aplica a todos sus escenarios y uno a nivel de escenario lo sobrescribe
+    (ver scenario_tag_value: la precedencia no depende del orden del set de tags efectivos).
+    """
+
+    scope = (scenario_tag_value(scenario, SCOPE_TAG_PREFIX) or default).lower()
+
+    if scope not in DRIVER_SCOPES:
+        _driver_lifecycle_logger.warning(f"driver_scope '{scope}' no válido (opciones: {DRIVER_SCOPES}). "
+                                         f"Se usa 'scenario'.")
+        return 'scenario'
+
+    return scope
+
+
+class DriverLifecycle:
+    """
+    Decide cuándo se crea, se reutiliza y se cierra el WebDriver de los escenarios @web.
+
+    - scenario: un navegador nuevo por escenario (comportamiento por defecto, máximo aislamiento).
+    - feature:  un navegador compartido por los escenarios de la feature; se cierra en after_feature.
+    - worker:   un navegador compartido por todo el proceso; se cierra en after_all.
+
+    Entre escenarios, un driver compartido se limpia (cookies, localStorage/sessionStorage, ventanas extra,
+    carpeta de descargas).
+    Salvaguardas: si el escenario falló, la limpieza falla o el driver no responde al reutilizarlo,
+    se cierra y el siguiente escenario recibe un navegador nuevo.
+    """
+
+    def __init__(self, create_driver: Callable, default_scope: str = 'scenario'):
+
+        self.create_driver = create_driver
+        self.default_scope = default_scope
+        self._shared: Dict[str, object] = {}
+
+    def acquire(self, scenario):
+        """Retorna (driver, scope, reused) para el escenario: el driver compartido si sigue sano o uno nuevo."""
+
+        scope = driver_scope_for(scenario, self.default_scope)
+        driver = self._shared.get(scope)
+
+        if driver is not None and self._is_alive(driver):
+            _driver_lifecycle_logger.info(f"Reutilizando WebDriver de alcance '{scope}'.")
+            return driver, scope, True
+
+        if driver is not None:
+            _driver_lifecycle_logger.warning(f"El WebDriver compartido ('{scope}') no responde. Se crea uno nuevo.")
+            self._close(self._shared.pop(scope))
+
+        driver = self.create_driver()
+
+        if scope != 'scenario' and driver is not None:
+            self._shared[scope] = driver
+
+        return driver, scope, False
+
+    def release(self, driver, scope: str, failed: bool = False, recycle: bool = False) -> bool:
+        """
+        Libera el driver al terminar un escenario: lo cierra (alcance 'scenario', escenario fallido o
+        recycle=True, p. ej. por consumo de memoria) o lo limpia para el siguiente escenario.
+
+        :return: True si el driver se cerró.
+        """
+
+        if driver is None:
+            return True
+
+        if scope != 'scenario' and not failed and not recycle:
+            try:
+                self._reset(driver)
+                return False
+            except Exception as e:
+                _driver_lifecycle_logger.warning(f"No se pudo limpiar el WebDriver compartido ('{scope}'): {e}. "
+                                                 f"Se cierra.")
+
+        elif scope != 'scenario':
+            _driver_lifecycle_logger.info(f"Se descarta el WebDriver compartido ('{scope}'): "
+                                          f"{'escenario fallido' if failed else 'sesión reciclada'}.")
+
+        if self._shared.get(scope) is driver:
+            del self._shared[scope]
+
+        # Las descargas de un escenario fallido se conservan para el análisis
+        self._close(driver, keep_downloads=failed)
+
+        return True
+
+    def end_scope(self, scope: str):
+        """Cierra el driver compartido del alcance indicado (after_feature -> 'feature', after_all -> 'worker')."""
+
+        driver = self._shared.pop(scope, None)
+
+        if driver is not None:
+            self._close(driver)
+            _driver_lifecycle_logger.info(f"WebDriver de alcance '{scope}' cerrado.")
+
+    def close_all(self):
+
+        for scope in list(self._shared):
+            self.end_scope(scope)
+
+    @staticmethod
+    def _is_alive(driver) -> bool:
+
+        try:
+            return bool(driver.window_handles)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver):
+        """Deja el navegador como recién abierto: una sola ventana, sin cookies ni almacenamiento web."""
+
+        handles = driver.window_handles
+
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+
+        driver.switch_to.window(handles[0])
+
+        # localStorage/sessionStorage solo se pueden limpiar desde el origen cargado (el de la app)
+        driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+
+        # Con CDP (Chrome/Edge locales) se borran las cookies de todos los dominios, no solo las del actual
+        if hasattr(driver, 'execute_cdp_cmd'):
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        else:
+            driver.delete_all_cookies()
+
+        # Cada escenario empieza con la carpeta de descargas vacía
+        clear_download_dir(getattr(driver, 'download_dir', None))
+
+        navigation = getattr(driver, 'navigation', None)
+
+        if navigation is not None:
+            # La página actual ya no refleja el estado limpio: la próxima navegación debe recargar
+            navigation.mark_dirty()
+
+    @classmethod
+    def _close(cls, driver, keep_downloads: bool = False):
+        """
+        Cierra la sesión, termina sus procesos huérfanos (si el monitor de recursos está activo) y elimina
+        su carpeta de descargas. Con keep_downloads=True (escenario fallido) la carpeta se conserva,
+        salvo que esté vacía.
+        """
+
+        session_id = getattr(driver, 'session_id', None)
+
+        cls._quit(driver)
+
+        # Procesos que sobrevivieron a quit() (p. ej. si falló o el navegador no respondía)
+        if session_id:
+            from src.utils.resource_monitor import get_resource_monitor
+            resource_monitor = get_resource_monitor()
+            if resource_monitor is not None:
+                resource_monitor.reap(session_id)
+
+        download_dir = getattr(driver, 'download_dir', None)
+
+        if keep_downloads and download_dir and os.path.isdir(download_dir) and os.listdir(download_dir):
+            _driver_lifecycle_logger.info(f"Descargas del escenario fallido conservadas en: {download_dir}")
+        else:
+            clear_download_dir(download_dir, remove=True)
+
+    @staticmethod
+    def _quit(driver):
+
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            _driver_lifecycle_logger.warning(f"Error al cerrar WebDriver: {e}")
+        except Exception as e:
+            _driver_lifecycle_logger.warning(f"Error inesperado al cerrar WebDriver: {e}", exc_info=True)
@@ -11,6 +11,8 @@ import json
 
 from src.utils.logger import get_logger
 
+from src.utils.log_context import lazy
+
 from src.config.config_reader import ConfigReader
 
 
@@ -195,13 +197,14 @@ class GridManager:
 
                     else:
 
-                        _grid_manager_logger.debug(f"Selenium Grid Hub no está listo aún. Respuesta: {status_data}")
+                        _grid_manager_logger.debug("Selenium Grid Hub no está listo aún. Respuesta: %s", lazy(status_data))
 
                 else:
 
                     _grid_manager_logger.debug(
 
-                        f"Grid Hub respondió con código de estado {response.status_code}. Contenido: {response.text[:200]}...")
+                        "Grid Hub respondió con código de estado %s. Contenido: %s",
+                        response.status_code, lazy(lambda: response.text, max_chars=200))
 
             except requests.exceptions.ConnectionError:
 
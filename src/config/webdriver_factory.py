@@ -1,34 +1,17 @@
+from __future__ import annotations
+
 import os
 import platform
 from pathlib import Path
-from selenium import webdriver
-from typing import Optional, Any, Union
-
-
-# Importaciones correctas para las clases Options
-
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.edge.options import Options as EdgeOptions
-
-
-# Importaciones correctas para las clases Service de Selenium 4.x
+from typing import Optional, Any, Union, TYPE_CHECKING
 
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.edge.service import Service as EdgeService
 
+# Las clases Options/Service/WebDriver de cada navegador y los managers de webdriver_manager se
+# importan bajo demanda (ver _browser_classes y _driver_manager): importar este módulo no carga
+# Chrome, Firefox y Edge a la vez, solo el navegador que realmente se usa.
 
-# Importaciones para el WebDriver local y remoto
-
-from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
-
-# Importaciones de webdriver_manager
-
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
 
 
 # Importación de excepciones de Selenium
@@ -39,6 +22,8 @@ from selenium.common.exceptions import WebDriverException, SessionNotCreatedExce
 # Importaciones de tu proyecto
 
 from src.utils.logger import get_logger
+from src.utils.log_context import lazy
+from src.utils.command_counter import CommandCounter
 from src.utils.definitions import PROJECT_ROOT
 
 from src.config.grid_manager import GridManager
@@ -49,6 +34,91 @@ from src.config.grid_manager import GridManager
 _webdriver_factory_logger = get_logger(__name__)
 
 
+def _browser_classes(browser_name: str) -> tuple:
+    """Importa bajo demanda y retorna (Options, Service, WebDriver) del navegador indicado."""
+
+    if browser_name == "chrome":
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.webdriver import WebDriver
+    elif browser_name == "firefox":
+        from selenium.webdriver.firefox.options import Options
+        from selenium.webdriver.firefox.service import Service
+        from selenium.webdriver.firefox.webdriver import WebDriver
+    elif browser_name == "edge":
+        from selenium.webdriver.edge.options import Options
+        from selenium.webdriver.edge.service import Service
+        from selenium.webdriver.edge.webdriver import WebDriver
+    else:
+        raise ValueError(f"Navegador no soportado: {browser_name}")
+
+    return Options, Service, WebDriver
+
+
+def _driver_manager(browser_name: str):
+    """Importa bajo demanda y retorna el manager de webdriver_manager del navegador indicado."""
+
+    if browser_name == "chrome":
+        from webdriver_manager.chrome import ChromeDriverManager
+        from webdriver_manager.core.os_manager import ChromeType
+        return ChromeDriverManager(chrome_type=ChromeType.GOOGLE)
+
+    if browser_name == "firefox":
+        from webdriver_manager.firefox import GeckoDriverManager
+        return GeckoDriverManager()
+
+    if browser_name == "edge":
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        return EdgeChromiumDriverManager()
+
+    return None
+
+
+def _parse_window_size(window_size: str) -> tuple:
+    """Convierte "ANCHO,ALTO" en (ancho, alto); "maximized" (o un valor inválido) equivale a 1920x1080."""
+
+    try:
+        width, height = (int(value) for value in str(window_size).lower().replace('x', ',').split(','))
+        return width, height
+    except ValueError:
+        return 1920, 1080
+
+
+def _window_arguments(browser_name: str, headless: bool, window_size: str) -> list:
+    """
+    Argumentos de lanzamiento para el tamaño de ventana ("maximized" o "ANCHO,ALTO").
+    En headless no hay pantalla que maximizar: se usa el tamaño explícito (1920x1080 por defecto).
+    Firefox no tiene un argumento para iniciar maximizado: en ese caso get_webdriver llama a maximize_window().
+    """
+
+    width, height = _parse_window_size(window_size)
+    maximized = not headless and window_size == "maximized"
+
+    if browser_name == "firefox":
+        return [] if maximized else [f"--width={width}", f"--height={height}"]
+
+    return ["--start-maximized"] if maximized else [f"--window-size={width},{height}"]
+
+
+def _apply_window_and_timeouts(options_obj, browser_name: str, headless: bool, window_size: str,
+                               implicit_wait: Optional[int], page_load_timeout: Optional[int]):
+    """Agrega el tamaño de ventana a los argumentos y los timeouts como capability (W3C 'timeouts', en ms)."""
+
+    for arg in _window_arguments(browser_name, headless, window_size):
+        options_obj.add_argument(arg)
+
+    timeouts = {}
+
+    if implicit_wait is not None:
+        timeouts["implicit"] = int(implicit_wait * 1000)
+
+    if page_load_timeout:
+        timeouts["pageLoad"] = int(page_load_timeout * 1000)
+
+    if timeouts:
+        options_obj.timeouts = timeouts
+
+
 class WebDriverFactory:
     """
 
@@ -87,7 +157,11 @@ class WebDriverFactory:
         incognito: bool = False,
         mobile_device_name: Optional[str] = None,
         page_load_strategy: str = "normal",
-        locale: str = "es-CL"
+        locale: str = "es-CL",
+        window_size: str = "maximized",
+        implicit_wait: Optional[int] = None,
+        page_load_timeout: Optional[int] = None,
+        download_dir: Union[str, Path, None] = None
     ) -> Any:
         """
 
@@ -95,22 +169,28 @@ class WebDriverFactory:
 
         basado en el nombre del navegador y si el modo headless está activo.
 
+        El tamaño de ventana y los timeouts viajan en los argumentos de lanzamiento y en las capabilities
+
+        de la sesión, en lugar de comandos posteriores (maximize_window, implicitly_wait): cada comando
+
+        es un round trip adicional, costoso sobre Grid.
+
         """
 
         browser_name = browser_name.lower()
 
         options_obj = None
 
-        # Configuración de carpeta de descargas centralizada en la raíz del proyecto
-        download_dir = self._PROJECT_ROOT / "downloads"
-        download_dir.mkdir(exist_ok=True)
+        # Carpeta de descargas propia de la sesión (downloads/<worker>_<id>): una carpeta compartida
+        # mezcla los archivos de sesiones paralelas
+        if download_dir is None:
+            from src.utils.downloads import new_download_dir
+            download_dir = new_download_dir()
 
         # Configuración común para navegadores basados en Chromium (Chrome y Edge)
         if browser_name in ["chrome", "edge"]:
-            if browser_name == "chrome":
-                options_obj = ChromeOptions()
-            else:
-                options_obj = EdgeOptions()
+            options_cls, _, _ = _browser_classes(browser_name)
+            options_obj = options_cls()
 
             options_obj.page_load_strategy = page_load_strategy
             options_obj.accept_insecure_certs = True
@@ -146,18 +226,16 @@ class WebDriverFactory:
             if headless:
                 options_obj.add_argument("--headless=new")
                 options_obj.add_argument("--disable-gpu")
-                options_obj.add_argument("--window-size=1920,1080")
                 if browser_name == "chrome":
                     options_obj.add_argument("--no-sandbox")
                     options_obj.add_argument("--disable-dev-shm-usage")
                 
                 _webdriver_factory_logger.debug(f"Opciones {browser_name} para headless aplicadas.")
-            else:
-                options_obj.add_argument("--start-maximized")
 
         elif browser_name == "firefox":
 
-            options_obj = FirefoxOptions()
+            options_cls, _, _ = _browser_classes(browser_name)
+            options_obj = options_cls()
 
             options_obj.page_load_strategy = page_load_strategy
 
@@ -183,8 +261,6 @@ class WebDriverFactory:
             if headless:
 
                 options_obj.add_argument("-headless")
-                options_obj.add_argument("--width=1920")
-                options_obj.add_argument("--height=1080")
 
                 _webdriver_factory_logger.debug(
                     "Opciones Firefox para headless aplicadas."
@@ -200,20 +276,25 @@ class WebDriverFactory:
             )
             raise ValueError(f"Navegador no soportado para opciones: {browser_name}")
 
+        _apply_window_and_timeouts(options_obj, browser_name, headless, window_size, implicit_wait, page_load_timeout)
+
+        # Las capabilities solo se serializan si el nivel DEBUG realmente se emite
         _webdriver_factory_logger.debug(
-            f"Opciones finales para {browser_name}: {options_obj.to_capabilities()}"
+            "Opciones finales para %s: %s", browser_name, lazy(options_obj.to_capabilities)
         )
 
         return options_obj
 
-    def _create_remote_driver(self, browser_name: str, options_obj) -> Optional[webdriver.Remote]:
+    def _create_remote_driver(self, browser_name: str, options_obj) -> Optional[RemoteWebDriver]:
         """Intenta crear un WebDriver remoto conectado al Grid."""
+        from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+
         _webdriver_factory_logger.info(
             f"Intentando inicializar WebDriver con Selenium Grid para: {browser_name}"
         )
         try:
             hub_url = self.grid_manager.get_grid_hub_url()
-            driver = webdriver.Remote(
+            driver = RemoteWebDriver(
                 command_executor=hub_url,
                 options=options_obj,
             )
@@ -227,7 +308,7 @@ class WebDriverFactory:
             )
             return None
 
-    def _create_manual_driver(self, browser_name: str, manual_drivers_path: Union[str, Path, None], options_obj) -> Optional[webdriver.Remote]:
+    def _create_manual_driver(self, browser_name: str, manual_drivers_path: Union[str, Path, None], options_obj) -> Optional[RemoteWebDriver]:
         """Intenta crear un WebDriver local usando un ejecutable manual."""
         # Si no se provee ruta, usar la default del proyecto
         if not manual_drivers_path:
@@ -259,18 +340,11 @@ class WebDriverFactory:
         if driver_exe_path.exists():
             _webdriver_factory_logger.info(f"Usando driver manual para {browser_name}: {driver_exe_path}")
             try:
-                service = None
                 # Convertimos Path a string porque Selenium a veces prefiere strings puros para rutas
                 str_path = str(driver_exe_path)
-                if browser_name_lower == "chrome":
-                    service = ChromeService(executable_path=str_path)
-                    return webdriver.Chrome(service=service, options=options_obj)
-                elif browser_name_lower == "firefox":
-                    service = FirefoxService(executable_path=str_path)
-                    return webdriver.Firefox(service=service, options=options_obj)
-                elif browser_name_lower == "edge":
-                    service = EdgeService(executable_path=str_path)
-                    return webdriver.Edge(service=service, options=options_obj)
+                _, service_cls, driver_cls = _browser_classes(browser_name_lower)
+                service = service_cls(executable_path=str_path)
+                return driver_cls(service=service, options=options_obj)
             except WebDriverException as e:
                 _webdriver_factory_logger.critical(
                     f"Error al inicializar WebDriver manual para {browser_name}: {e}", exc_info=True
@@ -282,20 +356,16 @@ class WebDriverFactory:
         )
         return None
 
-    def _create_manager_driver(self, browser_name: str, options_obj) -> Optional[webdriver.Remote]:
+    def _create_manager_driver(self, browser_name: str, options_obj) -> Optional[RemoteWebDriver]:
         """Crea un WebDriver local usando webdriver_manager."""
         _webdriver_factory_logger.info("Configurado para usar webdriver_manager.")
         browser_name = browser_name.lower()
         try:
-            # Mapeo de configuración para evitar if/elif repetitivos (Clean Code)
-            drivers_map = {
-                "chrome": (ChromeService, ChromeDriverManager(chrome_type=ChromeType.GOOGLE), webdriver.Chrome),
-                "firefox": (FirefoxService, GeckoDriverManager(), webdriver.Firefox),
-                "edge": (EdgeService, EdgeChromiumDriverManager(), webdriver.Edge),
-            }
+            # Solo se importa y se instancia el manager del navegador solicitado
+            manager_inst = _driver_manager(browser_name)
 
-            if browser_name in drivers_map:
-                service_cls, manager_inst, driver_cls = drivers_map[browser_name]
+            if manager_inst is not None:
+                _, service_cls, driver_cls = _browser_classes(browser_name)
                 
                 # Instalar y obtener ruta del driver
                 driver_path = manager_inst.install()
@@ -345,8 +415,45 @@ class WebDriverFactory:
         mobile_device_name: Optional[str] = None,
         page_load_strategy: str = "normal",
         locale: str = "es-CL",
-    ) -> webdriver.Remote:
-        options_obj = self._get_browser_options(browser_name, headless, incognito, mobile_device_name, page_load_strategy, locale)
+        window_size: str = "maximized",
+        implicit_wait: Optional[int] = None,
+        page_load_timeout: Optional[int] = None,
+    ) -> RemoteWebDriver:
+        # Descargas y monitor de recursos (psutil) se importan al crear la primera sesión, no con el módulo
+        from src.utils.downloads import clear_download_dir, new_download_dir
+        from src.utils.resource_monitor import get_resource_monitor
+
+        download_dir = new_download_dir()
+
+        try:
+            driver = self._start_driver(browser_name, headless, use_manual_drivers, manual_drivers_path, incognito,
+                                        mobile_device_name, page_load_strategy, locale, window_size,
+                                        implicit_wait, page_load_timeout, download_dir)
+        except BaseException:
+            # Sin sesión no hay quien use (ni limpie) la carpeta de descargas
+            clear_download_dir(download_dir, remove=True)
+            raise
+
+        # Configuración post-creación: solo lo que no pudo expresarse en las opciones de lanzamiento
+        CommandCounter.attach(driver)
+        # En Grid la ruta corresponde al nodo: SeleniumUtils.wait_for_download solo aplica a drivers locales
+        driver.download_dir = str(download_dir)
+        # Registra el árbol de procesos de la sesión (driver + navegador) para medirlo y limpiarlo al cerrar
+        resource_monitor = get_resource_monitor()
+        if resource_monitor is not None:
+            resource_monitor.track(driver)
+        if browser_name.lower() == "firefox" and not headless and window_size == "maximized":
+            driver.maximize_window()
+        return driver
+
+    def _start_driver(self, browser_name, headless, use_manual_drivers, manual_drivers_path, incognito,
+                      mobile_device_name, page_load_strategy, locale, window_size, implicit_wait,
+                      page_load_timeout, download_dir) -> RemoteWebDriver:
+        """Crea la sesión: Selenium Grid, driver manual o WebDriverManager, en ese orden."""
+
+        options_obj = self._get_browser_options(browser_name, headless, incognito, mobile_device_name,
+                                                page_load_strategy, locale, window_size, implicit_wait,
+                                                page_load_timeout, download_dir)
         driver = None
 
         # 1. Intentar Selenium Grid
@@ -370,10 +477,7 @@ class WebDriverFactory:
         if not driver:
             driver = self._create_manager_driver(browser_name, options_obj)
 
-        # Configuración post-creación común (DRY)
         if driver:
-            if not headless:
-                driver.maximize_window()
             return driver
 
         # Si por alguna razón no se pudo inicializar ningún driver (ej. navegador no soportado en el bloque try)
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.file_lock import FileLock
+from src.utils.logger import get_logger
+from src.utils.stats import percentile
+
+logger = get_logger(__name__)
+
+_DEFAULT_STORE_PATH = PROJECT_ROOT / 'reports' / 'adaptive_timeouts.json'
+
+
+def locator_key(condition: str, locator: tuple) -> str:
+    """Clave de una espera: condición + estrategia + selector (p. ej. 'visible|xpath=//h6')."""
+
+    by_strategy, selector = locator
+
+    return f"{condition}|{by_strategy}={selector}"
+
+
+class AdaptiveTimeouts:
+    """
+    Timeouts por localizador aprendidos de la duración real de las esperas de SeleniumUtils.
+
+    Cada espera registra cuánto tardó su condición. Con al menos min_samples observaciones,
+    el timeout de esa clave pasa a ser percentil(pct) * factor + margin, acotado a [min_timeout, max_timeout]:
+    las verificaciones de ausencia fallan rápido en lugar de agotar el timeout completo, y los elementos
+    lentos reciben holgura. Sin historial suficiente se usa el timeout por defecto de la llamada.
+
+    Una espera que agota el timeout se registra como muestra censurada con el valor del timeout. No entra al
+    percentil (en una verificación de ausencia el timeout es el resultado esperado, no una duración): mientras
+    siga entre las últimas max_samples muestras, solo impide que el timeout aprendido baje del que falló, sin
+    superar nunca el default de la llamada. Así las verificaciones de ausencia repetidas no alargan su timeout.
+
+    Las muestras se persisten en un JSON compartido: save() fusiona las muestras nuevas de este proceso
+    con las del archivo bajo un lock, así que varios workers pueden guardar.
+    """
+
+    def __init__(self, store_path=None, pct: float = 95, factor: float = 1.5, margin: float = 0.5,
+                 min_timeout: float = 1.0, max_timeout: float = 30.0, min_samples: int = 5,
+                 max_samples: int = 50):
+
+        self.store_path = str(store_path or _DEFAULT_STORE_PATH)
+        self.pct = pct
+        self.factor = factor
+        self.margin = margin
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+
+        # Muestra = (segundos, agotó el timeout)
+        self._samples: Dict[str, List[Tuple[float, bool]]] = self._read_store()
+        self._new_samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _read_store(self) -> Dict[str, List[Tuple[float, bool]]]:
+
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as store_file:
+                stored = json.load(store_file).get('samples', {})
+        except (FileNotFoundError, ValueError):
+            return {}
+
+        # Versión 1: solo los segundos de las esperas exitosas
+        return {key: [(sample, False) if isinstance(sample, (int, float)) else (sample[0], bool(sample[1]))
+                      for sample in samples]
+                for key, samples in stored.items()}
+
+    def record(self, key: str, seconds: float, timed_out: bool = False):
+        """Registra una espera: lo que tardó la condición o, con timed_out=True, el timeout que agotó."""
+
+        sample = (round(seconds, 3), timed_out)
+
+        with self._lock:
+            samples = self._samples.setdefault(key, [])
+            samples.append(sample)
+            del samples[:-self.max_samples]
+            self._new_samples[key].append(sample)
+
+    def timeout_for(self, key: str, default: float) -> float:
+        """Timeout aprendido para key, o default si aún no hay suficientes muestras."""
+
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+
+        # Piso: el mayor timeout agotado entre las muestras recientes, acotado al default de la llamada
+        floor = min(max((seconds for seconds, timed_out in samples if timed_out), default=0.0), default)
+        durations = [seconds for seconds, timed_out in samples if not timed_out]
+
+        if len(durations) < self.min_samples:
+            return default
+
+        learned = percentile(durations, self.pct) * self.factor + self.margin
+
+        return round(max(min(max(learned, self.min_timeout), self.max_timeout), floor), 2)
+
+    def save(self):
+        """Fusiona las muestras nuevas de este proceso con el archivo persistido."""
+
+        with self._lock:
+            new_samples, self._new_samples = self._new_samples, defaultdict(list)
+
+        if not new_samples:
+            return
+
+        os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+
+        with FileLock(f"{self.store_path}.lock"):
+
+            stored = self._read_store()
+
+            for key, samples in new_samples.items():
+                stored[key] = (stored.get(key, []) + samples)[-self.max_samples:]
+
+            tmp_path = f"{self.store_path}.{os.getpid()}.tmp"
+            payload = {key: [[seconds, int(timed_out)] for seconds, timed_out in samples]
+                       for key, samples in stored.items()}
+
+            with open(tmp_path, 'w', encoding='utf-8') as store_file:
+                json.dump({'version': 2, 'samples': payload}, store_file, indent=1, sort_keys=True)
+
+            os.replace(tmp_path, self.store_path)
+
+        logger.info(f"Timeouts adaptativos: {sum(len(s) for s in new_samples.values())} muestras nuevas "
+                    f"guardadas en {self.store_path} ({len(stored)} localizadores).")
+
+
+# Instancia usada por SeleniumUtils. None = desactivado (se configura desde before_all).
+
+_adaptive_timeouts: Optional[AdaptiveTimeouts] = None
+
+
+def configure_adaptive_timeouts(**options) -> AdaptiveTimeouts:
+
+    global _adaptive_timeouts
+
+    _adaptive_timeouts = AdaptiveTimeouts(**options)
+
+    return _adaptive_timeouts
+
+
+def get_adaptive_timeouts() -> Optional[AdaptiveTimeouts]:
+
+    return _adaptive_timeouts
@@ -0,0 +1,259 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CASSETTE_MODES = ('off', 'record', 'replay')
+
+_CASSETTES_DIR = PROJECT_ROOT / 'features' / 'api' / 'cassettes'
+
+_CASSETTE_VERSION = 1
+
+_UNSAFE_CHARS = re.compile(r'[^\w.-]+')
+
+# Cabeceras que no se graban: varían en cada respuesta o ya no aplican al cuerpo decodificado
+_VOLATILE_HEADERS = frozenset({'date', 'set-cookie', 'connection', 'keep-alive', 'transfer-encoding',
+                               'content-encoding', 'content-length'})
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """La petición no está grabada en el cassette activo (modo replay)."""
+
+
+def _canonical_body(data=None, json_data=None) -> bytes:
+
+    if json_data is not None:
+        return json.dumps(json_data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    if isinstance(data, dict):
+        return urlencode(sorted(data.items()), doseq=True).encode('utf-8')
+
+    if isinstance(data, str):
+        return data.encode('utf-8')
+
+    return data or b''
+
+
+def request_fingerprint(method: str, url: str, params=None, data=None, json_data=None) -> str:
+    """
+    Huella normalizada de una petición: método + ruta (sin host, para que el cassette sirva en
+    cualquier entorno) + query ordenada (URL y params combinados) + hash del cuerpo canónico.
+    Las cabeceras no se incluyen (los tokens cambian en cada ejecución).
+
+    El cuerpo solo se guarda como hash: las credenciales de los logins no quedan en el cassette.
+    """
+
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/') or '/'
+
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    if params:
+        query += list(params.items()) if isinstance(params, dict) else list(params)
+
+    query_string = urlencode(sorted((str(k), str(v)) for k, v in query))
+
+    body_hash = hashlib.sha256(_canonical_body(data, json_data)).hexdigest()[:16]
+
+    return f"{method.upper()} {path}{'?' + query_string if query_string else ''} #{body_hash}"
+
+
+class Cassette:
+    """
+    Grabación de interacciones HTTP de un escenario, guardada como JSON comprimido con gzip.
+
+    - record: las peticiones van a la red y cada respuesta se agrega al cassette (se guarda con save()).
+    - replay: las respuestas se sirven desde el cassette sin acceso a red; una petición no grabada
+      lanza CassetteMissError y queda registrada en misses.
+
+    Si la misma petición se grabó varias veces, en replay se sirven en el mismo orden y la última se repite.
+
+    Cada respuesta guarda la hora en que se grabó (recorded_at): en replay, replayed_at toma la de la última
+    respuesta servida, para validar contra ella lo que depende del reloj (p. ej. el 'exp' de un JWT grabado).
+    """
+
+    def __init__(self, path: str, mode: str):
+
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Modo de cassette no soportado: '{mode}'. Opciones: record, replay")
+
+        self.path = str(path)
+        self.mode = mode
+        self.misses: List[str] = []
+        self.replayed_at: Optional[float] = None
+        self._interactions: Dict[str, List[dict]] = {}
+        self._replay_positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if mode == 'replay':
+            self._load()
+
+    def _load(self):
+
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as cassette_file:
+                self._interactions = json.load(cassette_file).get('interactions', {})
+        except FileNotFoundError:
+            logger.warning(f"Cassette no encontrado (todas las peticiones serán misses): {self.path}")
+
+    def __len__(self):
+
+        return sum(len(responses) for responses in self._interactions.values())
+
+    def record(self, fingerprint: str, response: requests.Response):
+
+        content = response.content or b''
+
+        try:
+            body = {'text': content.decode('utf-8')}
+        except UnicodeDecodeError:
+            body = {'base64': base64.b64encode(content).decode('ascii')}
+
+        entry = {
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in _VOLATILE_HEADERS},
+            'elapsed_s': response.elapsed.total_seconds(),
+            'recorded_at': round(time.time(), 3),
+            **body,
+        }
+
+        with self._lock:
+            self._interactions.setdefault(fingerprint, []).append(entry)
+
+    def replay(self, fingerprint: str, method: str, url: str) -> requests.Response:
+
+        with self._lock:
+
+            responses = self._interactions.get(fingerprint)
+
+            if not responses:
+                self.misses.append(fingerprint)
+                raise CassetteMissError(f"Petición no grabada en el cassette {os.path.basename(self.path)}: "
+                                        f"{fingerprint}")
+
+            position = self._replay_positions.get(fingerprint, 0)
+            self._replay_positions[fingerprint] = position + 1
+            entry = responses[min(position, len(responses) - 1)]
+            self.replayed_at = entry.get('recorded_at')
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response._content = (entry['text'].encode('utf-8') if 'text' in entry
+                             else base64.b64decode(entry.get('base64', '')))
+        response.encoding = 'utf-8'
+        response.url = url
+        response.elapsed = timedelta(seconds=entry.get('elapsed_s', 0))
+        response.request = requests.Request(method, url).prepare()
+
+        return response
+
+    def save(self):
+        """Escribe el cassette (solo en modo record y si hubo interacciones) de forma atómica."""
+
+        if self.mode != 'record' or not self._interactions:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+
+        with self._lock:
+            payload = {'version': _CASSETTE_VERSION, 'interactions': self._interactions}
+
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as cassette_file:
+            json.dump(payload, cassette_file, separators=(',', ':'))
+
+        os.replace(tmp_path, self.path)
+
+        logger.info(f"Cassette grabado ({len(self)} interacciones): {self.path}")
+
+
+# Cassette activo del proceso: lo consulta ApiUtils en cada petición
+
+_active_cassette: Optional[Cassette] = None
+
+# Misses acumulados de toda la ejecución (cassette -> huellas), para el resumen de after_all
+_run_misses: Dict[str, List[str]] = {}
+
+
+def cassette_path(feature_name: str, scenario_name: str, cassette_dir=None) -> str:
+
+    def _safe(name):
+        return _UNSAFE_CHARS.sub('_', name).strip('_')[:80] or 'unnamed'
+
+    return os.path.join(str(cassette_dir or _CASSETTES_DIR), _safe(feature_name), f"{_safe(scenario_name)}.json.gz")
+
+
+def activate_cassette(path: str, mode: str) -> Optional[Cassette]:
+    """Activa un cassette para las peticiones siguientes de ApiUtils. Con mode='off' no hace nada."""
+
+    global _active_cassette
+
+    if mode == 'off':
+        return None
+
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"Modo de cassette no soportado: '{mode}'. Opciones: {', '.join(CASSETTE_MODES)}")
+
+    _active_cassette = Cassette(path, mode)
+
+    logger.info(f"Cassette activo ({mode}): {path}")
+
+    return _active_cassette
+
+
+def deactivate_cassette():
+    """Desactiva el cassette activo, guardándolo si estaba grabando y acumulando sus misses."""
+
+    global _active_cassette
+
+    cassette, _active_cassette = _active_cassette, None
+
+    if cassette is None:
+        return
+
+    cassette.save()
+
+    if cassette.misses:
+        _run_misses.setdefault(cassette.path, []).extend(cassette.misses)
+
+
+def get_active_cassette() -> Optional[Cassette]:
+
+    return _active_cassette
+
+
+def reference_time() -> float:
+    """
+    Hora contra la que se validan las expiraciones de las respuestas: en replay, la hora de grabación de la
+    última respuesta servida (un token grabado conserva su 'exp' original); en otro caso, time.time().
+    """
+
+    cassette = _active_cassette
+
+    if cassette is not None and cassette.mode == 'replay' and cassette.replayed_at is not None:
+        return cassette.replayed_at
+
+    return time.time()
+
+
+def get_cassette_misses() -> Dict[str, List[str]]:
+
+    return dict(_run_misses)
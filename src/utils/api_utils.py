@@ -1,105 +1,406 @@
+import socket
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.cookiejar import DefaultCookiePolicy
+from collections import deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
 import requests
-import json
-import os
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+from src.utils.api_cassette import CassetteMissError, get_active_cassette, request_fingerprint
 from src.utils.logger import get_logger
+from src.utils.log_context import lazy
 from src.config.config_reader import ConfigReader
 _api_utils_logger = get_logger(__name__)  # Obtener instancia del logger para este módulo
 
+# Solo los métodos idempotentes se reintentan ante errores de lectura o códigos de estado transitorios.
+# Los errores de conexión (la petición nunca llegó al servidor) se reintentan para cualquier método.
 
-class ApiUtils:
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'})
 
-    def __init__(self, env='qa'):  # Default environment for API calls
+RETRY_STATUS_CODES = (429, 502, 503, 504)
 
-        self.config_reader = ConfigReader()
+# Cantidad máxima de mediciones de tiempo que conserva cada ApiUtils
 
-        self.base_url = self.config_reader.get_api_base_url(env)
+_MAX_TIMINGS = 1000
 
-        self.timeout = self.config_reader.get_api_timeout()
+# Sesiones compartidas por host: (esquema, host, pool, reintentos, backoff) -> requests.Session.
+# Todas las instancias de ApiUtils contra un mismo host reutilizan el mismo pool de conexiones keep-alive.
 
-        self.logger = _api_utils_logger.get_logger()
+_sessions: Dict[Tuple, requests.Session] = {}
 
-        _api_utils_logger.info(f"ApiUtils inicializado para el entorno: {env} con URL base: {self.base_url}")
+_sessions_lock = threading.Lock()
 
-        self.logger = _api_utils_logger
+# Deadline (time.monotonic) de la llamada en curso en este hilo; lo fija AsyncApiUtils con call_deadline()
+
+_call_deadline = threading.local()
+
+# Conexiones con una petición en curso (para abortarlas) y estado de aborto activo (ver abort_requests)
+
+_inflight_connections = weakref.WeakSet()
+
+_inflight_lock = threading.Lock()
+
+_aborted = threading.Event()
+
+
+class _DeadlineRetry(Retry):
+    """
+    Retry que no inicia otro intento si venció el call_deadline del hilo que hace la petición,
+    ni mientras las peticiones estén abortadas (abort_requests).
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+
+        if _aborted.is_set():
+            raise MaxRetryError(_pool, url, error or ResponseError("petición abortada por el watchdog"))
+
+        deadline = getattr(_call_deadline, 'value', None)
+
+        if deadline is not None and time.monotonic() >= deadline:
+            raise MaxRetryError(_pool, url, error or ResponseError("tiempo total de la llamada agotado"))
+
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class _TrackingPoolMixin:
+    """Registra las conexiones mientras atienden una petición, para poder cerrarlas desde otro hilo."""
+
+    def _get_conn(self, timeout=None):
+
+        conn = super()._get_conn(timeout)
+
+        with _inflight_lock:
+            _inflight_connections.add(conn)
+
+        return conn
+
+    def _put_conn(self, conn):
+
+        if conn is not None:
+            with _inflight_lock:
+                _inflight_connections.discard(conn)
+
+        super()._put_conn(conn)
+
+
+class _TrackingHTTPConnectionPool(_TrackingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _TrackingHTTPSConnectionPool(_TrackingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _AbortableHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter cuyos pools registran las conexiones en uso (ver abort_requests)."""
+
+    def init_poolmanager(self, *args, **kwargs):
+
+        super().init_poolmanager(*args, **kwargs)
+
+        self.poolmanager.pool_classes_by_scheme = {'http': _TrackingHTTPConnectionPool,
+                                                   'https': _TrackingHTTPSConnectionPool}
+
+
+def abort_requests() -> int:
+    """
+    Aborta las peticiones de ApiUtils en curso (lo usa el watchdog de pasos cuando un paso sin driver se cuelga):
+    cierra los sockets de las conexiones en uso, de modo que la petición bloqueada falla con ConnectionError,
+    y hasta resume_requests() no se reintenta ni se envía ninguna petición nueva.
+
+    :return: Cantidad de conexiones cerradas.
+    """
+
+    _aborted.set()
+
+    with _inflight_lock:
+        connections = list(_inflight_connections)
+
+    closed = 0
+
+    for conn in connections:
+        sock = getattr(conn, 'sock', None)
+        if sock is None:
+            continue
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+            closed += 1
+        except OSError:
+            pass
+
+    return closed
+
+
+def resume_requests():
+    """Vuelve a permitir peticiones después de abort_requests() (al desarmar el watchdog)."""
+
+    _aborted.clear()
+
+
+def get_pooled_session(base_url: str, pool_size: int = 10, max_retries: int = 3,
+                       backoff_factor: float = 0.3) -> requests.Session:
+    """
+    Retorna la sesión compartida (con pool de conexiones y reintentos) para el host de base_url.
+    """
+
+    parts = urlsplit(base_url)
+    key = (parts.scheme, parts.netloc, pool_size, max_retries, backoff_factor)
+
+    with _sessions_lock:
+
+        session = _sessions.get(key)
+
+        if session is None:
+
+            retry = _DeadlineRetry(
+                total=max_retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=IDEMPOTENT_METHODS,
+                raise_on_status=False,  # Se retorna la última respuesta; raise_for_status decide
+                respect_retry_after_header=True,
+            )
+
+            adapter = _AbortableHTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
 
+            session = requests.Session()
+            # La sesión se comparte entre clientes y escenarios: no guarda cookies de las respuestas.
+            # Las cookies de cada petición (p. ej. la sesión del navegador) se pasan explícitamente.
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            session.mount(f"{parts.scheme}://{parts.netloc}", adapter)
 
-def _send_request(self, method, endpoint, headers=None, data=None, json_data=None, params=None):
-    url = f"{self.base_url}{endpoint}"
+            _sessions[key] = session
 
-    self.logger.info(f"Sending {method} request to: {url}")
+            _api_utils_logger.info(
+                f"Sesión HTTP creada para {parts.scheme}://{parts.netloc} "
+                f"(pool: {pool_size}, reintentos: {max_retries}, backoff: {backoff_factor})")
 
-    self.logger.debug(f"Headers: {headers}")
+        return session
 
-    self.logger.debug(f"Data: {data}")
 
-    self.logger.debug(f"JSON Data: {json_data}")
+def close_pooled_sessions():
+    """Cierra todas las sesiones compartidas y sus conexiones (se invoca en after_all)."""
 
-    self.logger.debug(f"Params: {params}")
+    with _sessions_lock:
+
+        for session in _sessions.values():
+            session.close()
+
+        _sessions.clear()
+
+
+@contextmanager
+def call_deadline(deadline: float):
+    """
+    Acota todas las peticiones de ApiUtils hechas en este hilo dentro del bloque a un deadline común
+    (time.monotonic): cada petición usa timeout=min(api_timeout, tiempo restante), no se hacen reintentos
+    después del deadline y, si ya pasó, la petición falla con requests.exceptions.Timeout sin enviarse.
+
+    Uso:
+        with call_deadline(time.monotonic() + 30):
+            login_actions.get_auth_token(username, password)
+    """
+
+    previous = getattr(_call_deadline, 'value', None)
+    _call_deadline.value = deadline
 
     try:
+        yield
+    finally:
+        _call_deadline.value = previous
 
-        response = requests.request(
 
-            method,
+class ApiUtils:
+    """
+    Cliente HTTP de la capa API. Usa una sesión compartida por host (keep-alive y pool de conexiones
+    configurable), reintentos con backoff para métodos idempotentes, y registra el tiempo de cada petición.
+    """
 
-            url,
+    def __init__(self, env='qa', base_url: Optional[str] = None,
+                 config_reader: Optional[ConfigReader] = None,
+                 pool_size: Optional[int] = None):  # Default environment for API calls
 
-            headers=headers,
+        self.config_reader = config_reader or ConfigReader()
 
-            data=data,
+        env_config = self.config_reader.get_environment_config(env)
 
-            json=json_data,
+        self.env = env
 
-            params=params,
+        # base_url explícita (p. ej. un servidor local) tiene prioridad sobre api_base_url del entorno
+        self.base_url = f"{(base_url or env_config.get('api_base_url')).rstrip('/')}/"
 
-            timeout=self.timeout
+        self.timeout = env_config.get('api_timeout')
 
+        self.session = get_pooled_session(
+            self.base_url,
+            # pool_size explícito (p. ej. el generador de carga, según sus hilos) tiene prioridad sobre api_pool_size
+            pool_size=pool_size or env_config.get('api_pool_size', 10),
+            max_retries=env_config.get('api_max_retries', 3),
+            backoff_factor=env_config.get('api_backoff_factor', 0.3),
         )
 
-        self.logger.info(f"Received response from {url} with status code: {response.status_code}")
+        # Tiempos por petición: {'method', 'url', 'status', 'elapsed_s', 'server_elapsed_s'}
+        self.timings = deque(maxlen=_MAX_TIMINGS)
+
+        self.last_timing = None
+
+        self.logger = _api_utils_logger
+
+        self.logger.info(f"ApiUtils inicializado para el entorno: {env} con URL base: {self.base_url}")
+
+    def _build_url(self, endpoint: str) -> str:
+
+        return f"{self.base_url}{endpoint.lstrip('/')}"
+
+    def _request_timeout(self) -> Optional[float]:
+        """api_timeout, acotado por el tiempo restante del call_deadline activo en este hilo (si hay uno)."""
+
+        deadline = getattr(_call_deadline, 'value', None)
+
+        if deadline is None:
+            return self.timeout
+
+        remaining = deadline - time.monotonic()
+
+        if remaining <= 0:
+            raise requests.exceptions.Timeout("Se agotó el tiempo total de la llamada antes de enviar la petición")
+
+        return remaining if not self.timeout else min(self.timeout, remaining)
+
+    def _record_timing(self, method: str, url: str, status, elapsed: float, response=None):
+
+        self.last_timing = {
+            'method': method,
+            'url': url,
+            'status': status,
+            'elapsed_s': round(elapsed, 6),
+            'server_elapsed_s': response.elapsed.total_seconds() if response is not None else None,
+        }
+
+        self.timings.append(self.last_timing)
+
+    def _send_request(self, method, endpoint, headers=None, data=None, json_data=None, params=None, cookies=None):
+
+        url = self._build_url(endpoint)
+
+        self.logger.debug(f"Sending {method} request to: {url}")
+
+        self.logger.debug("Headers: %s", lazy(headers))
+
+        self.logger.debug("Data: %s", lazy(data))
+
+        self.logger.debug("JSON Data: %s", lazy(json_data))
+
+        self.logger.debug("Params: %s", lazy(params))
+
+        # Cassette de grabación/reproducción (ver src/utils/api_cassette.py); None si está desactivado
+        cassette = get_active_cassette()
+
+        fingerprint = request_fingerprint(method, url, params, data, json_data) if cassette is not None else None
+
+        started = time.perf_counter()
+
+        try:
+
+            if cassette is not None and cassette.mode == 'replay':
+
+                response = cassette.replay(fingerprint, method, url)
+
+            else:
+
+                if _aborted.is_set():
+                    raise requests.exceptions.ConnectionError("Petición abortada por el watchdog de pasos")
+
+                timeout = self._request_timeout()
+
+                response = self.session.request(
+
+                    method,
+
+                    url,
+
+                    headers=headers,
+
+                    data=data,
+
+                    json=json_data,
+
+                    params=params,
+
+                    cookies=cookies,
+
+                    timeout=timeout
+
+                )
+
+                if cassette is not None:
+                    cassette.record(fingerprint, response)
+
+            self._record_timing(method, url, response.status_code, time.perf_counter() - started, response)
+
+            self.logger.debug(f"Received response from {url} with status code: {response.status_code} "
+                              f"in {self.last_timing['elapsed_s'] * 1000:.1f} ms")
+
+            self.logger.debug("Response body: %s", lazy(lambda: response.text))
+
+            response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx)
 
-        self.logger.debug(f"Response body: {response.text}")
+            return response
 
-        response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx)
+        except requests.exceptions.HTTPError as e:
 
-        return response
+            self.logger.error(f"HTTP Error: {e.response.status_code} - {e.response.text}")
 
-    except requests.exceptions.HTTPError as e:
+            raise
 
-        self.logger.error(f"HTTP Error: {e.response.status_code} - {e.response.text}")
+        except requests.exceptions.ConnectionError as e:
 
-        raise
+            self._record_timing(method, url, None, time.perf_counter() - started)
 
-    except requests.exceptions.ConnectionError as e:
+            self.logger.error(f"Connection Error: {e}")
 
-        self.logger.error(f"Connection Error: {e}")
+            raise
 
-        raise
+        except requests.exceptions.Timeout as e:
 
-    except requests.exceptions.Timeout as e:
+            self._record_timing(method, url, None, time.perf_counter() - started)
 
-        self.logger.error(f"Timeout Error: {e}")
+            self.logger.error(f"Timeout Error: {e}")
 
-        raise
+            raise
 
-    except requests.exceptions.RequestException as e:
+        except CassetteMissError as e:
 
-        self.logger.error(f"Request Exception: {e}")
+            self.logger.error(f"Cassette miss: {e}")
 
-        raise
+            raise
 
+        except requests.exceptions.RequestException as e:
 
-def get(self, endpoint, headers=None, params=None):
-    return self._send_request("GET", endpoint, headers=headers, params=params)
+            self.logger.error(f"Request Exception: {e}")
 
+            raise
 
-def post(self, endpoint, headers=None, data=None, json_data=None):
-    return self._send_request("POST", endpoint, headers=headers, data=data, json_data=json_data)
+    def get(self, endpoint, headers=None, params=None, cookies=None):
+        return self._send_request("GET", endpoint, headers=headers, params=params, cookies=cookies)
 
+    def post(self, endpoint, headers=None, data=None, json_data=None, cookies=None):
+        return self._send_request("POST", endpoint, headers=headers, data=data, json_data=json_data, cookies=cookies)
 
-def put(self, endpoint, headers=None, data=None, json_data=None):
-    return self._send_request("PUT", endpoint, headers=headers, data=data, json_data=json_data)
+    def put(self, endpoint, headers=None, data=None, json_data=None, cookies=None):
+        return self._send_request("PUT", endpoint, headers=headers, data=data, json_data=json_data, cookies=cookies)
 
+    def patch(self, endpoint, headers=None, data=None, json_data=None, cookies=None):
+        return self._send_request("PATCH", endpoint, headers=headers, data=data, json_data=json_data,
+                                  cookies=cookies)
 
-def delete(self, endpoint, headers=None, params=None):
-    return self._send_request("DELETE", endpoint, headers=headers, params=params)
+    def delete(self, endpoint, headers=None, params=None, cookies=None):
+        return self._send_request("DELETE", endpoint, headers=headers, params=params, cookies=cookies)
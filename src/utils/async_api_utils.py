@@ -0,0 +1,120 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Iterable, List, Optional
+
+from src.utils.api_utils import ApiUtils, call_deadline
+from src.utils.logger import get_logger
+
+_async_api_utils_logger = get_logger(__name__)
+
+
+class AsyncApiUtils:
+    """
+    Variante asyncio de ApiUtils para escenarios que necesitan muchas peticiones concurrentes.
+
+    Las peticiones se ejecutan sobre la misma sesión HTTP con pool de conexiones de ApiUtils, en un
+    ThreadPoolExecutor propio. La concurrencia se acota con un semáforo (max_concurrency) y cada
+    llamada tiene un timeout total (call_timeout) que incluye los reintentos.
+
+    asyncio.wait_for por sí solo no cancela nada: deja de esperar, pero el hilo del executor sigue bloqueado
+    en la petición y ocupando su lugar. Por eso el mismo deadline se pasa a requests (call_deadline): cada
+    petición de la llamada usa como timeout= el tiempo restante, y las que empiezan después del deadline
+    fallan sin enviarse, así que el hilo termina poco después de vencer call_timeout.
+    """
+
+    def __init__(self, env: str = 'qa', base_url: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 call_timeout: Optional[float] = None, api_utils: Optional[ApiUtils] = None):
+
+        self.api_utils = api_utils or ApiUtils(env, base_url=base_url)
+
+        env_config = self.api_utils.config_reader.get_environment_config(self.api_utils.env)
+
+        self.max_concurrency = max_concurrency or env_config.get('api_max_concurrency', 10)
+
+        self.call_timeout = call_timeout or env_config.get('api_call_timeout', 60)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='api-async')
+
+        # El semáforo pertenece a un event loop concreto; se recrea si cambia el loop (p. ej. un asyncio.run por paso)
+        self._semaphore = None
+
+        self._semaphore_loop = None
+
+        _async_api_utils_logger.info(
+            f"AsyncApiUtils inicializado (concurrencia máxima: {self.max_concurrency}, "
+            f"timeout por llamada: {self.call_timeout}s)")
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+
+        loop = asyncio.get_running_loop()
+
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+
+        return self._semaphore
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """
+        Ejecuta una llamada bloqueante del cliente API respetando el límite de concurrencia y el timeout.
+
+        :raises asyncio.TimeoutError: Si la llamada supera call_timeout.
+        """
+
+        async with self._get_semaphore():
+
+            loop = asyncio.get_running_loop()
+            deadline = time.monotonic() + self.call_timeout
+
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor,
+                                     functools.partial(_call_with_deadline, deadline, func, args, kwargs)),
+                timeout=self.call_timeout)
+
+    async def get(self, endpoint, headers=None, params=None):
+        return await self.run(self.api_utils.get, endpoint, headers=headers, params=params)
+
+    async def post(self, endpoint, headers=None, data=None, json_data=None):
+        return await self.run(self.api_utils.post, endpoint, headers=headers, data=data, json_data=json_data)
+
+    async def put(self, endpoint, headers=None, data=None, json_data=None):
+        return await self.run(self.api_utils.put, endpoint, headers=headers, data=data, json_data=json_data)
+
+    async def patch(self, endpoint, headers=None, data=None, json_data=None):
+        return await self.run(self.api_utils.patch, endpoint, headers=headers, data=data, json_data=json_data)
+
+    async def delete(self, endpoint, headers=None, params=None):
+        return await self.run(self.api_utils.delete, endpoint, headers=headers, params=params)
+
+    def close(self):
+        """Libera los hilos del executor (la sesión HTTP compartida se cierra en after_all)."""
+
+        self._executor.shutdown(wait=True)
+
+
+def _call_with_deadline(deadline: float, func: Callable, args: tuple, kwargs: dict):
+    """Ejecuta func en el hilo del executor con el deadline de la llamada activo para sus peticiones."""
+
+    with call_deadline(deadline):
+        return func(*args, **kwargs)
+
+
+def run_batch(calls: Iterable[Callable[[], Awaitable]], return_exceptions: bool = True) -> List:
+    """
+    Ejecuta concurrentemente un lote de llamadas async desde código síncrono (p. ej. un paso de Behave)
+    y retorna los resultados en el mismo orden de entrada.
+
+    Uso:
+        results = run_batch(lambda user=user: context.async_api_login_actions.get_auth_token(*user)
+                            for user in users)
+
+    :param calls: Fábricas sin argumentos que retornan una corrutina (una por llamada).
+    :param return_exceptions: Si es True, las excepciones se retornan en su posición en vez de propagarse.
+    """
+
+    async def _runner():
+        return await asyncio.gather(*(call() for call in calls), return_exceptions=return_exceptions)
+
+    return asyncio.run(_runner())
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class CommandCounter:
+    """
+    Cuenta los comandos WebDriver (round trips al driver o al Grid) que ejecuta una sesión.
+    Se guarda como driver.command_counter; la creación de la sesión (newSession) ya cuenta como uno.
+
+    Uso:
+        counter = CommandCounter.attach(driver)
+        ...
+        counter.total, counter.by_command
+    """
+
+    def __init__(self):
+
+        self.by_command = Counter({'newSession': 1})
+        self._marks = {}
+
+    @classmethod
+    def attach(cls, driver: WebDriver) -> 'CommandCounter':
+
+        counter = cls()
+        original_execute = driver.execute
+
+        def counting_execute(driver_command, params=None):
+            counter.by_command[driver_command] += 1
+            return original_execute(driver_command, params)
+
+        # Atributo de instancia: reemplaza execute solo para este driver
+        driver.execute = counting_execute
+        driver.command_counter = counter
+
+        return counter
+
+    @property
+    def total(self) -> int:
+
+        return sum(self.by_command.values())
+
+    def mark(self, name: str):
+        """Guarda el total actual con un nombre, para medir comandos entre dos puntos (ver since)."""
+
+        self._marks[name] = self.total
+
+    def since(self, name: str) -> int:
+
+        return self.total - self._marks.get(name, 0)
@@ -1,7 +1,11 @@
+import copy
+
 import json
 
 import os
 
+import threading
+
 from src.utils.logger import get_logger
 
 _common_logger = get_logger(__name__)
@@ -10,6 +14,13 @@ _common_logger = get_logger(__name__)
 
 _DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
 
+# Caché de archivos ya parseados: ruta -> (mtime_ns, tamaño, datos). Se invalida si el archivo cambia.
+# Para datasets grandes usar src/utils/data_source.py (lectura en streaming, sin cargar el archivo completo).
+
+_json_cache = {}
+
+_json_cache_lock = threading.Lock()
+
 
 def read_json_data(file_path: str) -> dict:
     """
@@ -30,13 +41,33 @@ def read_json_data(file_path: str) -> dict:
 
     try:
 
-        with open(full_path, 'r', encoding='utf-8') as f:
+        stat = os.stat(full_path)
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with _json_cache_lock:
+
+            cached = _json_cache.get(full_path)
+
+        if cached is None or cached[0] != signature:
+
+            with open(full_path, 'r', encoding='utf-8') as f:
+
+                data = json.load(f)
+
+            with _json_cache_lock:
+
+                _json_cache[full_path] = (signature, data)
+
+            _common_logger.debug(f"Datos cargados desde: {full_path}")
+
+        else:
 
-            data = json.load(f)
+            data = cached[1]
 
-            _common_logger.info(f"Datos cargados exitosamente desde: {full_path}")
+        # Copia: quien llama puede modificar los datos sin alterar la caché compartida
 
-            return data
+        return copy.deepcopy(data)
 
     except FileNotFoundError:
 
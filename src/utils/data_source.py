@@ -0,0 +1,166 @@
+import csv
+import json
+import mmap
+import os
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+_data_source_logger = get_logger(__name__)
+
+# Mismo directorio base que read_json_data (src/data)
+_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+SUPPORTED_EXTENSIONS = ('.jsonl', '.csv')
+
+
+class DataSource:
+    """
+    Acceso en streaming a datasets grandes en JSON Lines (.jsonl) o CSV (.csv), sin cargarlos completos.
+
+    - La iteración recorre el archivo mapeado en memoria (mmap) fila por fila.
+    - get(key) usa un índice clave -> offset que se construye en el primer acceso con una sola pasada
+      y se invalida si cambian el mtime o el tamaño del archivo; luego cada búsqueda lee y parsea solo esa línea.
+
+    En CSV, cada registro debe ocupar una sola línea (sin saltos de línea dentro de campos entre comillas).
+    """
+
+    def __init__(self, file_path: str, key_field: str = 'id'):
+
+        self.path = file_path if os.path.isabs(file_path) else os.path.join(_DATA_DIR, file_path)
+        self.key_field = key_field
+        self.extension = os.path.splitext(self.path)[1].lower()
+
+        if self.extension not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Formato de dataset no soportado: '{self.extension}'. Opciones: {SUPPORTED_EXTENSIONS}")
+
+        self._index: Optional[Dict[str, int]] = None
+        self._index_signature = None
+        self._header = None
+        self._lock = threading.Lock()
+
+    def _parse_line(self, line: bytes) -> dict:
+
+        text = line.decode('utf-8').rstrip('\r\n')
+
+        if self.extension == '.jsonl':
+            return json.loads(text)
+
+        return dict(zip(self._header, next(csv.reader([text]))))
+
+    def _lines(self, mapped: mmap.mmap) -> Iterator[Tuple[int, bytes]]:
+        """Retorna (offset, línea) de cada registro no vacío; en CSV lee antes la cabecera."""
+
+        offset = 0
+
+        if self.extension == '.csv':
+            header_line = mapped.readline()
+            self._header = next(csv.reader([header_line.decode('utf-8-sig').rstrip('\r\n')]))
+            offset = mapped.tell()
+
+        for line in iter(mapped.readline, b''):
+
+            if line.strip():
+                yield offset, line
+
+            offset += len(line)
+
+    def _open_mapped(self):
+
+        data_file = open(self.path, 'rb')
+
+        if os.fstat(data_file.fileno()).st_size == 0:
+            data_file.close()
+            return None, None
+
+        return data_file, mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __iter__(self) -> Iterator[dict]:
+
+        data_file, mapped = self._open_mapped()
+
+        if mapped is None:
+            return
+
+        try:
+            for _, line in self._lines(mapped):
+                yield self._parse_line(line)
+        finally:
+            mapped.close()
+            data_file.close()
+
+    def _ensure_index(self):
+
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        if self._index is not None and self._index_signature == signature:
+            return
+
+        index = {}
+        data_file, mapped = self._open_mapped()
+
+        if mapped is not None:
+            try:
+                for offset, line in self._lines(mapped):
+                    index[str(self._parse_line(line).get(self.key_field))] = offset
+            finally:
+                mapped.close()
+                data_file.close()
+
+        self._index, self._index_signature = index, signature
+
+        _data_source_logger.debug(f"Índice de '{self.path}' por '{self.key_field}': {len(index)} registros.")
+
+    def get(self, key) -> dict:
+        """
+        Retorna el registro cuyo key_field es key.
+
+        :raises KeyError: Si no existe.
+        """
+
+        with self._lock:
+
+            self._ensure_index()
+            offset = self._index.get(str(key))
+
+        if offset is None:
+            raise KeyError(f"No existe el registro {self.key_field}='{key}' en {self.path}")
+
+        with open(self.path, 'rb') as data_file:
+            data_file.seek(offset)
+            line = data_file.readline()
+
+        return self._parse_line(line)
+
+    def __contains__(self, key) -> bool:
+
+        with self._lock:
+            self._ensure_index()
+            return str(key) in self._index
+
+    def __len__(self) -> int:
+
+        with self._lock:
+            self._ensure_index()
+            return len(self._index)
+
+
+# Un DataSource (y su índice) por dataset y campo clave, compartido durante toda la ejecución
+
+_data_sources: Dict[Tuple[str, str], DataSource] = {}
+
+_data_sources_lock = threading.Lock()
+
+
+def get_data_source(file_path: str, key_field: str = 'id') -> DataSource:
+
+    with _data_sources_lock:
+
+        data_source = _data_sources.get((file_path, key_field))
+
+        if data_source is None:
+            data_source = _data_sources[(file_path, key_field)] = DataSource(file_path, key_field)
+
+        return data_source
@@ -0,0 +1,177 @@
+import fnmatch
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.logger import get_logger
+from src.utils.runtime import get_worker_id
+
+logger = get_logger(__name__)
+
+DOWNLOADS_ROOT = PROJECT_ROOT / 'downloads'
+
+# Archivos de descargas en curso: Chrome/Edge (.crdownload), Firefox (.part) y otros navegadores
+PARTIAL_SUFFIXES = ('.crdownload', '.part', '.partial', '.download', '.tmp')
+
+
+def new_download_dir() -> Path:
+    """Crea un directorio de descargas exclusivo para una sesión (downloads/<worker>_<id>)."""
+
+    download_dir = DOWNLOADS_ROOT / f"{get_worker_id()}_{uuid.uuid4().hex[:8]}"
+    download_dir.mkdir(parents=True, exist_ok=True)
+
+    return download_dir
+
+
+def clear_download_dir(download_dir, remove: bool = False):
+    """Vacía (o elimina, con remove=True) el directorio de descargas de una sesión."""
+
+    if not download_dir or not os.path.isdir(download_dir):
+        return
+
+    if remove:
+        shutil.rmtree(download_dir, ignore_errors=True)
+        return
+
+    for entry in os.scandir(download_dir):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def file_sha256(path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 de un archivo leído por bloques (no se carga completo en memoria)."""
+
+    digest = hashlib.sha256()
+
+    with open(path, 'rb') as data:
+        for chunk in iter(lambda: data.read(chunk_size), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _is_partial(name: str) -> bool:
+
+    return name.lower().endswith(PARTIAL_SUFFIXES)
+
+
+def _start_observer(download_dir: str, changed: threading.Event):
+    """
+    Observa download_dir con watchdog y marca changed ante cualquier cambio. Retorna el observer o None si
+    watchdog no está instalado. Se importa aquí para no cargarlo con el módulo (DriverLifecycle lo usa siempre).
+    """
+
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:  # watchdog es opcional: sin él la espera sondea el directorio
+        return None
+
+    class _ChangeHandler(FileSystemEventHandler):
+
+        def on_any_event(self, event):
+
+            changed.set()
+
+    observer = Observer()
+    observer.schedule(_ChangeHandler(), download_dir, recursive=False)
+    observer.start()
+
+    return observer
+
+
+def _completed_download(download_dir, pattern: Optional[str], ignore: set, sizes: dict,
+                        stable_for: float) -> Optional[Path]:
+    """
+    Retorna una descarga terminada o None. Se considera terminada cuando no queda ningún archivo parcial
+    en el directorio (Firefox crea el archivo final vacío junto al .part) y su tamaño no cambió durante stable_for.
+    """
+
+    names = os.listdir(download_dir)
+
+    if any(_is_partial(name) for name in names):
+        return None
+
+    now = time.monotonic()
+
+    for name in sorted(names):
+
+        if name in ignore or (pattern and not fnmatch.fnmatch(name, pattern)):
+            continue
+
+        path = Path(download_dir) / name
+
+        try:
+            size = path.stat().st_size
+        except OSError:
+            continue
+
+        previous = sizes.get(name)
+
+        if previous is None or previous[0] != size:
+            sizes[name] = (size, now)
+        elif now - previous[1] >= stable_for:
+            return path
+
+    return None
+
+
+def wait_for_download(download_dir, pattern: Optional[str] = None, timeout: float = 60.0,
+                      ignore: Iterable[str] = (), stable_for: float = 0.3, poll_interval: float = 0.5) -> Path:
+    """
+    Espera a que termine una descarga en download_dir y retorna su ruta.
+
+    Con la librería watchdog la espera se despierta con las notificaciones del sistema de archivos;
+    sin ella, sondea el directorio cada poll_interval segundos.
+
+    :param pattern: Patrón fnmatch del nombre esperado (ej. '*.csv'); None acepta cualquier archivo.
+    :param ignore: Nombres a ignorar (descargas ya consumidas en la sesión).
+    :raises TimeoutError: Si ninguna descarga terminó dentro de timeout.
+    """
+
+    download_dir = str(download_dir)
+    ignore = set(ignore)
+    sizes = {}
+    changed = threading.Event()
+    observer = _start_observer(download_dir, changed)
+
+    deadline = time.monotonic() + timeout
+
+    try:
+
+        while True:
+
+            changed.clear()
+            path = _completed_download(download_dir, pattern, ignore, sizes, stable_for)
+
+            if path is not None:
+                logger.info(f"Descarga completada: {path} ({path.stat().st_size} bytes)")
+                return path
+
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                raise TimeoutError(f"No terminó ninguna descarga{f' ({pattern})' if pattern else ''} "
+                                   f"en {download_dir} después de {timeout}s")
+
+            # Un candidato se revisa otra vez tras stable_for aunque no haya eventos nuevos; sin candidatos, con
+            # watchdog se espera el próximo evento (con un sondeo de respaldo) y sin él se sondea cada poll_interval
+            backstop = poll_interval if observer is None else 5.0
+            changed.wait(min(remaining, stable_for if sizes else backstop))
+
+    finally:
+
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=2)
@@ -0,0 +1,76 @@
+import os
+import time
+
+from src.utils.logger import get_logger
+
+_file_lock_logger = get_logger(__name__)
+
+
+class FileLock:
+    """
+    Lock entre procesos basado en un archivo creado de forma exclusiva (O_CREAT | O_EXCL).
+    Funciona igual en Windows y Linux y no depende de fcntl/msvcrt.
+
+    Si el proceso dueño muere sin liberar el lock, el archivo se considera abandonado
+    pasados stale_after segundos y se elimina.
+
+    Uso:
+        with FileLock('/ruta/recurso.lock'):
+            ...
+    """
+
+    def __init__(self, lock_path: str, timeout: float = 30.0, poll_interval: float = 0.05,
+                 stale_after: float = 120.0):
+
+        self.lock_path = str(lock_path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._fd = None
+
+    def acquire(self):
+
+        deadline = time.monotonic() + self.timeout
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+
+        while True:
+
+            try:
+                self._fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self._fd, str(os.getpid()).encode())
+                return self
+
+            except FileExistsError:
+
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > self.stale_after:
+                        _file_lock_logger.warning(f"Eliminando lock abandonado: {self.lock_path}")
+                        os.remove(self.lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue  # Se liberó entre el intento y la verificación
+
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"No se pudo obtener el lock {self.lock_path} en {self.timeout}s")
+
+                time.sleep(self.poll_interval)
+
+    def release(self):
+
+        if self._fd is not None:
+
+            os.close(self._fd)
+            self._fd = None
+
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.release()
@@ -0,0 +1,128 @@
+import html
+import os
+import re
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+
+from selenium.common.exceptions import WebDriverException
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.logger import get_logger
+
+try:
+    import allure
+    from allure_commons.types import AttachmentType
+except ImportError:  # allure-behave es opcional para el flight recorder
+    allure = None
+    AttachmentType = None
+
+logger = get_logger(__name__)
+
+_FLIGHT_RECORDER_DIR = PROJECT_ROOT / 'reports' / 'flight_recorder'
+
+# Modos de captura soportados:
+#   - 'page':    captura de la ventana completa.
+#   - 'element': recorte del elemento sobre el que se actuó (si ya no existe, se captura la ventana).
+CAPTURE_MODES = ('page', 'element')
+
+_UNSAFE_CHARS = re.compile(r'[^\w.-]+')
+
+Frame = namedtuple('Frame', ['sequence', 'timestamp', 'action', 'locator', 'png'])
+
+
+class FlightRecorder:
+    """
+    Buffer circular en memoria con las últimas capturas tomadas después de cada acción de SeleniumUtils.
+    No escribe nada a disco: en after_scenario se descarta si el escenario pasó, o se vuelca
+    como una tira ordenada (PNGs + index.html y adjuntos de Allure) si falló.
+    """
+
+    def __init__(self, capacity: int = 20, mode: str = 'page'):
+
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"Modo de captura no soportado: '{mode}'. Opciones: {CAPTURE_MODES}")
+
+        self.capacity = capacity
+        self.mode = mode
+        self._frames = deque(maxlen=capacity)
+        self._sequence = 0
+
+    def __len__(self):
+
+        return len(self._frames)
+
+    def capture(self, driver, action: str, locator=None, element=None):
+        """
+        Guarda en memoria una captura del estado actual. Nunca lanza excepciones:
+        un fallo del recorder no debe hacer fallar la acción que se está registrando.
+        """
+
+        png = None
+
+        try:
+
+            if self.mode == 'element' and element is not None:
+                try:
+                    png = element.screenshot_as_png
+                except WebDriverException:
+                    png = None  # El elemento pudo desaparecer tras la acción (p. ej. navegación)
+
+            if png is None:
+                png = driver.get_screenshot_as_png()
+
+        except WebDriverException as e:
+            logger.debug(f"Flight recorder: no se pudo capturar después de '{action}': {e}")
+            return
+
+        self._sequence += 1
+        self._frames.append(Frame(self._sequence, time.time(), action, locator, png))
+
+    def clear(self):
+
+        self._frames.clear()
+        self._sequence = 0
+
+    def flush(self, scenario_name: str, output_dir=None) -> str | None:
+        """
+        Escribe las capturas del buffer en orden y vacía el buffer.
+
+        :param scenario_name: Nombre del escenario (se usa para nombrar la carpeta).
+        :param output_dir: Carpeta base (por defecto reports/flight_recorder).
+        :return: Ruta de la carpeta con la tira de capturas, o None si el buffer estaba vacío.
+        """
+
+        if not self._frames:
+            return None
+
+        safe_name = _UNSAFE_CHARS.sub('_', scenario_name).strip('_')[:80] or 'scenario'
+        target_dir = os.path.join(str(output_dir or _FLIGHT_RECORDER_DIR),
+                                  f"{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        os.makedirs(target_dir, exist_ok=True)
+
+        strip_items = []
+
+        for frame in self._frames:
+
+            file_name = f"{frame.sequence:03d}_{_UNSAFE_CHARS.sub('_', frame.action)}.png"
+
+            with open(os.path.join(target_dir, file_name), 'wb') as png_file:
+                png_file.write(frame.png)
+
+            caption = f"#{frame.sequence} {frame.action} {frame.locator or ''}".strip()
+            strip_items.append(
+                f"<figure><img src='{file_name}' width='480'><figcaption>{html.escape(caption)}</figcaption></figure>")
+
+            if allure is not None:
+                allure.attach(frame.png, name=caption, attachment_type=AttachmentType.PNG)
+
+        with open(os.path.join(target_dir, 'index.html'), 'w', encoding='utf-8') as index_file:
+            index_file.write(
+                f"<html><head><meta charset='utf-8'><title>{html.escape(scenario_name)}</title></head>"
+                f"<body style='display:flex;flex-wrap:wrap;gap:8px'>{''.join(strip_items)}</body></html>")
+
+        logger.info(f"Flight recorder: {len(self._frames)} capturas volcadas en {target_dir}")
+
+        self.clear()
+
+        return target_dir
@@ -0,0 +1,284 @@
+"""
+Generador de carga para la capa API, reutilizando LoginActions.
+
+Dos modos:
+    - Tasa fija (--rps): planificación en lazo abierto. Cada petición tiene una hora de inicio prevista
+      (t0 + i / rps) y la latencia se mide desde esa hora, no desde que un hilo quedó libre. Así las
+      esperas por saturación del cliente o del servidor cuentan en la latencia (evita la "omisión
+      coordinada" que ocultan los scripts que lanzan la siguiente petición al terminar la anterior).
+    - Concurrencia fija (--concurrency): N usuarios virtuales en lazo cerrado, útil para medir throughput máximo.
+
+Uso:
+    python -m src.utils.load_generator --env bff-login --rps 20 --duration 30
+    python -m src.utils.load_generator --base-url http://127.0.0.1:8080/api --concurrency 10 --duration 10
+    python -m src.utils.load_generator --stub --stub-latency-ms 20 --rps 100 --duration 10
+
+El reporte (p50/p90/p99/max, errores por tipo y RPS logrado) se imprime y se agrega a
+reports/benchmarks/load.jsonl.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.logger import get_logger, setup_logging
+from src.utils.runtime import get_run_id
+from src.utils.stats import summarize
+
+_load_generator_logger = get_logger(__name__)
+
+_RESULTS_FILE = PROJECT_ROOT / 'reports' / 'benchmarks' / 'load.jsonl'
+
+
+def classify_error(error: BaseException) -> str:
+    """Clave de agrupación de un error para el desglose del reporte (p. ej. 'HTTP 503', 'ConnectTimeout')."""
+
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return f"HTTP {error.response.status_code}"
+
+    return type(error).__name__
+
+
+class LoadGenerator:
+    """
+    Ejecuta un flujo (callable sin argumentos) a tasa o concurrencia fija durante `duration` segundos
+    y acumula la latencia de cada ejecución.
+
+    :param flow: Flujo a medir; se considera fallido si lanza una excepción.
+    :param rps: Tasa objetivo (modo lazo abierto). Excluyente con concurrency.
+    :param concurrency: Usuarios virtuales simultáneos (modo lazo cerrado).
+    :param max_workers: Hilos disponibles en modo rps; si se agotan, las peticiones esperan y esa espera
+                        se refleja en la latencia.
+    """
+
+    def __init__(self, flow: Callable[[], object], duration: float, rps: Optional[float] = None,
+                 concurrency: Optional[int] = None, max_workers: int = 64):
+
+        if (rps is None) == (concurrency is None):
+            raise ValueError("Debe indicarse exactamente uno de rps o concurrency")
+
+        self.flow = flow
+        self.duration = duration
+        self.rps = rps
+        self.concurrency = concurrency
+        self.max_workers = max_workers
+
+        self._latencies: List[float] = []
+        self._service_times: List[float] = []
+        self._errors: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _execute(self, intended_start: float):
+
+        started = time.perf_counter()
+        error = None
+
+        try:
+            self.flow()
+        except Exception as e:
+            error = e
+
+        finished = time.perf_counter()
+
+        with self._lock:
+
+            self._latencies.append(finished - intended_start)
+            self._service_times.append(finished - started)
+
+            if error is not None:
+                self._errors[classify_error(error)] += 1
+
+    def _run_open_loop(self, t0: float) -> int:
+
+        interval = 1.0 / self.rps
+        total = int(self.duration * self.rps)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='load') as executor:
+
+            for i in range(total):
+
+                intended_start = t0 + i * interval
+                delay = intended_start - time.perf_counter()
+
+                if delay > 0:
+                    time.sleep(delay)
+
+                executor.submit(self._execute, intended_start)
+
+        return total
+
+    def _run_closed_loop(self, t0: float) -> int:
+
+        deadline = t0 + self.duration
+        sent = Counter()
+
+        def _virtual_user(worker_index: int):
+            while time.perf_counter() < deadline:
+                self._execute(time.perf_counter())
+                sent[worker_index] += 1
+
+        threads = [threading.Thread(target=_virtual_user, args=(i,), name=f"load-{i}", daemon=True)
+                   for i in range(self.concurrency)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return sum(sent.values())
+
+    def run(self) -> dict:
+        """Ejecuta la carga y retorna el reporte (latencias en milisegundos)."""
+
+        mode = f"rps={self.rps}" if self.rps is not None else f"concurrency={self.concurrency}"
+
+        _load_generator_logger.info(f"Iniciando carga ({mode}) durante {self.duration}s")
+
+        t0 = time.perf_counter()
+        sent = self._run_open_loop(t0) if self.rps is not None else self._run_closed_loop(t0)
+        elapsed = time.perf_counter() - t0
+
+        report = self.report(sent, elapsed)
+
+        _load_generator_logger.info(
+            f"Carga finalizada: {report['completed']} peticiones en {elapsed:.1f}s "
+            f"({report['achieved_rps']} rps, {report['errors_total']} errores)")
+
+        return report
+
+    def report(self, sent: int, elapsed: float) -> dict:
+
+        with self._lock:
+            latencies = list(self._latencies)
+            service_times = list(self._service_times)
+            errors = dict(self._errors)
+
+        def _in_ms(summary: Dict) -> Dict:
+            return {key: (round(value * 1000, 2) if key != 'count' else value) for key, value in summary.items()}
+
+        return {
+            'mode': 'open_loop' if self.rps is not None else 'closed_loop',
+            'target_rps': self.rps,
+            'concurrency': self.concurrency,
+            'duration_s': self.duration,
+            'elapsed_s': round(elapsed, 3),
+            'sent': sent,
+            'completed': len(latencies),
+            'achieved_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            'latency_ms': _in_ms(summarize(latencies)),
+            'service_time_ms': _in_ms(summarize(service_times)),
+            'errors_total': sum(errors.values()),
+            'errors': errors,
+        }
+
+
+def build_login_flow(env: str, base_url: Optional[str], username: str, password: str,
+                     flow_name: str = 'login', pool_size: Optional[int] = None) -> Callable[[], object]:
+    """
+    Construye el flujo a medir sobre LoginActions:
+        - login:        login_user (no usa la caché de tokens; cada ejecución es un login real).
+        - login_logout: login_user seguido de logout_user con el token obtenido.
+
+    pool_size debe cubrir los hilos que ejecutan el flujo; con un pool más chico las conexiones
+    sobrantes se abren y descartan en cada petición y ese costo se mide como latencia del servidor.
+    """
+
+    from src.actions.api.login.api_login_actions import LoginActions
+
+    login_actions = LoginActions(env, base_url=base_url, pool_size=pool_size)
+
+    def _login():
+        return login_actions.login_user(username, password)
+
+    def _login_logout():
+        response = login_actions.login_user(username, password)
+        token = response.get('access_token') or response.get('token')
+        login_actions.logout_user(token)
+
+    flows = {'login': _login, 'login_logout': _login_logout}
+
+    if flow_name not in flows:
+        raise ValueError(f"Flujo desconocido: {flow_name}. Opciones: {', '.join(flows)}")
+
+    return flows[flow_name]
+
+
+def main(argv: List[str] = None) -> int:
+
+    parser = argparse.ArgumentParser(description="Generador de carga para los servicios de login.")
+    parser.add_argument('--env', default='qa', help="Sección de environment.ini (ej. bff-login, mf-login, ms-login)")
+    parser.add_argument('--base-url', default=None, help="URL base explícita (ej. un servidor local)")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--rps', type=float, help="Tasa objetivo de peticiones por segundo (lazo abierto)")
+    mode.add_argument('--concurrency', type=int, help="Usuarios virtuales simultáneos (lazo cerrado)")
+    parser.add_argument('--duration', type=float, default=30.0, help="Duración en segundos (por defecto: 30)")
+    parser.add_argument('--flow', default='login', choices=('login', 'login_logout'))
+    parser.add_argument('--username', default=os.getenv('LOAD_USERNAME', 'load_user'))
+    parser.add_argument('--password', default=os.getenv('LOAD_PASSWORD', 'load_password'))
+    parser.add_argument('--max-workers', type=int, default=64, help="Hilos disponibles en modo --rps")
+    parser.add_argument('--stub', action='store_true',
+                        help="Inicia un servidor API local (src/utils/stub_api_server.py) y genera la carga contra él")
+    parser.add_argument('--stub-latency-ms', type=float, default=0)
+    parser.add_argument('--stub-jitter-ms', type=float, default=0)
+    parser.add_argument('--stub-error-rate', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    stub_server = None
+
+    if args.stub:
+        from src.utils.stub_api_server import StubApiServer
+
+        stub_server = StubApiServer(latency_ms=args.stub_latency_ms, jitter_ms=args.stub_jitter_ms,
+                                    error_rate=args.stub_error_rate).start()
+        args.base_url = stub_server.url
+
+    try:
+
+        # Un hilo por conexión: el pool HTTP se dimensiona con los hilos que generan la carga
+        pool_size = args.concurrency or args.max_workers
+
+        flow = build_login_flow(args.env, args.base_url, args.username, args.password, args.flow,
+                                pool_size=pool_size)
+
+        generator = LoadGenerator(flow, duration=args.duration, rps=args.rps, concurrency=args.concurrency,
+                                  max_workers=args.max_workers)
+
+        result = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'run_id': get_run_id(),
+            'env': args.env,
+            'base_url': args.base_url,
+            'stub': args.stub,
+            'flow': args.flow,
+            **generator.run(),
+        }
+
+    finally:
+
+        if stub_server is not None:
+            stub_server.stop()
+
+    os.makedirs(_RESULTS_FILE.parent, exist_ok=True)
+
+    with open(_RESULTS_FILE, 'a', encoding='utf-8') as results_file:
+        results_file.write(json.dumps(result) + '\n')
+
+    print(json.dumps(result, indent=2))
+
+    return 0 if result['completed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
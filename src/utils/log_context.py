@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+from src.utils.runtime import get_run_id, get_worker_id
+
+# Longitud máxima (en caracteres) de un payload diferido una vez formateado.
+# Se puede ajustar con la variable de entorno LOG_PAYLOAD_MAX_CHARS.
+
+_DEFAULT_PAYLOAD_MAX_CHARS = 2000
+
+# Campos de correlación que se inyectan en cada LogRecord
+
+CONTEXT_FIELDS = ('run_id', 'worker_id', 'feature', 'scenario', 'scenario_id', 'step', 'step_id')
+
+# Contexto actual de ejecución. Behave ejecuta los pasos en un único hilo, por lo que basta un
+# diccionario de módulo; se lee al CREAR el registro (hilo de la prueba), no al escribirlo.
+
+_log_context = {field: None for field in CONTEXT_FIELDS}
+
+
+def set_log_context(**fields):
+    """
+    Actualiza los campos de correlación (feature, scenario, step, ...) usados por los registros de log.
+    Los hooks de Behave lo invocan al comenzar cada feature, escenario y paso.
+    """
+
+    unknown = set(fields) - set(CONTEXT_FIELDS)
+
+    if unknown:
+        raise ValueError(f"Campos de contexto de log no soportados: {sorted(unknown)}")
+
+    _log_context.update(fields)
+
+
+def clear_log_context(*fields):
+    """Limpia los campos indicados (o todos los de feature/escenario/paso si no se indica ninguno)."""
+
+    for field in fields or ('feature', 'scenario', 'scenario_id', 'step', 'step_id'):
+        _log_context[field] = None
+
+
+def get_log_context() -> dict:
+
+    return dict(_log_context)
+
+
+class LazyPayload:
+    """
+    Envuelve un payload pesado (dict de configuración, capabilities, cuerpo de respuesta...) para que
+    solo se formatee si el registro pasa el nivel del logger. El resultado se trunca a max_chars.
+
+    Uso: logger.debug("Respuesta: %s", lazy(lambda: response.text))
+    """
+
+    __slots__ = ('_source', '_max_chars', '_rendered')
+
+    def __init__(self, source, max_chars: int = None):
+
+        self._source = source
+        self._max_chars = max_chars if max_chars is not None else int(
+            os.environ.get('LOG_PAYLOAD_MAX_CHARS', _DEFAULT_PAYLOAD_MAX_CHARS))
+        self._rendered = None
+
+    def __str__(self):
+
+        if self._rendered is None:
+
+            value = self._source() if callable(self._source) else self._source
+
+            text = value if isinstance(value, str) else repr(value)
+
+            if len(text) > self._max_chars:
+                text = f"{text[:self._max_chars]}...[truncado, {len(text)} caracteres]"
+
+            self._rendered = text
+
+        return self._rendered
+
+    __repr__ = __str__
+
+
+def lazy(source, max_chars: int = None) -> LazyPayload:
+    """Atajo para crear un LazyPayload (acepta un valor o un callable sin argumentos)."""
+
+    return LazyPayload(source, max_chars)
+
+
+def install_context_record_factory():
+    """
+    Instala (una sola vez) una fábrica de LogRecord que copia el contexto de correlación actual en
+    cada registro. Se hace en la creación del registro para que funcione también en modo asíncrono,
+    donde el formateo ocurre en el hilo del QueueListener.
+    """
+
+    current_factory = logging.getLogRecordFactory()
+
+    if getattr(current_factory, '_injects_log_context', False):
+        return
+
+    def record_factory(*args, **kwargs):
+
+        record = current_factory(*args, **kwargs)
+
+        for field, value in _log_context.items():
+            setattr(record, field, value)
+
+        return record
+
+    record_factory._injects_log_context = True
+
+    logging.setLogRecordFactory(record_factory)
+
+    set_log_context(run_id=get_run_id(), worker_id=get_worker_id())
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formatea cada registro como un objeto JSON compacto en una sola línea (JSON Lines).
+    Incluye los campos de correlación y, si el registro trae extra={'payload': ...}, el payload truncado.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+
+        for field in CONTEXT_FIELDS:
+
+            value = getattr(record, field, None)
+
+            if value is not None:
+                entry[field] = value
+
+        payload = getattr(record, 'payload', None)
+
+        if payload is not None:
+            entry['payload'] = str(payload if isinstance(payload, LazyPayload) else LazyPayload(payload))
+
+        if record.exc_info or record.exc_text:
+            entry['exc'] = record.exc_text or self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=str)
@@ -0,0 +1,216 @@
+import copy
+import glob
+import gzip
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.log_context import LazyPayload
+
+# Políticas soportadas cuando la cola de logging asíncrono está llena:
+#   - 'block':       el hilo productor espera (hasta block_timeout) a que haya espacio.
+#   - 'drop_new':    se descarta el registro que se intenta encolar.
+#   - 'drop_oldest': se descarta el registro más antiguo de la cola para hacer espacio.
+OVERFLOW_POLICIES = ('block', 'drop_new', 'drop_oldest')
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler con cola acotada y política de desborde configurable.
+
+    Los loggers solo encolan el registro (con el mensaje ya resuelto, ver prepare); el formateo final y la
+    escritura a consola/archivo los realiza el hilo del QueueListener, fuera del hilo de la prueba.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow_policy: str = 'block', block_timeout: float = 1.0):
+
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Política de desborde no soportada: '{overflow_policy}'. Opciones: {OVERFLOW_POLICIES}")
+
+        super().__init__(log_queue)
+
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def _count_dropped(self):
+
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+
+        """
+        Fija en el hilo productor todo lo que puede cambiar antes de que el listener lo formatee:
+        el mensaje (los argumentos pueden ser objetos mutables), el traceback de la excepción (como texto,
+        sin retener los frames) y el payload extra.
+        Los argumentos LazyPayload también se resuelven aquí: su origen (un dict, un lambda sobre la respuesta)
+        puede cambiar antes de que el listener lo lea. Lo que evitan es el formateo de los registros que no
+        pasan el nivel del logger, que nunca llegan a encolarse.
+        """
+
+        record = copy.copy(record)
+
+        record.msg = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+
+        payload = getattr(record, 'payload', None)
+
+        if payload is not None:
+            record.payload = str(payload if isinstance(payload, LazyPayload) else LazyPayload(payload))
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+
+        if self.overflow_policy == 'block':
+            self._put_blocking(record)
+        elif self.overflow_policy == 'drop_new':
+            self._put_drop_new(record)
+        else:
+            self._put_drop_oldest(record)
+
+    def _put_blocking(self, record: logging.LogRecord):
+
+        try:
+            self.queue.put(record, timeout=self.block_timeout)
+        except queue.Full:
+            self._count_dropped()
+
+    def _put_drop_new(self, record: logging.LogRecord):
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._count_dropped()
+
+    def _put_drop_oldest(self, record: logging.LogRecord):
+
+        # Libera espacio descartando el registro más antiguo
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self._count_dropped()
+                except queue.Empty:
+                    pass
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener que encola su centinela de parada de forma bloqueante, para que
+    stop() funcione aunque la cola acotada esté llena en ese momento.
+    """
+
+    def enqueue_sentinel(self):
+
+        self.queue.put(self._sentinel)
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler que comprime con gzip los segmentos rotados en un hilo de fondo
+    (automation.log.1.gz, automation.log.2.gz, ...) y aplica un tope de tamaño total al
+    directorio de logs, eliminando primero los segmentos comprimidos más antiguos.
+
+    :param max_total_bytes: Tamaño máximo del directorio de logs (0 = sin tope).
+    """
+
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding=None, delay=False,
+                 errors=None, max_total_bytes: int = 0):
+
+        super().__init__(filename, mode=mode, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding,
+                         delay=delay, errors=errors)
+
+        self.max_total_bytes = max_total_bytes
+        self.namer = self._gzip_namer
+        self.rotator = self._background_rotator
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-compressor')
+        self._pending = None
+
+        # Segmentos .pending de una ejecución anterior que terminó antes de comprimirlos: se comprimen
+        # ahora (en segundo plano), antes de que la próxima rotación los sobrescriba
+        leftovers = sorted(glob.glob(f"{glob.escape(self.baseFilename)}.*.pending"))
+
+        if leftovers:
+            self._pending = self._executor.submit(self._recover_pending, leftovers)
+
+    @staticmethod
+    def _gzip_namer(default_name: str) -> str:
+
+        return f"{default_name}.gz"
+
+    def _wait_pending(self):
+
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+
+    def doRollover(self):
+
+        # Si la compresión anterior aún no termina, se espera para no desplazar un .gz incompleto
+        self._wait_pending()
+        super().doRollover()
+
+    def _background_rotator(self, source: str, dest: str):
+
+        # El renombrado es inmediato; la compresión (lenta) ocurre fuera del hilo que escribe logs
+        pending_path = f"{dest[:-len('.gz')]}.pending"
+        os.replace(source, pending_path)
+        self._pending = self._executor.submit(self._compress, pending_path, dest)
+
+    def _compress(self, pending_path: str, dest: str):
+
+        with open(pending_path, 'rb') as src, gzip.open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+        os.remove(pending_path)
+        self._enforce_total_size()
+
+    def _recover_pending(self, leftovers):
+
+        for pending_path in leftovers:
+            try:
+                # Un .gz del mismo segmento, si existe, quedó incompleto: se reemplaza
+                self._compress(pending_path, f"{pending_path[:-len('.pending')]}.gz")
+            except OSError:
+                pass
+
+    def _enforce_total_size(self):
+
+        if not self.max_total_bytes:
+            return
+
+        logs_dir = os.path.dirname(self.baseFilename)
+        files = [path for path in glob.glob(os.path.join(logs_dir, '*')) if os.path.isfile(path)]
+        total = sum(os.path.getsize(path) for path in files)
+
+        # Solo se eliminan segmentos ya comprimidos (nunca los logs activos de otros workers)
+        compressed = sorted((path for path in files if path.endswith('.gz')), key=os.path.getmtime)
+
+        while total > self.max_total_bytes and compressed:
+            oldest = compressed.pop(0)
+            total -= os.path.getsize(oldest)
+            os.remove(oldest)
+
+    def close(self):
+
+        try:
+            self._wait_pending()
+            self._executor.shutdown(wait=True)
+        finally:
+            super().close()
@@ -0,0 +1,150 @@
+"""
+Herramienta para intercalar por timestamp los logs de varios workers.
+
+Uso:
+    python -m src.utils.log_merge                       # reports/logs/automation*.log* -> stdout
+    python -m src.utils.log_merge -o reports/logs/merged.log
+    python -m src.utils.log_merge reports/logs/automation.w1.log reports/logs/automation.w2.log
+
+Soporta logs de texto ('%Y-%m-%d %H:%M:%S.mmm - ...') y JSON Lines (campo 'ts'), incluidos
+los segmentos rotados comprimidos (.gz) y los que aún esperan compresión (.pending).
+Las líneas de continuación (p. ej. tracebacks) se mantienen junto al registro al que pertenecen.
+"""
+import argparse
+import glob
+import gzip
+import heapq
+import json
+import os
+import re
+import sys
+from typing import Iterator, List, Tuple
+
+from src.utils.definitions import PROJECT_ROOT
+
+_DEFAULT_PATTERN = str(PROJECT_ROOT / 'reports' / 'logs' / 'automation*.log*')
+
+_TEXT_TIMESTAMP = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:[.,]\d{3})?)')
+
+# automation.log -> 'main'; automation.w1.log(.N.gz) -> 'w1'
+_WORKER_FROM_FILE = re.compile(r'^automation(?:\.(?P<worker>[^.]+))?\.log')
+
+# Segmentos rotados: .N.gz o .N.pending (renombrado, aún sin comprimir)
+_SEGMENT_INDEX = re.compile(r'\.log\.(\d+)(?:\.gz|\.pending)?$')
+
+
+def _worker_of(path: str) -> str:
+
+    match = _WORKER_FROM_FILE.match(os.path.basename(path))
+
+    return (match.group('worker') or 'main') if match else os.path.basename(path)
+
+
+def _segment_order(path: str) -> int:
+    """Los segmentos rotados más antiguos tienen índice mayor (.5.gz es anterior a .1.gz)."""
+
+    match = _SEGMENT_INDEX.search(path)
+
+    return -int(match.group(1)) if match else 0
+
+
+def _open(path: str):
+
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def _timestamp_of(line: str):
+
+    if line.startswith('{'):
+        try:
+            return json.loads(line).get('ts', '').replace('T', ' ')
+        except ValueError:
+            return None
+
+    match = _TEXT_TIMESTAMP.match(line)
+
+    return match.group(1).replace(',', '.') if match else None
+
+
+def _iter_records(paths: List[str], worker: str) -> Iterator[Tuple[str, str]]:
+    """Recorre los segmentos de un worker (del más antiguo al más reciente) agrupando líneas por registro."""
+
+    for path in paths:
+
+        current_ts, lines = None, []
+
+        with _open(path) as log_file:
+
+            for raw_line in log_file:
+
+                line = raw_line.rstrip('\n')
+                timestamp = _timestamp_of(line)
+
+                if timestamp is not None:
+
+                    if lines:
+                        yield current_ts, '\n'.join(lines)
+
+                    current_ts = timestamp
+                    lines = [line if line.startswith('{') else f"[{worker}] {line}"]
+
+                elif lines:
+                    lines.append(line)
+
+        if lines:
+            yield current_ts, '\n'.join(lines)
+
+
+def merge_logs(paths: List[str]) -> Iterator[str]:
+    """
+    Retorna un iterador con los registros de todos los archivos, ordenados por timestamp.
+    Cada archivo se lee en streaming, sin cargarlo completo en memoria.
+    """
+
+    by_worker = {}
+    pending = {path[:-len('.pending')] for path in paths if path.endswith('.pending')}
+
+    for path in paths:
+        # Mientras exista el .pending, el .gz del mismo segmento está incompleto (compresión en curso)
+        if path.endswith('.gz') and path[:-len('.gz')] in pending:
+            continue
+        by_worker.setdefault(_worker_of(path), []).append(path)
+
+    streams = [_iter_records(sorted(worker_paths, key=_segment_order), worker)
+               for worker, worker_paths in sorted(by_worker.items())]
+
+    for _, record in heapq.merge(*streams, key=lambda item: item[0]):
+        yield record
+
+
+def main(argv: List[str] = None) -> int:
+
+    parser = argparse.ArgumentParser(description="Intercala por timestamp los logs de varios workers.")
+    parser.add_argument('paths', nargs='*', help=f"Archivos de log (por defecto: {_DEFAULT_PATTERN})")
+    parser.add_argument('-o', '--output', help="Archivo de salida (por defecto: stdout)")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or glob.glob(_DEFAULT_PATTERN)
+    paths = [path for path in paths if not args.output or os.path.abspath(path) != os.path.abspath(args.output)]
+
+    if not paths:
+        print("No se encontraron archivos de log para intercalar.", file=sys.stderr)
+        return 1
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    try:
+        for record in merge_logs(paths):
+            output.write(record + '\n')
+    finally:
+        if args.output:
+            output.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
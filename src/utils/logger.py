@@ -2,10 +2,24 @@ import logging
 
 import logging.config
 
+import logging.handlers
+
+import atexit
+
+import copy
+
 import os
 
+import queue
+
 import sys
 
+from src.utils.log_handlers import BoundedQueueHandler, BoundedQueueListener
+
+from src.utils.log_context import install_context_record_factory
+
+from src.utils.runtime import get_worker_id
+
 # Determinar la ruta raíz del proyecto 'vivienda'.
 
 # logger.py está en src/utils/, por lo que subimos tres niveles para llegar a 'vivienda'.
@@ -18,14 +32,21 @@ _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 _LOGS_DIR = os.path.join(_PROJECT_ROOT, 'reports', 'logs')
 
-# Asegurarse de que el directorio de logs exista antes de intentar configurar el logging
-
-if not os.path.exists(_LOGS_DIR):
-    os.makedirs(_LOGS_DIR, exist_ok=True)
+# El directorio de logs se crea en setup_logging(), no al importar este módulo
 
 # Nombre del archivo de log principal y su ruta completa
 
-_LOG_FILE_NAME = 'automation.log'
+# Cada worker escribe en su propio archivo (automation.<worker>.log) para que varios procesos
+# no compartan ni intercalen un mismo archivo. El worker por defecto ('main') conserva automation.log.
+# Para unificar los archivos por timestamp: python -m src.utils.log_merge
+
+_WORKER_ID = get_worker_id()
+
+_LOG_FILE_NAME = 'automation.log' if _WORKER_ID == 'main' else f'automation.{_WORKER_ID}.log'
+
+# Tope de tamaño total del directorio de logs (LOG_DIR_MAX_BYTES, por defecto 200 MB)
+
+_LOG_DIR_MAX_BYTES = int(os.environ.get('LOG_DIR_MAX_BYTES', 209715200))
 
 _FULL_LOG_FILE_PATH = os.path.join(_LOGS_DIR, _LOG_FILE_NAME)
 
@@ -44,12 +65,20 @@ LOGGING_CONFIG = {
 
         'standardFormatter': {  # Un formateador estándar para mensajes de log
 
-            'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            # Se incluyen milisegundos para poder intercalar por timestamp los logs de varios workers
+
+            'format': '%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s',
 
             'datefmt': '%Y-%m-%d %H:%M:%S'
 
         },
 
+        'jsonFormatter': {  # Un objeto JSON compacto por línea, con ids de corrida/worker/feature/escenario/paso
+
+            '()': 'src.utils.log_context.JsonLinesFormatter',
+
+        },
+
     },
 
     'handlers': {
@@ -66,9 +95,9 @@ LOGGING_CONFIG = {
 
         },
 
-        'fileHandler': {  # Un handler para guardar logs en un archivo rotatorio
+        'fileHandler': {  # Un handler para guardar logs en un archivo rotatorio (segmentos antiguos en .gz)
 
-            'class': 'logging.handlers.RotatingFileHandler',
+            'class': 'src.utils.log_handlers.CompressingRotatingFileHandler',
 
             'level': 'DEBUG',  # Guardar mensajes de DEBUG o superior en el archivo
 
@@ -82,6 +111,8 @@ LOGGING_CONFIG = {
 
             'backupCount': 5,  # Número de archivos de respaldo a mantener
 
+            'max_total_bytes': _LOG_DIR_MAX_BYTES,  # Tope de tamaño total del directorio de logs
+
             'encoding': 'utf-8'  # Codificación del archivo de log
 
         },
@@ -132,20 +163,169 @@ LOGGING_CONFIG = {
 # --- Fin de la Configuración de Logging embebida ---
 
 
-def setup_logging():
+# --- Modo de logging asíncrono (QueueHandler/QueueListener) ---
+
+# Se controla mediante variables de entorno para que aplique desde el primer import:
+#   LOG_ASYNC=true                  -> activa el modo asíncrono (por defecto: desactivado)
+#   LOG_QUEUE_SIZE=10000            -> capacidad máxima de la cola (memoria acotada)
+#   LOG_OVERFLOW_POLICY=block       -> 'block', 'drop_new' o 'drop_oldest'
+#   LOG_BLOCK_TIMEOUT=1.0           -> segundos que espera la política 'block' antes de descartar
+
+_DEFAULT_QUEUE_SIZE = 10000
+
+_DEFAULT_OVERFLOW_POLICY = 'block'
+
+# Listener y handler de cola activos (None si el modo asíncrono no está en uso)
+
+_queue_listener = None
+
+_queue_handler = None
+
+
+def _is_async_enabled() -> bool:
+
+    return os.environ.get('LOG_ASYNC', 'false').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _enable_async_logging():
+    """
+    Reemplaza los handlers de consola/archivo de los loggers configurados por un único
+    BoundedQueueHandler, y mueve esos handlers a un QueueListener que escribe en segundo plano.
+    """
+
+    global _queue_listener, _queue_handler
+
+    queue_size = int(os.environ.get('LOG_QUEUE_SIZE', _DEFAULT_QUEUE_SIZE))
+
+    overflow_policy = os.environ.get('LOG_OVERFLOW_POLICY', _DEFAULT_OVERFLOW_POLICY).strip().lower()
+
+    block_timeout = float(os.environ.get('LOG_BLOCK_TIMEOUT', 1.0))
+
+    root_logger = logging.getLogger()
+
+    automation_logger = logging.getLogger('automation')
+
+    # root y 'automation' comparten las mismas instancias de handlers creadas por dictConfig
+
+    target_handlers = []
+
+    for handler in root_logger.handlers + automation_logger.handlers:
+
+        if handler not in target_handlers:
+            target_handlers.append(handler)
+
+    log_queue = queue.Queue(maxsize=queue_size)
+
+    _queue_handler = BoundedQueueHandler(log_queue, overflow_policy=overflow_policy, block_timeout=block_timeout)
+
+    for configured_logger in (root_logger, automation_logger):
+
+        for handler in target_handlers:
+            configured_logger.removeHandler(handler)
+
+        configured_logger.addHandler(_queue_handler)
+
+    # respect_handler_level=True conserva los niveles propios de cada handler (INFO consola, DEBUG archivo)
+
+    _queue_listener = BoundedQueueListener(log_queue, *target_handlers, respect_handler_level=True)
+
+    _queue_listener.start()
+
+    automation_logger.info(
+        f"Logging asíncrono activado (cola: {queue_size}, política de desborde: '{overflow_policy}').")
+
+
+def shutdown_logging():
+    """
+
+    Detiene el QueueListener (si existe), vaciando la cola pendiente, y hace flush de todos los handlers.
+
+    Es seguro llamarlo varias veces; se invoca en after_all y también al salir del proceso.
+
+    """
+
+    global _queue_listener, _queue_handler
+
+    if _queue_listener is not None:
+
+        dropped = _queue_handler.dropped if _queue_handler else 0
+
+        # stop() encola un centinela y espera a que el hilo procese todos los registros pendientes
+
+        _queue_listener.stop()
+
+        for handler in _queue_listener.handlers:
+            handler.flush()
+
+        if dropped:
+            print(f"ADVERTENCIA: Se descartaron {dropped} registros de log por desborde de la cola asíncrona.",
+                  file=sys.stderr)
+
+        for configured_logger in (logging.getLogger(), logging.getLogger('automation')):
+            configured_logger.removeHandler(_queue_handler)
+
+            for handler in _queue_listener.handlers:
+                configured_logger.addHandler(handler)
+
+        _queue_listener = None
+
+        _queue_handler = None
+
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+
+atexit.register(shutdown_logging)
+
+
+def _is_structured_enabled() -> bool:
+
+    return os.environ.get('LOG_FORMAT', 'text').strip().lower() in ('json', 'jsonl')
+
+
+def setup_logging(async_mode: bool = None, structured: bool = None):
     """
 
     Configura el sistema de logging utilizando un diccionario de configuración embebido.
 
     Este método se encarga de aplicar la configuración de logging definida en LOGGING_CONFIG.
 
+    :param async_mode: Si es True, los handlers escriben desde un hilo QueueListener.
+                       Si es None, se decide con la variable de entorno LOG_ASYNC.
+
+    :param structured: Si es True, el archivo de log se escribe en JSON Lines (un objeto por registro).
+                       Si es None, se decide con la variable de entorno LOG_FORMAT=json.
+
     """
 
+    # Si ya había un listener activo (p. ej. reconfiguración en before_all), se vacía antes de reconfigurar
+
+    shutdown_logging()
+
+    # Asegurarse de que el directorio de logs exista antes de configurar el handler de archivo
+
+    os.makedirs(_LOGS_DIR, exist_ok=True)
+
     try:
 
+        # Los campos de correlación (run/worker/feature/escenario/paso) se añaden a cada registro
+
+        install_context_record_factory()
+
+        logging_config = LOGGING_CONFIG
+
+        if structured if structured is not None else _is_structured_enabled():
+
+            logging_config = copy.deepcopy(LOGGING_CONFIG)
+
+            logging_config['handlers']['fileHandler']['formatter'] = 'jsonFormatter'
+
         # Aquí es donde se aplica la configuración del diccionario al módulo logging
 
-        logging.config.dictConfig(LOGGING_CONFIG)
+        logging.config.dictConfig(logging_config)
+
+        if async_mode if async_mode is not None else _is_async_enabled():
+            _enable_async_logging()
 
         # Una vez configurado, obtenemos el logger 'automation' para registrar el éxito
 
@@ -197,28 +377,19 @@ def get_logger(name: str):
 
     :param name: El nombre del logger (generalmente __name__ del módulo que llama a esta función).
 
-    :return: Una instancia de logging.Logger ya configurada.
+    :return: Una instancia de logging.Logger (configurada una vez que se llama a setup_logging()).
 
     """
 
-    # Esta verificación asegura que el logging esté configurado si aún no lo está.
+    # No configura el logging: importar un módulo no debe tener efectos secundarios (archivos, handlers).
 
-    # Es una medida de seguridad, ya que setup_logging() se llama al importar este módulo.
+    # La configuración es explícita mediante setup_logging(), que se invoca en before_all de Behave
 
-    if not logging.getLogger().handlers:
-        setup_logging()
+    # o al inicio de cada herramienta de línea de comandos.
 
     return logging.getLogger(name)
 
 
-# --- Punto de entrada para la configuración del logging ---
-
-# Esta línea se ejecuta una vez cuando el módulo 'logger.py' es importado.
-
-# Asegura que el sistema de logging esté listo inmediatamente para ser usado por cualquier otra parte del framework.
-
-setup_logging()
-
 # --- Exportar una instancia de logger ---
 
 # Se exporta una instancia del logger 'automation' para facilitar su uso.
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from src.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = get_logger(__name__)
+
+# Totales de la ejecución (todos los drivers del proceso), para el resumen de after_all
+navigation_totals = Counter()
+
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """Normaliza una URL para compararla: esquema y host en minúsculas, sin fragmento ni '/' final."""
+
+    if not url:
+        return url
+
+    parts = urlsplit(url)
+
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/') or '/', parts.query, ''))
+
+
+class NavigationManager:
+    """
+    Navegación deduplicada para un driver (se guarda como driver.navigation).
+
+    Lleva registro de la última URL cargada y de si la página fue modificada desde entonces
+    (clicks o texto ingresado, ver SeleniumUtils). Si se pide navegar a la misma URL sobre una página
+    sin modificar, la carga se omite tras una verificación barata (una sola lectura de current_url
+    en lugar de una carga completa de la página). force=True siempre recarga.
+    """
+
+    def __init__(self, driver: WebDriver):
+
+        self.driver = driver
+        self.stats = Counter()  # loads, skipped, forced
+        self._requested_url = None
+        self._landed_url = None
+        self._dirty = True
+
+    def mark_dirty(self):
+        """Indica que la página cambió desde la última carga (la próxima navegación no se omite)."""
+
+        self._dirty = True
+
+    def _is_noop(self, url: str) -> bool:
+
+        if self._dirty or normalize_url(url) != self._requested_url:
+            return False
+
+        current = normalize_url(self.driver.current_url)
+
+        if current in (self._requested_url, self._landed_url):
+            return True
+
+        if self._landed_url is None:
+            # Primera verificación tras la carga: la app redirigió (p. ej. a /auth/login) sin interacción
+            # de por medio, así que esta es la página que produce la URL pedida.
+            self._landed_url = current
+            return True
+
+        return False
+
+    def navigate(self, url: str, force: bool = False) -> bool:
+        """
+        Navega a url salvo que el navegador ya esté en esa página sin modificaciones.
+
+        :return: True si se hizo la carga, False si se omitió.
+        """
+
+        if not force and self._is_noop(url):
+
+            self.stats['skipped'] += 1
+            navigation_totals['skipped'] += 1
+            logger.info(f"Navegación omitida (la página ya está cargada): {url}")
+
+            return False
+
+        self.driver.get(url)
+
+        self._requested_url = normalize_url(url)
+        self._landed_url = None
+        self._dirty = False
+
+        self.stats['loads'] += 1
+        navigation_totals['loads'] += 1
+
+        if force:
+            self.stats['forced'] += 1
+            navigation_totals['forced'] += 1
+
+        return True
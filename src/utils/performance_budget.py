@@ -0,0 +1,80 @@
+from typing import Dict, Mapping, Optional
+
+from src.utils.logger import get_logger
+from src.utils.stats import summarize
+from src.utils.web_metrics import metric_history
+
+logger = get_logger(__name__)
+
+# Métricas de carga de página (registro con new_document) y del paso, con su nombre para los mensajes
+PAGE_METRICS = {
+    'ttfb_ms': 'TTFB',
+    'dom_content_loaded_ms': 'DOMContentLoaded',
+    'load_ms': 'Carga (load)',
+    'fcp_ms': 'First Contentful Paint',
+    'lcp_ms': 'Largest Contentful Paint',
+}
+
+STEP_METRIC = 'step_ms'
+
+
+def budgets_from_config(config_env: Mapping, metrics) -> Dict[str, int]:
+    """Presupuestos budget_<métrica> configurados (> 0) en environment.ini para las métricas indicadas."""
+
+    budgets = {}
+
+    for metric in metrics:
+        limit = config_env.get(f"budget_{metric}", 0)
+        if limit:
+            budgets[metric] = limit
+
+    return budgets
+
+
+def _history_line(values, value: float) -> str:
+
+    if not values:
+        return "sin historial de corridas anteriores"
+
+    summary = summarize(values)
+    rank = 100.0 * sum(1 for sample in values if sample < value) / len(values)
+
+    return (f"historial (n={summary['count']}, corridas anteriores): p50 {summary['p50']:.0f} ms, "
+            f"p90 {summary['p90']:.0f} ms, máx {summary['max']:.0f} ms; "
+            f"este valor supera al {rank:.0f}% de las mediciones")
+
+
+def check_budgets(record: dict, budgets: Dict[str, int], label: Optional[str] = None):
+    """
+    Compara las métricas del registro con sus presupuestos.
+
+    :param label: Si se indica, el historial se filtra por ese paso (presupuestos de acciones).
+    :raises AssertionError: Con el detalle de cada presupuesto excedido (diferencia e historial).
+    """
+
+    violations = []
+    checked = []
+
+    for metric, limit in budgets.items():
+
+        value = record.get(metric)
+
+        if value is None:
+            violations.append(f"  {PAGE_METRICS.get(metric, metric)}: sin medición en el registro "
+                              f"(la página no terminó de cargar o el navegador no la reporta)")
+            continue
+
+        checked.append(f"{metric}={value} ms (presupuesto {limit} ms)")
+
+        if value >= limit:
+            excess = value - limit
+            violations.append(
+                f"  {PAGE_METRICS.get(metric, metric)}: {value} ms >= presupuesto {limit} ms "
+                f"(+{excess} ms, +{100.0 * excess / limit:.1f}%)\n"
+                f"    {_history_line(metric_history(record['url'], metric, label), value)}")
+
+    if violations:
+        target = f"'{label}'" if label else record['url']
+        raise AssertionError(f"Presupuesto de rendimiento excedido en {target}:\n" + '\n'.join(violations))
+
+    logger.info(f"Presupuestos de rendimiento cumplidos en {record['url']}: {', '.join(checked)}")
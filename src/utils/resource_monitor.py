@@ -0,0 +1,173 @@
+import time
+from typing import Dict, Optional
+
+from src.utils.logger import get_logger
+
+try:
+    import psutil
+except ImportError:  # psutil es opcional: sin él el monitor de recursos queda desactivado
+    psutil = None
+
+logger = get_logger(__name__)
+
+
+class ResourceMonitor:
+    """
+    Seguimiento de los procesos de cada sesión de WebDriver local (driver + navegador + renderers).
+
+    - track(driver):  registra el árbol de procesos del servicio del driver al crearlo (WebDriverFactory).
+    - sample(driver): suma RSS y tiempo de CPU del árbol y amplía el registro con los procesos nuevos
+                      (el navegador lanza renderers durante la sesión).
+    - should_recycle: True si la sesión supera max_rss_mb; after_scenario la cierra aunque sea compartida.
+    - reap(session):  mata los procesos registrados que sigan vivos tras cerrar la sesión (p. ej. si quit() falló).
+
+    Cada proceso se identifica por (pid, create_time), así un PID reutilizado por el sistema nunca se mata.
+    Las sesiones remotas (Grid) no tienen procesos locales y se ignoran.
+    """
+
+    def __init__(self, max_rss_mb: float = 1500.0):
+
+        self.max_rss_mb = max_rss_mb
+        self._processes: Dict[str, Dict[int, float]] = {}  # session_id -> {pid: create_time}
+        self._stats: Dict[str, dict] = {}
+
+    @staticmethod
+    def _service_pid(driver) -> Optional[int]:
+
+        process = getattr(getattr(driver, 'service', None), 'process', None)
+
+        return getattr(process, 'pid', None)
+
+    def _live(self, session_id: str):
+        """Procesos registrados de la sesión que siguen vivos (y son los mismos, no un PID reutilizado)."""
+
+        for pid, create_time in self._processes.get(session_id, {}).items():
+            try:
+                process = psutil.Process(pid)
+                if process.create_time() == create_time:
+                    yield process
+            except psutil.Error:
+                continue
+
+    def _register_tree(self, session_id: str, root_pid: int):
+
+        known = self._processes.setdefault(session_id, {})
+
+        try:
+            root = psutil.Process(root_pid)
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return
+
+        for process in tree:
+            try:
+                known.setdefault(process.pid, process.create_time())
+            except psutil.Error:
+                continue
+
+    def track(self, driver):
+
+        pid = self._service_pid(driver)
+
+        if pid is None or not driver.session_id:
+            return
+
+        self._register_tree(driver.session_id, pid)
+        self._stats[driver.session_id] = {'started': time.time(), 'samples': 0, 'peak_rss_mb': 0.0,
+                                          'rss_mb': 0.0, 'cpu_s': 0.0, 'processes': 0}
+
+        logger.debug(f"Sesión {driver.session_id}: {len(self._processes[driver.session_id])} procesos registrados.")
+
+    def sample(self, driver) -> Optional[dict]:
+
+        session_id = getattr(driver, 'session_id', None)
+        pid = self._service_pid(driver)
+
+        if session_id not in self._stats or pid is None:
+            return None
+
+        self._register_tree(session_id, pid)
+
+        rss = cpu = 0.0
+        count = 0
+
+        for process in self._live(session_id):
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    times = process.cpu_times()
+                    cpu += times.user + times.system
+                count += 1
+            except psutil.Error:
+                continue
+
+        stats = self._stats[session_id]
+        stats['samples'] += 1
+        stats['rss_mb'] = round(rss / (1024 * 1024), 1)
+        stats['peak_rss_mb'] = max(stats['peak_rss_mb'], stats['rss_mb'])
+        stats['cpu_s'] = round(cpu, 2)
+        stats['processes'] = count
+
+        return dict(stats)
+
+    def should_recycle(self, driver) -> bool:
+
+        stats = self._stats.get(getattr(driver, 'session_id', None))
+
+        return bool(stats and self.max_rss_mb and stats['rss_mb'] > self.max_rss_mb)
+
+    def _kill(self, session_id: str) -> int:
+
+        killed = 0
+
+        for process in self._live(session_id):
+            try:
+                process.kill()
+                killed += 1
+            except psutil.Error:
+                continue
+
+        return killed
+
+    def reap(self, session_id: str) -> int:
+        """Mata los procesos que sobrevivieron al cierre de la sesión. Retorna cuántos se terminaron."""
+
+        killed = self._kill(session_id)
+
+        if killed:
+            logger.warning(f"Sesión {session_id}: {killed} procesos huérfanos del navegador/driver terminados.")
+
+        return killed
+
+    def reap_all(self) -> int:
+        """Fin de la ejecución: reaper de todas las sesiones registradas."""
+
+        return sum(self.reap(session_id) for session_id in list(self._processes))
+
+    def summary(self) -> Dict[str, dict]:
+
+        return {session_id: dict(stats) for session_id, stats in self._stats.items()}
+
+
+# Instancia usada por WebDriverFactory y los hooks. None = desactivado (se configura desde before_all).
+
+_resource_monitor: Optional[ResourceMonitor] = None
+
+
+def configure_resource_monitor(**options) -> Optional[ResourceMonitor]:
+
+    global _resource_monitor
+
+    if psutil is None:
+        logger.warning("resource_monitor activo pero psutil no está instalado (pip install psutil). "
+                       "El monitor de recursos queda desactivado.")
+        _resource_monitor = None
+    else:
+        _resource_monitor = ResourceMonitor(**options)
+
+    return _resource_monitor
+
+
+def get_resource_monitor() -> Optional[ResourceMonitor]:
+
+    return _resource_monitor
@@ -0,0 +1,31 @@
+import os
+import uuid
+from datetime import datetime
+
+# Identificadores de la ejecución actual.
+# RUN_ID: compartido por todos los workers de una misma corrida (lo fija el proceso padre).
+# WORKER_ID: identifica el proceso worker dentro de la corrida (por defecto 'main').
+
+_DEFAULT_WORKER_ID = 'main'
+
+
+def get_run_id() -> str:
+    """
+    Retorna el identificador de la corrida actual.
+    Si no viene definido en la variable de entorno RUN_ID, se genera uno y se exporta
+    para que los procesos hijos (workers) hereden el mismo valor.
+    """
+
+    run_id = os.environ.get('RUN_ID')
+
+    if not run_id:
+        run_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        os.environ['RUN_ID'] = run_id
+
+    return run_id
+
+
+def get_worker_id() -> str:
+    """Retorna el identificador del worker actual (variable de entorno WORKER_ID, o 'main')."""
+
+    return os.environ.get('WORKER_ID', _DEFAULT_WORKER_ID).strip() or _DEFAULT_WORKER_ID
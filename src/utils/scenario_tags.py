@@ -0,0 +1,40 @@
+from typing import Optional
+
+# Los tags efectivos de behave (scenario.effective_tags) son un set: no dicen qué nivel definió cada tag.
+# Los tags con valor (@driver_scope:feature, @step_timeout:120) se resuelven recorriendo los niveles en orden
+# de precedencia explícito, del más específico al más general.
+
+
+def _tag_levels(scenario):
+    """Tags de cada nivel, del más específico al más general: escenario, outline, rule y feature."""
+
+    node = scenario
+    levels = []
+
+    while node is not None:
+        levels.append(list(getattr(node, 'tags', None) or ()))
+        node = getattr(node, 'parent', None)
+
+    feature = getattr(scenario, 'feature', None)
+
+    # Modelos sin cadena de parents (p. ej. objetos de prueba): la feature sigue siendo el último nivel
+    if feature is not None and len(levels) == 1:
+        levels.append(list(getattr(feature, 'tags', None) or ()))
+
+    return levels
+
+
+def scenario_tag_value(scenario, prefix: str) -> Optional[str]:
+    """
+    Valor del tag @<prefix><valor> que aplica al escenario, o None si ningún nivel lo define.
+
+    Gana el nivel más específico (un tag del escenario sobrescribe al de la feature); dentro de un mismo nivel,
+    el último tag escrito.
+    """
+
+    for tags in _tag_levels(scenario):
+        for tag in reversed(tags):
+            if tag.startswith(prefix):
+                return tag[len(prefix):]
+
+    return None
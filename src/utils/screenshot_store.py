@@ -0,0 +1,209 @@
+import hashlib
+import io
+import json
+import os
+import time
+from datetime import datetime
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.file_lock import FileLock
+from src.utils.logger import get_logger
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional: sin él las capturas se guardan como PNG sin recodificar
+    Image = None
+
+logger = get_logger(__name__)
+
+_SCREENSHOTS_DIR = PROJECT_ROOT / 'reports' / 'screenshots'
+
+# Formato de almacenamiento -> (formato Pillow, extensión)
+SUPPORTED_FORMATS = {
+    'png': ('PNG', 'png'),
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+
+class ScreenshotStore:
+    """
+    Almacenamiento de capturas de pantalla direccionado por contenido.
+
+    Cada captura se recodifica (WebP/JPEG con la calidad configurada, si Pillow está disponible)
+    y se guarda como blobs/<hash[:2]>/<hash>.<ext>, de modo que capturas idénticas ocupan un único
+    archivo. index.jsonl relaciona escenario, paso y nombre lógico con cada blob, y la retención
+    elimina entradas por antigüedad y por tamaño total.
+
+    put() y apply_retention() se ejecutan bajo el mismo lock de archivo (index.jsonl.lock), así la
+    retención de un worker no borra un blob que otro acaba de guardar y aún no registró en el índice.
+    """
+
+    def __init__(self, root_dir=None, image_format: str = 'webp', quality: int = 70,
+                 max_age_days: int = 7, max_total_mb: int = 500):
+
+        if image_format not in SUPPORTED_FORMATS:
+            raise ValueError(f"Formato de captura no soportado: '{image_format}'. Opciones: {list(SUPPORTED_FORMATS)}")
+
+        if image_format != 'png' and Image is None:
+            logger.warning(f"Pillow no está instalado; las capturas se guardarán como PNG en lugar de {image_format}.")
+            image_format = 'png'
+
+        self.root_dir = str(root_dir or _SCREENSHOTS_DIR)
+        self.blobs_dir = os.path.join(self.root_dir, 'blobs')
+        self.index_path = os.path.join(self.root_dir, 'index.jsonl')
+        self.lock_path = f"{self.index_path}.lock"
+        self.image_format = image_format
+        self.quality = quality
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_mb * 1024 * 1024
+
+    def _encode(self, png: bytes) -> bytes:
+
+        if self.image_format == 'png':
+            return png
+
+        pil_format, _ = SUPPORTED_FORMATS[self.image_format]
+
+        with Image.open(io.BytesIO(png)) as image:
+
+            if pil_format == 'JPEG' and image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            buffer = io.BytesIO()
+            image.save(buffer, format=pil_format, quality=self.quality)
+
+        return buffer.getvalue()
+
+    def _blob_path(self, digest: str) -> str:
+
+        _, extension = SUPPORTED_FORMATS[self.image_format]
+
+        return os.path.join(self.blobs_dir, digest[:2], f"{digest}.{extension}")
+
+    def put(self, png: bytes, name: str, scenario: str = None, step: str = None) -> str:
+        """
+        Guarda una captura (bytes PNG tal como los entrega WebDriver) y registra la entrada en el índice.
+
+        :return: Ruta del blob donde quedó almacenada la captura.
+        """
+
+        # La recodificación (lenta) ocurre fuera del lock
+        data = self._encode(png)
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+
+        entry = {
+            'ts': time.time(),
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'scenario': scenario,
+            'step': step,
+            'name': name,
+            'blob': os.path.relpath(blob_path, self.root_dir),
+            'bytes': len(data),
+        }
+
+        with FileLock(self.lock_path):
+
+            if not os.path.exists(blob_path):
+
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+                # Escritura atómica: nunca queda un blob a medio escribir con el nombre final
+                tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+
+                with open(tmp_path, 'wb') as blob_file:
+                    blob_file.write(data)
+
+                os.replace(tmp_path, blob_path)
+
+            else:
+                logger.debug(f"Captura duplicada, se reutiliza el blob existente: {blob_path}")
+
+            with open(self.index_path, 'a', encoding='utf-8') as index_file:
+                index_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+        return blob_path
+
+    def read_index(self) -> list:
+
+        if not os.path.exists(self.index_path):
+            return []
+
+        entries = []
+
+        with open(self.index_path, 'r', encoding='utf-8') as index_file:
+            for line in index_file:
+                line = line.strip()
+                if line:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"Línea inválida en el índice de capturas: {line[:120]}")
+
+        return entries
+
+    def apply_retention(self) -> dict:
+        """
+        Aplica la política de retención: descarta entradas más antiguas que max_age_days y, si el total
+        de blobs referenciados supera max_total_mb, las entradas más antiguas hasta quedar bajo el tope.
+        Los blobs que quedan sin referencias se eliminan (los .tmp de escrituras en curso se ignoran).
+
+        :return: Resumen con entradas y blobs eliminados, y bytes resultantes.
+        """
+
+        if not os.path.isdir(self.root_dir):
+            return {'removed_entries': 0, 'removed_blobs': 0, 'total_bytes': 0}  # Aún no se tomaron capturas
+
+        with FileLock(self.lock_path):
+            summary = self._apply_retention()
+
+        logger.info(f"Retención de capturas aplicada: {summary}")
+
+        return summary
+
+    def _apply_retention(self) -> dict:
+
+        entries = sorted(self.read_index(), key=lambda entry: entry.get('ts', 0))
+        initial_entries = len(entries)
+
+        if self.max_age_days:
+            min_ts = time.time() - self.max_age_days * 86400
+            entries = [entry for entry in entries if entry.get('ts', 0) >= min_ts]
+
+        def referenced_sizes(current_entries):
+            return {entry['blob']: entry.get('bytes', 0) for entry in current_entries}
+
+        sizes = referenced_sizes(entries)
+        total = sum(sizes.values())
+
+        while self.max_total_bytes and total > self.max_total_bytes and entries:
+            entries.pop(0)
+            sizes = referenced_sizes(entries)
+            total = sum(sizes.values())
+
+        removed_blobs = 0
+
+        if os.path.isdir(self.blobs_dir):
+            for dir_path, _, file_names in os.walk(self.blobs_dir):
+                for file_name in file_names:
+                    if file_name.endswith('.tmp'):
+                        continue
+                    blob_path = os.path.join(dir_path, file_name)
+                    if os.path.relpath(blob_path, self.root_dir) not in sizes:
+                        os.remove(blob_path)
+                        removed_blobs += 1
+
+        tmp_index = f"{self.index_path}.{os.getpid()}.tmp"
+
+        with open(tmp_index, 'w', encoding='utf-8') as index_file:
+            for entry in entries:
+                index_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+        os.replace(tmp_index, self.index_path)
+
+        return {
+            'removed_entries': initial_entries - len(entries),
+            'removed_blobs': removed_blobs,
+            'total_bytes': total,
+        }
@@ -1,7 +1,13 @@
+from __future__ import annotations
+
 import os
-from selenium.webdriver.remote.webdriver import WebDriver
-from datetime import datetime
+from typing import TYPE_CHECKING
 from ..utils.logger import get_logger  # Asegúrate de que esta importación sea correcta
+from ..utils.log_context import get_log_context
+from ..utils.screenshot_store import ScreenshotStore
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
 
 # Obtén una instancia de logger específica para este módulo
 
@@ -28,62 +34,79 @@ _SCREENSHOTS_DIR = os.path.join(
 
 )
 
-# Paso 3: Verificar y crear el directorio si no existe.
+# El directorio se crea bajo demanda al guardar la primera captura (ver ScreenshotStore.put),
+# no al importar este módulo.
 
-# 'exist_ok=True' es crucial para evitar errores si el directorio ya existe.
 
-if not os.path.exists(_SCREENSHOTS_DIR):
+# --- Almacenamiento de capturas ---
 
-    os.makedirs(_SCREENSHOTS_DIR, exist_ok=True)
+# Instancia del ScreenshotStore usada por take_screenshot. Se crea con valores por defecto en el
+# primer uso, o explícitamente desde before_all con configure_screenshot_store().
 
-    logger.info(f"Directorio de capturas de pantalla creado: {_SCREENSHOTS_DIR}")
+_screenshot_store = None
 
-else:
 
-    logger.info(f"Directorio de capturas de pantalla ya existe: {_SCREENSHOTS_DIR}")
+def configure_screenshot_store(**store_options) -> ScreenshotStore:
+    """
 
+    Configura el almacenamiento de capturas (formato, calidad y retención).
 
-# --- Función para Tomar Capturas de Pantalla ---
+    :param store_options: Argumentos de ScreenshotStore (image_format, quality, max_age_days, max_total_mb).
 
+    :return: La instancia de ScreenshotStore configurada.
 
-def take_screenshot(driver: WebDriver, name: str) -> str | None:
     """
 
-    Toma una captura de pantalla del estado actual del navegador.
+    global _screenshot_store
 
-    Las capturas se guardan en el directorio definido por _SCREENSHOTS_DIR.
+    _screenshot_store = ScreenshotStore(root_dir=_SCREENSHOTS_DIR, **store_options)
 
-    :param driver: La instancia de WebDriver de Selenium.
+    return _screenshot_store
 
-    :param name: Nombre base para el archivo de la captura (sin extensión).
 
-                 Se le añadirá un timestamp y la extensión .png.
+def get_screenshot_store() -> ScreenshotStore:
 
-    :return: La ruta completa del archivo de la captura si se guardó con éxito,
+    global _screenshot_store
 
-             o None en caso de error.
+    if _screenshot_store is None:
+        _screenshot_store = ScreenshotStore(root_dir=_SCREENSHOTS_DIR)
+
+    return _screenshot_store
 
+
+# --- Función para Tomar Capturas de Pantalla ---
+
+
+def take_screenshot(driver: WebDriver, name: str) -> str | None:
     """
 
-    # Genera un timestamp para asegurar un nombre de archivo único
+    Toma una captura de pantalla del estado actual del navegador.
+
+    La captura se guarda en el ScreenshotStore (direccionado por contenido, dentro de _SCREENSHOTS_DIR)
+    y queda registrada en su índice junto con el escenario y el paso en curso.
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    :param driver: La instancia de WebDriver de Selenium.
 
-    # Construye el nombre del archivo final
+    :param name: Nombre lógico de la captura (se registra en el índice).
 
-    file_name = f"{name}_{timestamp}.png"
+    :return: La ruta completa del blob si se guardó con éxito,
 
-    # Une el directorio base de capturas con el nombre del archivo
+             o None en caso de error.
 
-    file_path = os.path.join(_SCREENSHOTS_DIR, file_name)
+    """
+
+    context_fields = get_log_context()
 
     try:
 
-        # Intenta guardar la captura de pantalla
+        # Intenta obtener la captura en memoria y guardarla en el almacenamiento
+
+        png = driver.get_screenshot_as_png()
 
-        driver.save_screenshot(file_path)
+        file_path = get_screenshot_store().put(
+            png, name, scenario=context_fields.get('scenario'), step=context_fields.get('step'))
 
-        logger.info(f"Captura de pantalla guardada en: {file_path}")
+        logger.info(f"Captura de pantalla '{name}' guardada en: {file_path}")
 
         return file_path
 
@@ -91,6 +114,6 @@ def take_screenshot(driver: WebDriver, name: str) -> str | None:
 
         # Registra cualquier error que ocurra durante el proceso
 
-        logger.error(f"Error al tomar captura de pantalla en {file_path}: {e}")
+        logger.error(f"Error al tomar captura de pantalla '{name}': {e}")
 
         return None
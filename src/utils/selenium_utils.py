@@ -1,9 +1,13 @@
+from __future__ import annotations
+
+import time
+
+from typing import TYPE_CHECKING
+
 from selenium.webdriver.support.ui import WebDriverWait
 
 from selenium.webdriver.support import expected_conditions as EC
 
-from selenium.webdriver.remote.webdriver import WebDriver
-
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
 from selenium.webdriver.common.by import By  # Importar By para tipado
@@ -12,6 +16,13 @@ from ..utils.logger import logger
 
 from ..utils.screenshots import take_screenshot
 
+from ..utils.adaptive_timeouts import get_adaptive_timeouts, locator_key
+
+from ..utils.downloads import wait_for_download, file_sha256
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
 
 class SeleniumUtils:
     """
@@ -28,14 +39,88 @@ class SeleniumUtils:
 
         self.default_timeout = default_timeout
 
+        # Timeouts aprendidos por localizador (None si adaptive_timeouts está desactivado)
+
+        self.adaptive_timeouts = get_adaptive_timeouts()
+
+        # Descargas ya retornadas por wait_for_download en esta sesión (no se vuelven a reportar)
+
+        self._consumed_downloads = set()
+
         logger.info("Instancia de SeleniumUtils creada.")
 
+    def _record(self, action: str, locator: tuple[By, str] = None, element=None):
+
+        """
+        Registra la acción en el flight recorder del driver (si el modo está activo) y marca la página
+        como modificada para el NavigationManager (la próxima navegación a la misma URL no se omite).
+        """
+
+        navigation = getattr(self.driver, 'navigation', None)
+
+        if navigation is not None:
+
+            navigation.mark_dirty()
+
+        recorder = getattr(self.driver, 'flight_recorder', None)
+
+        if recorder is not None:
+
+            recorder.capture(self.driver, action, locator, element)
+
     def _wait(self, timeout: int = None) -> WebDriverWait:
 
         """Retorna una instancia de WebDriverWait."""
 
         return WebDriverWait(self.driver, timeout if timeout is not None else self.default_timeout)
 
+    def _resolve_timeout(self, condition: str, locator: tuple[By, str], timeout: int = None,
+                         fallback: float = None) -> float:
+
+        """
+
+        Timeout efectivo de una espera: el explícito si se pasó, si no el aprendido para el localizador
+
+        (ver AdaptiveTimeouts) o, sin historial, fallback / default_timeout.
+
+        """
+
+        if timeout is not None:
+
+            return timeout
+
+        fallback = self.default_timeout if fallback is None else fallback
+
+        if self.adaptive_timeouts is None:
+
+            return fallback
+
+        return self.adaptive_timeouts.timeout_for(locator_key(condition, locator), fallback)
+
+    def _until(self, condition: str, locator: tuple[By, str], timeout: float, expected_condition):
+
+        """Espera expected_condition y registra cuánto tardó en cumplirse (o el timeout, si lo agotó)."""
+
+        started = time.monotonic()
+
+        try:
+
+            result = self._wait(timeout).until(expected_condition)
+
+        except TimeoutException:
+
+            if self.adaptive_timeouts is not None:
+
+                self.adaptive_timeouts.record(locator_key(condition, locator), timeout, timed_out=True)
+
+            raise
+
+        if self.adaptive_timeouts is not None:
+
+            self.adaptive_timeouts.record(locator_key(condition, locator), time.monotonic() - started)
+
+        return result
+
     def find_element(self, locator: tuple[By, str], timeout: int = None):
 
         """
@@ -56,13 +141,13 @@ class SeleniumUtils:
 
         by_strategy, selector = locator
 
-        try:
+        timeout = self._resolve_timeout('visible', locator, timeout)
 
-            element = self._wait(timeout).until(
+        try:
 
-                EC.visibility_of_element_located((by_strategy, selector))
+            element = self._until('visible', locator, timeout,
 
-            )
+                                  EC.visibility_of_element_located((by_strategy, selector)))
 
             logger.debug(f"Elemento localizado y visible: {locator}")
 
@@ -71,7 +156,7 @@ class SeleniumUtils:
         except TimeoutException:
 
             logger.error(
-                f"Tiempo de espera excedido: Elemento no visible en {timeout if timeout is not None else self.default_timeout}s para {locator}")
+                f"Tiempo de espera excedido: Elemento no visible en {timeout}s para {locator}")
 
             take_screenshot(self.driver, f"element_not_visible_{by_strategy}_{selector}")  # Captura más específica
 
@@ -103,13 +188,13 @@ class SeleniumUtils:
 
         by_strategy, selector = locator
 
-        try:
+        timeout = self._resolve_timeout('present_all', locator, timeout)
 
-            elements = self._wait(timeout).until(
+        try:
 
-                EC.presence_of_all_elements_located((by_strategy, selector))
+            elements = self._until('present_all', locator, timeout,
 
-            )
+                                  EC.presence_of_all_elements_located((by_strategy, selector)))
 
             logger.debug(f"Elementos localizados: {locator}")
 
@@ -118,7 +203,7 @@ class SeleniumUtils:
         except TimeoutException:
 
             logger.warning(
-                f"Tiempo de espera excedido: No se encontraron elementos presentes en {timeout if timeout is not None else self.default_timeout}s para {locator}. Retornando lista vacía.")
+                f"Tiempo de espera excedido: No se encontraron elementos presentes en {timeout}s para {locator}. Retornando lista vacía.")
 
             # No tomamos captura aquí, ya que el warning indica que la ausencia podría ser esperada
 
@@ -146,22 +231,24 @@ class SeleniumUtils:
 
         by_strategy, selector = locator
 
-        try:
+        timeout = self._resolve_timeout('clickable', locator, timeout)
 
-            element = self._wait(timeout).until(
+        try:
 
-                EC.element_to_be_clickable((by_strategy, selector))
+            element = self._until('clickable', locator, timeout,
 
-            )
+                                  EC.element_to_be_clickable((by_strategy, selector)))
 
             element.click()
 
             logger.info(f"Clic realizado en el elemento: {locator}")
 
+            self._record("click", locator, element)
+
         except TimeoutException:
 
             logger.error(
-                f"Tiempo de espera excedido: Elemento no clickeable en {timeout if timeout is not None else self.default_timeout}s para {locator}")
+                f"Tiempo de espera excedido: Elemento no clickeable en {timeout}s para {locator}")
 
             take_screenshot(self.driver, f"element_not_clickable_{by_strategy}_{selector}")
 
@@ -191,13 +278,13 @@ class SeleniumUtils:
 
         by_strategy, selector = locator
 
-        try:
+        timeout = self._resolve_timeout('visible', locator, timeout)
 
-            element = self._wait(timeout).until(
+        try:
 
-                EC.visibility_of_element_located((by_strategy, selector))
+            element = self._until('visible', locator, timeout,
 
-            )
+                                  EC.visibility_of_element_located((by_strategy, selector)))
 
             element.clear()  # Limpiar el campo antes de escribir
 
@@ -205,10 +292,12 @@ class SeleniumUtils:
 
             logger.info(f"Texto ingresado en {locator}: '{text[:50]}...'")  # Loguear solo los primeros 50 caracteres
 
+            self._record("enter_text", locator, element)
+
         except TimeoutException:
 
             logger.error(
-                f"Tiempo de espera excedido: Campo de texto no visible o no interactuable en {timeout if timeout is not None else self.default_timeout}s para {locator}")
+                f"Tiempo de espera excedido: Campo de texto no visible o no interactuable en {timeout}s para {locator}")
 
             take_screenshot(self.driver, f"text_input_failed_{by_strategy}_{selector}")
 
@@ -274,13 +363,13 @@ class SeleniumUtils:
 
         by_strategy, selector = locator
 
-        try:
+        timeout = self._resolve_timeout('visible', locator, timeout)
 
-            element = self._wait(timeout).until(
+        try:
 
-                EC.visibility_of_element_located((by_strategy, selector))
+            element = self._until('visible', locator, timeout,
 
-            )
+                                  EC.visibility_of_element_located((by_strategy, selector)))
 
             logger.debug(f"Elemento {locator} es visible.")
 
@@ -289,7 +378,7 @@ class SeleniumUtils:
         except TimeoutException:
 
             logger.error(
-                f"Elemento {locator} no se hizo visible en {timeout if timeout is not None else self.default_timeout}s.")
+                f"Elemento {locator} no se hizo visible en {timeout}s.")
 
             take_screenshot(self.driver, f"element_not_visible_wait_{by_strategy}_{selector}")
 
@@ -303,7 +392,7 @@ class SeleniumUtils:
 
             raise
 
-    def is_element_present(self, locator: tuple[By, str], timeout: int = 5) -> bool:
+    def is_element_present(self, locator: tuple[By, str], timeout: int = None) -> bool:
 
         """
 
@@ -313,7 +402,9 @@ class SeleniumUtils:
 
         :param locator: Tupla (By.STRATEGY, "selector").
 
-        :param timeout: Tiempo máximo de espera en segundos.
+        :param timeout: Tiempo máximo de espera en segundos. Por defecto, el aprendido para el localizador
+
+        (una verificación de ausencia falla rápido) o 5s sin historial.
 
         :return: True si el elemento está presente, False en caso contrario.
 
@@ -323,13 +414,13 @@ class SeleniumUtils:
 
         by_strategy, selector = locator
 
-        try:
+        timeout = self._resolve_timeout('present', locator, timeout, fallback=5)
 
-            self._wait(timeout).until(
+        try:
 
-                EC.presence_of_element_located((by_strategy, selector))
+            self._until('present', locator, timeout,
 
-            )
+                        EC.presence_of_element_located((by_strategy, selector)))
 
             logger.debug(f"Elemento {locator} está presente en el DOM.")
 
@@ -348,3 +439,55 @@ class SeleniumUtils:
             take_screenshot(self.driver, f"webdriver_error_presence_{by_strategy}_{selector}")
 
             raise
+
+    def wait_for_download(self, pattern: str = None, timeout: int = None, expected_sha256: str = None):
+
+        """
+
+        Espera a que termine una descarga en la carpeta de descargas de la sesión (driver.download_dir).
+
+        Ignora los archivos parciales (.crdownload, .part) y las descargas ya retornadas en la sesión.
+
+        :param pattern: Patrón del nombre esperado (ej. '*.pdf'); None acepta cualquier archivo.
+
+        :param timeout: Tiempo máximo de espera en segundos.
+
+        :param expected_sha256: Si se indica, se verifica el SHA-256 del archivo (leído por bloques).
+
+        :return: Ruta (Path) del archivo descargado.
+
+        :raises TimeoutException: Si la descarga no termina en el tiempo.
+
+        :raises AssertionError: Si el SHA-256 no coincide.
+
+        """
+
+        download_dir = getattr(self.driver, 'download_dir', None)
+
+        if download_dir is None:
+
+            raise WebDriverException("El driver no tiene carpeta de descargas (driver.download_dir).")
+
+        timeout = timeout if timeout is not None else self.default_timeout
+
+        try:
+
+            path = wait_for_download(download_dir, pattern, timeout, ignore=self._consumed_downloads)
+
+        except TimeoutError as e:
+
+            logger.error(str(e))
+
+            raise TimeoutException(str(e)) from e
+
+        self._consumed_downloads.add(path.name)
+
+        if expected_sha256 is not None:
+
+            actual_sha256 = file_sha256(path)
+
+            if actual_sha256 != expected_sha256.lower():
+
+                raise AssertionError(f"SHA-256 de {path.name} no coincide: {actual_sha256} != {expected_sha256}")
+
+        return path
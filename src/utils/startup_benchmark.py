@@ -0,0 +1,143 @@
+"""
+Benchmark de arranque de la suite.
+
+Mide, en procesos nuevos (sin caché de imports):
+    - import_s:            tiempo de `import features.environment`.
+    - dry_run_s:           tiempo total de `behave --dry-run`.
+    - time_to_first_step_s: tiempo desde el lanzamiento de behave hasta el inicio del primer paso
+                            (lo marca before_step mediante la variable STARTUP_PROBE_FILE).
+
+Uso:
+    python -m src.utils.startup_benchmark
+    python -m src.utils.startup_benchmark --runs 5 --first-step-args features/web/orangehrm.feature
+
+Cada ejecución se agrega a reports/benchmarks/startup.jsonl para seguir la tendencia en el tiempo.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.runtime import get_run_id
+
+_RESULTS_FILE = PROJECT_ROOT / 'reports' / 'benchmarks' / 'startup.jsonl'
+
+
+def _time_command(command: List[str], runs: int) -> List[float]:
+
+    durations = []
+
+    for _ in range(runs):
+
+        started = time.perf_counter()
+        subprocess.run(command, cwd=str(PROJECT_ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       check=True)
+        durations.append(time.perf_counter() - started)
+
+    return durations
+
+
+def measure_import(runs: int) -> List[float]:
+
+    return _time_command([sys.executable, '-c', 'import features.environment'], runs)
+
+
+def measure_dry_run(runs: int) -> List[float]:
+
+    return _time_command([sys.executable, '-m', 'behave', '--dry-run', '--no-summary', '-f', 'null'], runs)
+
+
+def measure_time_to_first_step(behave_args: List[str], timeout: float) -> Optional[float]:
+    """
+    Lanza behave y espera a que before_step escriba la marca del primer paso. En cuanto aparece,
+    se detiene el proceso: no hace falta completar la ejecución para medir el arranque.
+    """
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        probe_file = os.path.join(tmp_dir, 'first_step')
+        env = dict(os.environ, STARTUP_PROBE_FILE=probe_file)
+
+        started = time.time()
+        process = subprocess.Popen([sys.executable, '-m', 'behave', '-f', 'null', *behave_args],
+                                   cwd=str(PROJECT_ROOT), env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        try:
+
+            while time.time() - started < timeout:
+
+                if os.path.exists(probe_file):
+
+                    # Se espera brevemente a que la marca termine de escribirse
+                    time.sleep(0.05)
+
+                    with open(probe_file, 'r', encoding='utf-8') as probe:
+                        return float(probe.read().strip()) - started
+
+                if process.poll() is not None:
+                    return None
+
+                time.sleep(0.02)
+
+            return None
+
+        finally:
+
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+def _summary(durations: List[float]) -> dict:
+
+    return {
+        'min_s': round(min(durations), 4),
+        'median_s': round(statistics.median(durations), 4),
+        'max_s': round(max(durations), 4),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+
+    parser = argparse.ArgumentParser(description="Benchmark de tiempo de arranque de la suite.")
+    parser.add_argument('--runs', type=int, default=5, help="Repeticiones por medición (por defecto: 5)")
+    parser.add_argument('--first-step-args', nargs='*', default=None,
+                        help="Argumentos de behave para medir el tiempo hasta el primer paso (omitir para no medirlo)")
+    parser.add_argument('--first-step-timeout', type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    result = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'run_id': get_run_id(),
+        'python': sys.version.split()[0],
+        'import': _summary(measure_import(args.runs)),
+        'dry_run': _summary(measure_dry_run(args.runs)),
+    }
+
+    if args.first_step_args is not None:
+        first_step = measure_time_to_first_step(args.first_step_args, args.first_step_timeout)
+        result['time_to_first_step_s'] = round(first_step, 4) if first_step is not None else None
+
+    os.makedirs(_RESULTS_FILE.parent, exist_ok=True)
+
+    with open(_RESULTS_FILE, 'a', encoding='utf-8') as results_file:
+        results_file.write(json.dumps(result) + '\n')
+
+    print(json.dumps(result, indent=2))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import math
+from typing import Iterable, Optional
+
+
+def percentile(values: Iterable[float], pct: float) -> Optional[float]:
+    """
+    Percentil pct (0-100) con interpolación lineal entre los dos valores más cercanos
+    (mismo criterio que numpy.percentile por defecto). Retorna None si no hay valores.
+    """
+
+    ordered = sorted(values)
+
+    if not ordered:
+        return None
+
+    if not 0 <= pct <= 100:
+        raise ValueError(f"El percentil debe estar entre 0 y 100: {pct}")
+
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+
+    if lower == upper:
+        return ordered[int(rank)]
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: Iterable[float], percentiles=(50, 90, 99)) -> dict:
+    """Resumen {'count', 'min', 'pNN'..., 'max', 'mean'} de una serie de mediciones."""
+
+    ordered = sorted(values)
+
+    if not ordered:
+        return {'count': 0}
+
+    summary = {'count': len(ordered), 'min': ordered[0]}
+
+    for pct in percentiles:
+        summary[f"p{pct:g}"] = percentile(ordered, pct)
+
+    summary['max'] = ordered[-1]
+    summary['mean'] = sum(ordered) / len(ordered)
+
+    return summary
@@ -0,0 +1,301 @@
+import os
+import re
+import signal
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Dict, Optional
+
+import requests
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.logger import get_logger
+from src.utils.scenario_tags import scenario_tag_value
+
+try:
+    import psutil
+except ImportError:  # psutil es opcional: sin él solo se termina el proceso del driver, no sus hijos
+    psutil = None
+
+logger = get_logger(__name__)
+
+_WATCHDOG_DIR = PROJECT_ROOT / 'reports' / 'watchdog'
+
+BUDGET_TAG_PREFIX = 'step_timeout:'
+
+_UNSAFE_CHARS = re.compile(r'[^\w.-]+')
+
+
+def parse_tag_budgets(spec: str) -> Dict[str, float]:
+    """Convierte 'slow:600, api:60' en {'slow': 600.0, 'api': 60.0}."""
+
+    budgets = {}
+
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        tag, _, seconds = item.partition(':')
+        budgets[tag.strip().lstrip('@')] = float(seconds)
+
+    return budgets
+
+
+def step_budget(scenario, default: float, tag_budgets: Dict[str, float]) -> float:
+    """
+    Presupuesto de un paso según los tags del escenario:
+    @step_timeout:N tiene prioridad (el del nivel más específico: escenario, rule y luego feature); si no,
+    el mayor de tag_budgets entre los tags efectivos; si no, default.
+    """
+
+    explicit = scenario_tag_value(scenario, BUDGET_TAG_PREFIX)
+
+    if explicit is not None:
+        return float(explicit)
+
+    matching = [tag_budgets[tag] for tag in scenario.effective_tags if tag in tag_budgets]
+
+    return max(matching) if matching else default
+
+
+def thread_dump() -> str:
+
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    lines = []
+
+    for thread_id, frame in sys._current_frames().items():
+        lines.append(f"--- Hilo {names.get(thread_id, '?')} ({thread_id}) ---")
+        lines.extend(line.rstrip('\n') for line in traceback.format_stack(frame))
+
+    return '\n'.join(lines)
+
+
+def _kill_local_driver(process) -> int:
+    """Mata el proceso del driver local y, con psutil, sus hijos (el navegador). Retorna los hijos terminados."""
+
+    victims = []
+
+    if psutil is not None:
+        try:
+            victims = psutil.Process(process.pid).children(recursive=True)
+        except psutil.Error:
+            victims = []
+
+    for victim in victims:
+        try:
+            victim.kill()
+        except psutil.Error:
+            pass
+
+    try:
+        os.kill(process.pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+    except OSError:
+        pass
+
+    return len(victims)
+
+
+def _delete_remote_session(executor_url: str, session_id: str):
+    """Pide al hub (Grid) eliminar la sesión con un timeout corto."""
+
+    try:
+        requests.delete(f"{executor_url.rstrip('/')}/session/{session_id}", timeout=5)
+        logger.warning(f"Watchdog: sesión remota {session_id} eliminada en {executor_url}.")
+    except requests.RequestException as e:
+        logger.warning(f"Watchdog: no se pudo eliminar la sesión remota {session_id}: {e}")
+
+
+def kill_driver_session(driver):
+    """
+    Termina la sesión de un driver colgado sin usar el propio driver (sus comandos pueden estar bloqueados):
+    - local: mata el proceso del driver (chromedriver/geckodriver) y, con psutil, el navegador que lanzó.
+    - Grid: pide al hub eliminar la sesión con un timeout corto.
+    """
+
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+
+    if process is not None:
+        children = _kill_local_driver(process)
+        logger.warning(f"Watchdog: proceso del driver {process.pid} terminado ({children} procesos hijos).")
+        return
+
+    executor_url = getattr(getattr(driver, 'command_executor', None), '_url', None)
+
+    if executor_url and driver.session_id:
+        _delete_remote_session(executor_url, driver.session_id)
+
+
+def abort_api_requests() -> int:
+    """
+    Aborta las peticiones HTTP de ApiUtils en curso (pasos @api o sin driver). Si api_utils no se importó,
+    no hay peticiones que abortar y no se importa solo para esto. Retorna las conexiones cerradas.
+    """
+
+    api_utils = sys.modules.get('src.utils.api_utils')
+
+    return api_utils.abort_requests() if api_utils is not None else 0
+
+
+def resume_api_requests():
+
+    api_utils = sys.modules.get('src.utils.api_utils')
+
+    if api_utils is not None:
+        api_utils.resume_requests()
+
+
+class StepWatchdog:
+    """
+    Hilo vigilante que aborta los pasos que exceden su presupuesto de tiempo.
+
+    before_step arma el watchdog (arm) y after_step lo desarma (disarm). Si el paso sigue corriendo al vencer
+    el presupuesto, el watchdog:
+        1. Guarda diagnósticos en reports/watchdog/: volcado de todos los hilos y, si el navegador aún
+           responde en pocos segundos, una captura.
+        2. Termina la sesión del driver y sus procesos (kill_driver_session): el comando WebDriver colgado
+           en el hilo principal falla con un error de conexión y el paso termina por su cuenta.
+        3. Aborta las peticiones de ApiUtils en curso (abort_api_requests), también en pasos sin driver:
+           la petición colgada falla con ConnectionError y no se envían otras hasta desarmar el watchdog.
+    Un paso colgado en código que no usa el driver ni ApiUtils (p. ej. un sleep o un lock) no se puede abortar:
+    solo se registran sus diagnósticos y el paso se marca como fallido cuando termina.
+    El watchdog nunca interrumpe el hilo del paso (una excepción asíncrona podría caer dentro de behave
+    o de un hook): after_step lo desarma antes que nada y marca el paso como fallido si se disparó.
+    El driver se descarta, así que el siguiente escenario recibe uno nuevo.
+    """
+
+    def __init__(self, diagnostics_dir=None, screenshot_timeout: float = 5.0):
+
+        self.diagnostics_dir = str(diagnostics_dir or _WATCHDOG_DIR)
+        self.screenshot_timeout = screenshot_timeout
+
+        self._condition = threading.Condition()
+        self._armed = None  # (deadline, descripción, presupuesto, driver, nombre del escenario)
+        self._tripped = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='step-watchdog', daemon=True)
+
+    def start(self) -> 'StepWatchdog':
+
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+        self._thread.join(timeout=5)
+
+    def arm(self, description: str, budget: float, driver=None, scenario_name: str = ''):
+
+        if not budget or budget <= 0:
+            return
+
+        with self._condition:
+            self._armed = (time.monotonic() + budget, description, budget, driver, scenario_name)
+            self._tripped = None
+            self._condition.notify()
+
+    def disarm(self) -> Optional[str]:
+        """Desarma el watchdog. Si se disparó durante el paso, retorna el detalle del disparo."""
+
+        with self._condition:
+
+            self._armed = None
+            tripped, self._tripped = self._tripped, None
+
+        if tripped:
+            resume_api_requests()
+
+        return tripped
+
+    def _run(self):
+
+        while True:
+
+            with self._condition:
+
+                while not self._stopped and (self._armed is None or self._tripped):
+                    self._condition.wait()
+
+                if self._stopped:
+                    return
+
+                deadline = self._armed[0]
+                remaining = deadline - time.monotonic()
+
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+
+                armed = self._armed
+
+            self._trip(armed)
+
+    def _trip(self, armed):
+
+        _, description, budget, driver, scenario_name = armed
+        message = f"El paso '{description}' excedió su presupuesto de {budget:g}s y fue abortado por el watchdog."
+
+        # Primero se confirma (bajo el lock) que el paso sigue armado: si terminó justo a tiempo no hay disparo
+        with self._condition:
+            if self._armed is not armed:
+                return
+            self._tripped = message
+
+        logger.error(message)
+
+        diagnostics = self._write_diagnostics(description, budget, driver, scenario_name)
+        logger.error(f"Watchdog: diagnósticos en {diagnostics}")
+
+        if driver is not None:
+            driver.watchdog_killed = True
+            kill_driver_session(driver)
+
+        aborted = abort_api_requests()
+
+        if aborted:
+            logger.warning(f"Watchdog: {aborted} peticiones HTTP en curso abortadas.")
+
+        # Si el paso se desarmó mientras tanto, disarm() pudo reanudar las peticiones antes del aborto
+        with self._condition:
+            if self._armed is not armed:
+                resume_api_requests()
+
+    def _screenshot(self, driver) -> Optional[bytes]:
+        """Intenta una captura en un hilo aparte: si el navegador también está colgado, no espera más de lo debido."""
+
+        result = {}
+
+        def capture():
+            try:
+                result['png'] = driver.get_screenshot_as_png()
+            except Exception:
+                pass
+
+        capture_thread = threading.Thread(target=capture, name='step-watchdog-screenshot', daemon=True)
+        capture_thread.start()
+        capture_thread.join(self.screenshot_timeout)
+
+        return result.get('png')
+
+    def _write_diagnostics(self, description: str, budget: float, driver, scenario_name: str) -> str:
+
+        os.makedirs(self.diagnostics_dir, exist_ok=True)
+
+        base = os.path.join(self.diagnostics_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_"
+                                                  f"{_UNSAFE_CHARS.sub('_', scenario_name)[:80]}")
+
+        with open(f"{base}.txt", 'w', encoding='utf-8') as report:
+            report.write(f"Escenario: {scenario_name}\nPaso: {description}\nPresupuesto: {budget:g}s\n")
+            report.write(f"Sesión: {getattr(driver, 'session_id', None)}\n\n")
+            report.write(thread_dump())
+
+        png = self._screenshot(driver) if driver is not None else None
+
+        if png:
+            with open(f"{base}.png", 'wb') as screenshot:
+                screenshot.write(png)
+
+        return f"{base}.txt"
@@ -0,0 +1,317 @@
+"""
+Servidor local que reemplaza a los servicios de login (auth/login, auth/logout) para ejecutar la suite
+API, el generador de carga y los benchmarks en una sola máquina, sin depender de entornos remotos.
+
+Endpoints (bajo base_path, por defecto /api):
+    POST auth/login   {"username", "password"} -> 200 {"access_token", "token_type", "expires_in"} | 401
+    POST auth/logout  Authorization: Bearer <token> -> 200 | 401
+    GET  health       -> 200
+
+Los tokens son JWT HS256 con 'exp', de modo que la caché de tokens los trata igual que los reales.
+Se validan sin estado (firma y exp); el servidor solo recuerda los revocados por logout hasta que expiran.
+La latencia (con jitter) y la inyección de errores usan un generador aleatorio con semilla: dos
+ejecuciones con la misma configuración producen la misma secuencia.
+
+Uso independiente (p. ej. como objetivo del generador de carga):
+    python -m src.utils.stub_api_server --port 5000 --latency-ms 20 --jitter-ms 5 --error-rate 0.01
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from src.utils.logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+# Usuarios conocidos: su contraseña se valida. Cualquier otro usuario con contraseña no vacía es aceptado,
+# lo que permite lanzar logins de muchos usuarios distintos sin registrarlos antes.
+DEFAULT_USERS = {'admin': 'admin123'}
+
+
+def _b64url(raw: bytes) -> str:
+
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, como los servicios reales
+
+    # Cabeceras y cuerpo se escriben por separado: sin TCP_NODELAY, Nagle + ACK retardado suman ~40 ms por respuesta
+    disable_nagle_algorithm = True
+
+    server: '_StubHTTPServer'
+
+    def log_message(self, format, *args):
+
+        logger.debug("Stub API: " + format, *args)
+
+    def _read_json(self) -> dict:
+
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        try:
+            return json.loads(raw) if raw else {}
+        except ValueError:
+            return {}
+
+    def _send_json(self, status: int, payload: dict):
+
+        body = json.dumps(payload).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method: str):
+
+        stub = self.server.stub
+        path = self.path.split('?', 1)[0]
+
+        if not path.startswith(stub.base_path):
+            return self._send_json(404, {'error': 'not_found'})
+
+        route = path[len(stub.base_path):].strip('/')
+        body = self._read_json() if method == 'POST' else {}
+
+        status, payload = stub.handle(method, route, body, self.headers.get('Authorization', ''))
+        self._send_json(status, payload)
+
+    def do_GET(self):
+
+        self._route('GET')
+
+    def do_POST(self):
+
+        self._route('POST')
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    stub: 'StubApiServer'
+
+
+class StubApiServer:
+    """
+    Servidor embebido con auth/login y auth/logout.
+
+    :param port: Puerto local (0 = puerto libre asignado por el sistema).
+    :param latency_ms / jitter_ms: Latencia simulada por petición, uniforme en [latency - jitter, latency + jitter].
+    :param error_rate: Fracción (0-1) de peticiones que responden error_status.
+    :param seed: Semilla de latencia y errores (resultados reproducibles).
+    :param token_ttl: Vigencia en segundos de los tokens emitidos.
+    :param users: Usuarios cuya contraseña se valida (por defecto DEFAULT_USERS).
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, base_path: str = '/api', latency_ms: float = 0,
+                 jitter_ms: float = 0, error_rate: float = 0.0, error_status: int = 503, seed: Optional[int] = 42,
+                 token_ttl: int = 300, users: Optional[Dict[str, str]] = None):
+
+        self.host = host
+        self.port = port
+        self.base_path = '/' + base_path.strip('/')
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_ttl = token_ttl
+        self.users = dict(DEFAULT_USERS if users is None else users)
+        self.stats = Counter()
+
+        self._random = random.Random(seed)
+        self._secret = secrets.token_bytes(32)
+        # Tokens revocados por logout (jti -> exp): los tokens se validan sin estado (firma y exp) y un
+        # revocado solo se recuerda hasta su exp, así la memoria no crece con la cantidad de logins
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[_StubHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+
+        return f"http://{self.host}:{self.port}{self.base_path}"
+
+    def start(self) -> 'StubApiServer':
+
+        self._server = _StubHTTPServer((self.host, self.port), _StubRequestHandler)
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-api-server', daemon=True)
+        self._thread.start()
+
+        logger.info(f"Servidor API local iniciado en {self.url} (latencia: {self.latency_ms}±{self.jitter_ms} ms, "
+                    f"errores: {self.error_rate:.1%})")
+
+        return self
+
+    def stop(self):
+
+        if self._server is not None:
+
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join(timeout=5)
+            self._server = None
+
+            logger.info(f"Servidor API local detenido. Peticiones atendidas: {dict(self.stats)}")
+
+    def __enter__(self):
+
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.stop()
+
+    # --- Lógica de los endpoints ---
+
+    def issue_token(self, username: str) -> str:
+
+        now = int(time.time())
+        header = _b64url(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())
+        claims = {'sub': username, 'iat': now, 'exp': now + self.token_ttl, 'jti': secrets.token_hex(8)}
+        payload = _b64url(json.dumps(claims).encode())
+        signature = _b64url(hmac.new(self._secret, f"{header}.{payload}".encode(), hashlib.sha256).digest())
+
+        return f"{header}.{payload}.{signature}"
+
+    def _token_claims(self, token: str) -> Optional[dict]:
+        """Claims de un token emitido por este servidor y aún vigente; None si la firma no coincide o expiró."""
+
+        parts = token.split('.')
+
+        if len(parts) != 3:
+            return None
+
+        expected = _b64url(hmac.new(self._secret, f"{parts[0]}.{parts[1]}".encode(), hashlib.sha256).digest())
+
+        if not hmac.compare_digest(expected, parts[2]):
+            return None
+
+        claims = json.loads(base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4)))
+
+        return claims if claims.get('exp', 0) > time.time() else None
+
+    def _simulate_network(self) -> bool:
+        """Aplica la latencia simulada y decide si la petición se responde con error. Retorna True si falla."""
+
+        with self._lock:
+            delay_ms = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            inject_error = self._random.random() < self.error_rate
+
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+        return inject_error
+
+    def handle(self, method: str, route: str, body: dict, authorization: str):
+        """Atiende una petición ya parseada y retorna (status, payload)."""
+
+        with self._lock:
+            self.stats['requests'] += 1
+
+        if method == 'GET' and route == 'health':
+            return 200, {'status': 'ok'}
+
+        if self._simulate_network():
+            with self._lock:
+                self.stats['injected_errors'] += 1
+            return self.error_status, {'error': 'injected_error'}
+
+        if method == 'POST' and route == 'auth/login':
+            return self._login(body)
+
+        if method == 'POST' and route == 'auth/logout':
+            return self._logout(authorization)
+
+        return 404, {'error': 'not_found'}
+
+    def _login(self, body: dict):
+
+        username = body.get('username')
+        password = body.get('password')
+
+        if not username or not password or (username in self.users and self.users[username] != password):
+            with self._lock:
+                self.stats['failed_logins'] += 1
+            return 401, {'error': 'invalid_credentials'}
+
+        token = self.issue_token(username)
+
+        with self._lock:
+            self.stats['logins'] += 1
+
+        return 200, {'access_token': token, 'token_type': 'Bearer', 'expires_in': self.token_ttl}
+
+    def _logout(self, authorization: str):
+
+        token = authorization[len('Bearer '):] if authorization.startswith('Bearer ') else ''
+
+        claims = self._token_claims(token)
+
+        with self._lock:
+
+            now = time.time()
+
+            # Los revocados ya expirados no hace falta recordarlos: su firma ya no valida
+            for jti in [jti for jti, exp in self._revoked.items() if exp <= now]:
+                del self._revoked[jti]
+
+            if claims is None or claims['jti'] in self._revoked:
+                return 401, {'error': 'invalid_token'}
+
+            self._revoked[claims['jti']] = claims['exp']
+            self.stats['logouts'] += 1
+
+        return 200, {'message': 'logged_out'}
+
+
+def main(argv=None) -> int:
+
+    parser = argparse.ArgumentParser(description="Servidor API local para auth/login y auth/logout.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--token-ttl', type=int, default=300)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    server = StubApiServer(host=args.host, port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate, seed=args.seed, token_ttl=args.token_ttl).start()
+
+    print(f"Servidor API local en {server.url} (Ctrl+C para detener)")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
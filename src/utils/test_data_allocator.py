@@ -0,0 +1,266 @@
+import hashlib
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.file_lock import FileLock
+from src.utils.logger import get_logger
+from src.utils.runtime import get_run_id, get_worker_id
+
+logger = get_logger(__name__)
+
+_BASE36_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+_POOLS_DIR = PROJECT_ROOT / 'src' / 'data' / 'pools'
+
+_LEASES_DIR = PROJECT_ROOT / 'reports' / 'data_pools'
+
+_WORKER_NUMBER = re.compile(r'(\d+)$')
+
+
+def to_base36(number: int, width: int = 1) -> str:
+
+    digits = ''
+
+    while number:
+        number, remainder = divmod(number, 36)
+        digits = _BASE36_DIGITS[remainder] + digits
+
+    return (digits or '0').rjust(width, '0')
+
+
+def _hash36(value: str, width: int) -> str:
+
+    return to_base36(int(hashlib.sha1(value.encode('utf-8')).hexdigest(), 16) % 36 ** width, width)
+
+
+class TestDataAllocator:
+    """
+    Genera identificadores únicos y compactos para datos de prueba, seguros entre workers paralelos.
+
+    Formato (base 36, minúsculas): <corrida:5><worker:2-3><secuencia:2+>, p. ej. 'k3f9a01004'.
+        - corrida:   hash de RUN_ID (compartido por todos los workers de la ejecución).
+        - worker:    número de WORKER_ID si termina en dígitos (gw3 -> '03'), o un hash de 3 caracteres.
+        - secuencia: contador del proceso, seguro entre hilos.
+
+    Con 10 caracteres el identificador entra en campos como el Employee Id de OrangeHRM.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, worker_id: Optional[str] = None):
+
+        worker_id = worker_id or get_worker_id()
+        worker_number = _WORKER_NUMBER.search(worker_id)
+
+        self.run_id = run_id or get_run_id()
+        self.worker_id = worker_id
+        self.prefix = _hash36(self.run_id, 5) + (
+            to_base36(int(worker_number.group(1)) % 36 ** 2, 2) if worker_number else _hash36(worker_id, 3))
+
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def next_id(self) -> str:
+
+        with self._lock:
+            sequence = next(self._sequence)
+
+        return f"{self.prefix}{to_base36(sequence, 2)}"
+
+    def unique_name(self, base: str, max_length: int = 40, separator: str = '_') -> str:
+        """
+        Retorna base + separador + identificador único, recortando base (nunca el identificador)
+        para respetar max_length (40 = largo máximo del nombre de usuario en OrangeHRM).
+        """
+
+        unique_id = self.next_id()
+        room = max_length - len(unique_id) - len(separator)
+
+        if room <= 0:
+            return unique_id[-max_length:]
+
+        return f"{base[:room]}{separator}{unique_id}"
+
+
+_allocator: Optional[TestDataAllocator] = None
+
+_allocator_lock = threading.Lock()
+
+
+def get_allocator() -> TestDataAllocator:
+    """Retorna el asignador del proceso (uno por worker)."""
+
+    global _allocator
+
+    with _allocator_lock:
+
+        if _allocator is None:
+            _allocator = TestDataAllocator()
+
+        return _allocator
+
+
+def unique_name(base: str, max_length: int = 40) -> str:
+
+    return get_allocator().unique_name(base, max_length=max_length)
+
+
+def _lease_owner() -> dict:
+    """Identifica al dueño de un préstamo: corrida, worker y proceso."""
+
+    return {'run_id': get_run_id(), 'worker': get_worker_id(), 'pid': os.getpid()}
+
+
+class AccountPool:
+    """
+    Pool de cuentas ya provisionadas que los escenarios toman y devuelven, para no crear datos en cada
+    escenario ni competir por la misma cuenta entre workers.
+
+    - Las cuentas se definen en src/data/pools/<nombre>.json (lista de objetos con al menos 'username').
+    - Los préstamos se registran en reports/data_pools/<nombre>.leases.json bajo un lock de archivo, por lo
+      que todos los workers de la máquina ven el mismo estado.
+    - Un préstamo más antiguo que lease_ttl se considera abandonado (worker caído) y la cuenta vuelve al pool.
+    - Cada préstamo guarda su dueño (corrida, worker y pid); release no libera préstamos de otro dueño.
+    """
+
+    def __init__(self, name: str, pools_dir=None, leases_dir=None, lease_ttl: float = 1800.0):
+
+        self.name = name
+        self.pool_path = os.path.join(str(pools_dir or _POOLS_DIR), f"{name}.json")
+        self.leases_path = os.path.join(str(leases_dir or _LEASES_DIR), f"{name}.leases.json")
+        self.lease_ttl = lease_ttl
+
+    def _lock(self) -> FileLock:
+
+        return FileLock(f"{self.leases_path}.lock")
+
+    def accounts(self) -> List[dict]:
+
+        try:
+            with open(self.pool_path, 'r', encoding='utf-8') as pool_file:
+                return json.load(pool_file)
+        except FileNotFoundError:
+            return []
+
+    def _read_leases(self) -> dict:
+
+        try:
+            with open(self.leases_path, 'r', encoding='utf-8') as leases_file:
+                return json.load(leases_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_leases(self, leases: dict):
+
+        tmp_path = f"{self.leases_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, 'w', encoding='utf-8') as leases_file:
+            json.dump(leases, leases_file)
+
+        os.replace(tmp_path, self.leases_path)
+
+    def provision(self, accounts: List[dict]):
+        """Agrega cuentas al pool (p. ej. creadas en bloque por API antes de la ejecución)."""
+
+        os.makedirs(os.path.dirname(self.pool_path), exist_ok=True)
+
+        with FileLock(f"{self.pool_path}.lock"):
+
+            current = self.accounts()
+            known = {account['username'] for account in current}
+            current += [account for account in accounts if account['username'] not in known]
+
+            tmp_path = f"{self.pool_path}.{os.getpid()}.tmp"
+
+            with open(tmp_path, 'w', encoding='utf-8') as pool_file:
+                json.dump(current, pool_file, indent=2, ensure_ascii=False)
+
+            os.replace(tmp_path, self.pool_path)
+
+        logger.info(f"Pool '{self.name}': {len(accounts)} cuentas provisionadas ({len(current)} en total).")
+
+    def checkout(self, timeout: float = 60.0, poll_interval: float = 0.5) -> dict:
+        """
+        Toma una cuenta libre del pool. Si todas están prestadas, espera hasta timeout segundos.
+
+        :raises TimeoutError: Si no se liberó ninguna cuenta a tiempo.
+        """
+
+        accounts = self.accounts()
+
+        if not accounts:
+            raise ValueError(f"El pool '{self.name}' no tiene cuentas definidas en {self.pool_path}")
+
+        deadline = time.monotonic() + timeout
+
+        while True:
+
+            with self._lock():
+
+                leases = self._read_leases()
+                now = time.time()
+
+                for account in accounts:
+
+                    lease = leases.get(account['username'])
+
+                    if lease is None or now - lease['ts'] > self.lease_ttl:
+
+                        leases[account['username']] = {**_lease_owner(), 'ts': now}
+                        self._write_leases(leases)
+
+                        logger.info(f"Cuenta '{account['username']}' tomada del pool '{self.name}'.")
+
+                        return dict(account)
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"No hay cuentas libres en el pool '{self.name}' después de {timeout}s")
+
+            time.sleep(poll_interval)
+
+    def release(self, account: dict) -> bool:
+        """
+        Devuelve una cuenta al pool. Solo libera el préstamo si lo tiene este proceso (corrida, worker y pid):
+        si el préstamo expiró y otro worker tomó la cuenta, no se le quita.
+
+        :return: True si se liberó el préstamo.
+        """
+
+        username = account['username']
+
+        with self._lock():
+
+            leases = self._read_leases()
+            lease = leases.get(username)
+
+            if lease is None:
+                return False
+
+            owner = _lease_owner()
+
+            if any(lease.get(key) != value for key, value in owner.items()):
+                logger.warning(f"Cuenta '{username}' del pool '{self.name}' prestada a otro worker "
+                               f"({lease.get('worker')}, pid {lease.get('pid')}); no se libera.")
+                return False
+
+            del leases[username]
+            self._write_leases(leases)
+
+        logger.info(f"Cuenta '{username}' devuelta al pool '{self.name}'.")
+
+        return True
+
+    @contextmanager
+    def lease(self, timeout: float = 60.0) -> Iterator[dict]:
+
+        account = self.checkout(timeout=timeout)
+
+        try:
+            yield account
+        finally:
+            self.release(account)
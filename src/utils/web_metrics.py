@@ -0,0 +1,274 @@
+import glob
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from src.utils.definitions import PROJECT_ROOT
+from src.utils.logger import get_logger
+from src.utils.runtime import get_run_id, get_worker_id
+from src.utils.stats import summarize
+
+try:
+    import allure
+    from allure_commons.types import AttachmentType
+except ImportError:  # allure-behave es opcional para las métricas web
+    allure = None
+    AttachmentType = None
+
+logger = get_logger(__name__)
+
+WEB_METRICS_DIR = PROJECT_ROOT / 'reports' / 'web_metrics'
+
+# Segmentos numéricos o hexadecimales largos de la ruta (ids) se agrupan: /pim/viewPersonalDetails/empNumber/:id
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-f]{16,})$', re.IGNORECASE)
+
+_SLOWEST_RESOURCES = 5
+
+# Claves que siempre trae el resultado de _COLLECT_SCRIPT
+_EXPECTED_KEYS = frozenset({'timeOrigin', 'url', 'resources', 'navigation', 'paint', 'lcp'})
+
+# Una sola llamada al navegador: Navigation Timing, paint, LCP y los Resource Timing nuevos desde la
+# llamada anterior (el buffer de recursos se vacía después de leerlo, así tampoco se llena en páginas largas).
+_COLLECT_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var round = function (value) { return Math.round(value || 0); };
+var ms = function (value) { return value ? Math.round(value) : null; };  // 0 = evento aún no ocurrido
+var result = {url: location.href, timeOrigin: performance.timeOrigin, navigation: null, paint: {}, lcp: null,
+              resources: []};
+
+var nav = performance.getEntriesByType('navigation')[0];
+if (nav) {
+    result.navigation = {ttfb_ms: ms(nav.responseStart), dom_content_loaded_ms: ms(nav.domContentLoadedEventEnd),
+                         load_ms: ms(nav.loadEventEnd), transfer_kb: Math.round((nav.transferSize || 0) / 1024)};
+}
+performance.getEntriesByType('paint').forEach(function (entry) { result.paint[entry.name] = ms(entry.startTime); });
+performance.getEntriesByType('resource').forEach(function (entry) {
+    result.resources.push({name: entry.name, type: entry.initiatorType, duration_ms: round(entry.duration),
+                           transfer_kb: Math.round((entry.transferSize || 0) / 1024)});
+});
+performance.clearResourceTimings();
+
+try {
+    var observer = new PerformanceObserver(function () {});
+    observer.observe({type: 'largest-contentful-paint', buffered: true});
+    setTimeout(function () {
+        var entries = observer.takeRecords();
+        observer.disconnect();
+        if (entries.length) { result.lcp = ms(entries[entries.length - 1].startTime); }
+        done(result);
+    }, 0);
+} catch (e) {
+    done(result);
+}
+"""
+
+
+def url_group(url: str) -> str:
+    """Agrupa URLs para los agregados: host + ruta (con los ids reemplazados por ':id'), sin query ni fragmento."""
+
+    parts = urlsplit(url or '')
+    segments = [':id' if _ID_SEGMENT.match(segment) else segment for segment in parts.path.split('/')]
+
+    return f"{parts.netloc.lower()}{'/'.join(segments).rstrip('/') or '/'}"
+
+
+class WebMetricsRecorder:
+    """
+    Acumula los registros de métricas del proceso y escribe el archivo de la corrida
+    (reports/web_metrics/<run>_<worker>.jsonl con cada registro y .summary.json con agregados por URL).
+    """
+
+    def __init__(self, output_dir=None):
+
+        self.output_dir = str(output_dir or WEB_METRICS_DIR)
+        self.records: List[dict] = []
+        self._lock = threading.Lock()
+
+        base_name = f"{get_run_id()}_{get_worker_id()}"
+        self.records_path = os.path.join(self.output_dir, f"{base_name}.jsonl")
+        self.summary_path = os.path.join(self.output_dir, f"{base_name}.summary.json")
+
+    def add(self, record: dict):
+
+        with self._lock:
+
+            self.records.append(record)
+            os.makedirs(self.output_dir, exist_ok=True)
+
+            with open(self.records_path, 'a', encoding='utf-8') as records_file:
+                records_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def aggregates(self) -> Dict[str, dict]:
+
+        series = defaultdict(lambda: defaultdict(list))
+
+        for record in self.records:
+
+            values = series[url_group(record['url'])]
+
+            if record.get('step_ms') is not None:
+                values['step_ms'].append(record['step_ms'])
+
+            for metric in ('ttfb_ms', 'dom_content_loaded_ms', 'load_ms', 'fcp_ms', 'lcp_ms'):
+                if record.get(metric) is not None:
+                    values[metric].append(record[metric])
+
+            values['resources'].append(record['resources']['count'])
+
+        return {url: {metric: summarize(samples) for metric, samples in values.items()}
+                for url, values in sorted(series.items())}
+
+    def write_summary(self) -> Optional[str]:
+
+        if not self.records:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        with open(self.summary_path, 'w', encoding='utf-8') as summary_file:
+            json.dump({'run_id': get_run_id(), 'worker': get_worker_id(), 'records': len(self.records),
+                       'by_url': self.aggregates()}, summary_file, indent=2, ensure_ascii=False)
+
+        logger.info(f"Métricas web: {len(self.records)} registros, resumen por URL en {self.summary_path}")
+
+        return self.summary_path
+
+
+class WebMetricsCollector:
+    """
+    Métricas de rendimiento del lado de la aplicación para un driver (se guarda como driver.web_metrics).
+
+    collect() lee la página con una sola llamada execute_async_script y arma un registro con:
+        - navigation/paint/LCP si el documento es nuevo desde la lectura anterior (cambió timeOrigin),
+        - los recursos descargados desde la lectura anterior (cantidad, KB transferidos y los más lentos),
+        - la duración del paso (medida por behave), si se indica.
+    last_page guarda el último registro con carga de documento, last_step el del último paso y
+    history los registros recientes de la sesión (para buscar una acción por su texto).
+    """
+
+    def __init__(self, driver, recorder: Optional[WebMetricsRecorder] = None, history_size: int = 200):
+
+        self.driver = driver
+        self.recorder = recorder
+        self.last_page: Optional[dict] = None
+        self.last_step: Optional[dict] = None
+        self.history = deque(maxlen=history_size)
+        self._time_origin = None
+
+    def collect(self, label: str, step_ms: Optional[float] = None, scenario: str = '') -> Optional[dict]:
+        """
+        Lee las métricas de la página y retorna el registro, o None si no se pudieron obtener.
+        Nunca lanza excepciones: un fallo de las métricas no debe hacer fallar el paso que se mide.
+        """
+
+        try:
+            raw = self.driver.execute_async_script(_COLLECT_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Métricas web: no se pudieron leer después de '{label}': {e}")
+            return None
+
+        # Páginas que redefinen performance/location, o drivers que no devuelven el objeto completo
+        if not isinstance(raw, dict) or not _EXPECTED_KEYS <= raw.keys():
+            logger.debug(f"Métricas web: respuesta inesperada del navegador después de '{label}': {str(raw)[:200]}")
+            return None
+
+        try:
+            record = self._record(raw, label, step_ms, scenario)
+        except Exception as e:
+            logger.debug(f"Métricas web: no se pudo registrar la lectura después de '{label}': {e}")
+            return None
+
+        return record
+
+    def _record(self, raw: dict, label: str, step_ms: Optional[float], scenario: str) -> dict:
+
+        new_document = raw['timeOrigin'] != self._time_origin
+
+        resources = raw['resources'] or []
+        slowest = sorted(resources, key=lambda entry: entry['duration_ms'], reverse=True)[:_SLOWEST_RESOURCES]
+
+        record = {
+            'ts': time.time(),
+            'scenario': scenario,
+            'label': label,
+            'url': raw['url'],
+            'new_document': new_document,
+            'step_ms': round(step_ms) if step_ms is not None else None,
+            'resources': {'count': len(resources), 'transfer_kb': sum(entry['transfer_kb'] for entry in resources),
+                          'slowest': slowest},
+        }
+
+        if new_document and raw['navigation']:
+            record.update(raw['navigation'])
+            record['fcp_ms'] = (raw['paint'] or {}).get('first-contentful-paint')
+            record['lcp_ms'] = raw['lcp']
+            self.last_page = record
+
+        # Solo se avanza el documento de referencia con una lectura válida
+        self._time_origin = raw['timeOrigin']
+
+        if step_ms is not None:
+            self.last_step = record
+
+        self.history.append(record)
+
+        if self.recorder is not None:
+            self.recorder.add(record)
+
+        if allure is not None:
+            allure.attach(json.dumps(record, indent=2, ensure_ascii=False), name=f"Métricas web: {label}",
+                          attachment_type=AttachmentType.JSON)
+
+        return record
+
+
+def metric_history(url: str, metric: str, label: Optional[str] = None, output_dir=None,
+                   max_runs: int = 20) -> List[float]:
+    """
+    Valores históricos de metric para la URL (agrupada con url_group) en las últimas max_runs corridas,
+    sin contar la actual. Con label, solo los registros de ese paso.
+    """
+
+    group = url_group(url)
+    current_run = get_run_id()
+    paths = sorted(glob.glob(os.path.join(str(output_dir or WEB_METRICS_DIR), '*.jsonl')), key=os.path.getmtime)
+    paths = [path for path in paths if not os.path.basename(path).startswith(f"{current_run}_")][-max_runs:]
+    values = []
+
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as records_file:
+            for line in records_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get(metric) is None or url_group(record.get('url')) != group:
+                    continue
+                if label is None or record.get('label') == label:
+                    values.append(record[metric])
+
+    return values
+
+
+# Recorder del proceso (None = métricas desactivadas). Se configura desde before_all.
+
+_recorder: Optional[WebMetricsRecorder] = None
+
+
+def configure_web_metrics(output_dir=None) -> WebMetricsRecorder:
+
+    global _recorder
+
+    _recorder = WebMetricsRecorder(output_dir)
+
+    return _recorder
+
+
+def get_web_metrics_recorder() -> Optional[WebMetricsRecorder]:
+
+    return _recorder
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from src.utils.test_data_allocator import AccountPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+
+    pools_dir = tmp_path / 'pools'
+    pools_dir.mkdir()
+    (pools_dir / 'admins.json').write_text(json.dumps([{'username': 'admin.1'}]), encoding='utf-8')
+
+    return AccountPool('admins', pools_dir=pools_dir, leases_dir=tmp_path, lease_ttl=0.0)
+
+
+def _leases(pool):
+
+    with open(pool.leases_path, 'r', encoding='utf-8') as leases_file:
+        return json.load(leases_file)
+
+
+def test_release_libera_el_prestamo_propio(pool):
+
+    account = pool.checkout(timeout=0)
+
+    assert pool.release(account) is True
+    assert _leases(pool) == {}
+
+
+def test_release_no_libera_el_prestamo_de_otro_worker(pool, monkeypatch):
+
+    # Préstamo expirado (lease_ttl=0) que otro worker vuelve a tomar antes de que el primero lo devuelva
+    account = pool.checkout(timeout=0)
+
+    monkeypatch.setenv('WORKER_ID', 'gw1')
+    pool.checkout(timeout=0)
+
+    monkeypatch.setenv('WORKER_ID', 'main')
+
+    assert pool.release(account) is False
+    assert _leases(pool)['admin.1']['worker'] == 'gw1'
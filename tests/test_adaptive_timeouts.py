@@ -0,0 +1,81 @@
+import json
+
+from src.utils.adaptive_timeouts import AdaptiveTimeouts
+
+
+def test_save_fusiona_las_muestras_de_varios_workers(tmp_path):
+
+    store_path = tmp_path / 'adaptive_timeouts.json'
+    first = AdaptiveTimeouts(store_path=store_path)
+    second = AdaptiveTimeouts(store_path=store_path)
+
+    first.record('visible|id=login', 0.4)
+    second.record('visible|id=login', 0.6)
+    second.record('clickable|id=save', 5.0, timed_out=True)
+
+    first.save()
+    second.save()
+
+    with open(store_path, 'r', encoding='utf-8') as store_file:
+        samples = json.load(store_file)['samples']
+
+    assert samples == {'clickable|id=save': [[5.0, 1]], 'visible|id=login': [[0.4, 0], [0.6, 0]]}
+
+    # Un save sin muestras nuevas no reescribe lo de otros workers
+    first.save()
+    assert AdaptiveTimeouts(store_path=store_path)._read_store() == {
+        'clickable|id=save': [(5.0, True)], 'visible|id=login': [(0.4, False), (0.6, False)]}
+
+
+def test_save_conserva_solo_las_ultimas_max_samples(tmp_path):
+
+    store_path = tmp_path / 'adaptive_timeouts.json'
+
+    for worker in range(3):
+        timeouts = AdaptiveTimeouts(store_path=store_path, max_samples=4)
+        timeouts.record('visible|id=login', worker + 0.1)
+        timeouts.record('visible|id=login', worker + 0.2)
+        timeouts.save()
+
+    stored = AdaptiveTimeouts(store_path=store_path)._read_store()
+
+    assert [seconds for seconds, _ in stored['visible|id=login']] == [1.1, 1.2, 2.1, 2.2]
+
+
+def test_timeout_agotado_es_piso_del_timeout_aprendido_sin_superar_el_default(tmp_path):
+
+    timeouts = AdaptiveTimeouts(store_path=tmp_path / 'adaptive_timeouts.json', min_samples=3)
+
+    for _ in range(5):
+        timeouts.record('visible|id=login', 0.2)
+
+    assert timeouts.timeout_for('visible|id=login', default=10) == 1.0
+
+    timeouts.record('visible|id=login', 4.0, timed_out=True)
+
+    assert timeouts.timeout_for('visible|id=login', default=10) == 4.0
+    assert timeouts.timeout_for('visible|id=login', default=3) == 3.0
+
+
+def test_verificaciones_de_ausencia_repetidas_no_alargan_el_timeout(tmp_path):
+
+    timeouts = AdaptiveTimeouts(store_path=tmp_path / 'adaptive_timeouts.json')
+    key = 'present|id=toast'
+
+    # Como SeleniumUtils.is_element_present: el elemento nunca aparece y cada espera agota su timeout
+    for _ in range(20):
+        timeouts.record(key, timeouts.timeout_for(key, default=5), timed_out=True)
+
+    assert timeouts.timeout_for(key, default=5) == 5
+
+    # Con historial de apariciones rápidas, el timeout aprendido (corto) tampoco crece con las ausencias
+    key = 'present|id=dialog'
+
+    for _ in range(5):
+        timeouts.record(key, 0.2)
+
+    assert timeouts.timeout_for(key, default=5) == 1.0
+
+    for _ in range(20):
+        timeouts.record(key, timeouts.timeout_for(key, default=5), timed_out=True)
+        assert timeouts.timeout_for(key, default=5) == 1.0
@@ -0,0 +1,139 @@
+import time
+from datetime import timedelta
+
+import pytest
+import requests
+
+from src.actions.api.login.api_login_actions import LoginActions
+from src.actions.api.login.token_cache import jwt_expiry
+from src.utils import api_cassette
+from src.utils.api_cassette import Cassette, CassetteMissError, request_fingerprint
+from src.utils.stub_api_server import StubApiServer
+
+
+def _response(status: int, text: str) -> requests.Response:
+
+    response = requests.Response()
+    response.status_code = status
+    response.reason = 'OK' if status == 200 else 'Unauthorized'
+    response.headers['Content-Type'] = 'application/json'
+    response.headers['Date'] = 'Mon, 19 Oct 2026 10:00:00 GMT'
+    response._content = text.encode('utf-8')
+    response.elapsed = timedelta(milliseconds=120)
+
+    return response
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+
+    yield str(tmp_path / 'login' / 'escenario.json.gz')
+
+    api_cassette.deactivate_cassette()
+
+
+def test_huella_ignora_host_orden_de_query_y_orden_de_claves_json():
+
+    first = request_fingerprint('post', 'https://qa.example.com/api/auth/login/?b=2&a=1',
+                                json_data={'username': 'admin', 'password': 'x'})
+    second = request_fingerprint('POST', 'http://localhost:5000/api/auth/login', params={'a': '1', 'b': '2'},
+                                 json_data={'password': 'x', 'username': 'admin'})
+
+    assert first == second
+    assert first.startswith('POST /api/auth/login?a=1&b=2 #')
+
+
+def test_huella_distingue_el_cuerpo_sin_guardarlo():
+
+    valid = request_fingerprint('POST', '/api/auth/login', json_data={'username': 'admin', 'password': 'admin123'})
+    invalid = request_fingerprint('POST', '/api/auth/login', json_data={'username': 'admin', 'password': 'otra'})
+
+    assert valid != invalid
+    assert 'admin123' not in valid
+
+
+def test_grabacion_y_reproduccion_en_orden(cassette_path):
+
+    fingerprint = request_fingerprint('POST', '/api/auth/login', json_data={'username': 'admin'})
+
+    recorder = Cassette(cassette_path, 'record')
+    recorder.record(fingerprint, _response(401, '{"error": "invalid_credentials"}'))
+    recorder.record(fingerprint, _response(200, '{"access_token": "t"}'))
+    recorder.save()
+
+    player = Cassette(cassette_path, 'replay')
+    statuses = [player.replay(fingerprint, 'POST', 'http://localhost/api/auth/login').status_code for _ in range(3)]
+
+    # Se sirven en el orden grabado y la última se repite
+    assert statuses == [401, 200, 200]
+
+    response = player.replay(fingerprint, 'POST', 'http://localhost/api/auth/login')
+    assert response.json() == {'access_token': 't'}
+    assert 'Date' not in response.headers
+    assert response.elapsed == timedelta(milliseconds=120)
+
+
+def test_peticion_no_grabada_es_un_miss(cassette_path):
+
+    api_cassette.activate_cassette(cassette_path, 'replay')
+    cassette = api_cassette.get_active_cassette()
+
+    with pytest.raises(CassetteMissError):
+        cassette.replay('GET /api/health #0', 'GET', 'http://localhost/api/health')
+
+    api_cassette.deactivate_cassette()
+
+    assert api_cassette.get_cassette_misses()[cassette_path] == ['GET /api/health #0']
+
+
+def test_token_grabado_ya_expirado_se_valida_contra_la_hora_de_grabacion(cassette_path, monkeypatch):
+
+    fingerprint = request_fingerprint('POST', '/api/auth/login', json_data={'username': 'admin'})
+    recorded_at = time.time() - 7200
+
+    # Grabación de hace dos horas: el token (vigencia 60 s) ya expiró al reproducirlo
+    with monkeypatch.context() as patch:
+        patch.setattr(time, 'time', lambda: recorded_at)
+        token = StubApiServer(token_ttl=60).issue_token('admin')
+        api_cassette.activate_cassette(cassette_path, 'record')
+        api_cassette.get_active_cassette().record(fingerprint, _response(200, f'{{"access_token": "{token}"}}'))
+        api_cassette.deactivate_cassette()
+
+    api_cassette.activate_cassette(cassette_path, 'replay')
+    response = api_cassette.get_active_cassette().replay(fingerprint, 'POST', 'http://localhost/api/auth/login')
+    expiry = jwt_expiry(response.json()['access_token'])
+
+    assert expiry < time.time()
+    assert api_cassette.reference_time() == pytest.approx(recorded_at, abs=0.01)
+    assert api_cassette.reference_time() < expiry
+
+
+def test_sin_cassette_de_replay_la_referencia_es_la_hora_actual(cassette_path):
+
+    api_cassette.activate_cassette(cassette_path, 'record')
+
+    assert abs(api_cassette.reference_time() - time.time()) < 1
+
+
+def test_login_reproducido_desde_el_cassette_con_el_token_ya_expirado(cassette_path, monkeypatch):
+
+    with StubApiServer(token_ttl=60, users={'cassette.user': 'Cassette1!'}) as stub:
+        api_cassette.activate_cassette(cassette_path, 'record')
+        recorded = LoginActions(env='default', base_url=stub.url).get_auth_token('cassette.user', 'Cassette1!',
+                                                                                 force_refresh=True)
+        api_cassette.deactivate_cassette()
+
+    assert recorded
+
+    # Dos minutos después el token grabado ya expiró y el servidor ya no existe: solo responde el cassette
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 120)
+    api_cassette.activate_cassette(cassette_path, 'replay')
+
+    replayed = LoginActions(env='default', base_url=stub.url).get_auth_token('cassette.user', 'Cassette1!',
+                                                                             force_refresh=True)
+
+    assert replayed == recorded
+    assert jwt_expiry(replayed) < time.time()
+    assert jwt_expiry(replayed) > api_cassette.reference_time()
+    assert api_cassette.get_active_cassette().misses == []
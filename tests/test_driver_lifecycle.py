@@ -0,0 +1,59 @@
+from behave.parser import parse_feature
+
+from src.config.driver_lifecycle import driver_scope_for
+
+_FEATURE = '''
+@driver_scope:feature
+Feature: Alcance del navegador
+
+  Scenario: Hereda el alcance de la feature
+    Given un paso
+
+  @driver_scope:scenario
+  Scenario: Sobrescribe el alcance de la feature
+    Given un paso
+
+  @driver_scope:worker
+  Rule: Regla con su propio alcance
+
+    Scenario: Hereda el alcance de la regla
+      Given un paso
+
+    @driver_scope:scenario
+    Scenario Outline: Sobrescribe el alcance de la regla <caso>
+      Given un paso
+
+      Examples:
+        | caso |
+        | 1    |
+'''
+
+
+def _scopes(text: str) -> dict:
+
+    return {scenario.name: driver_scope_for(scenario) for scenario in parse_feature(text).walk_scenarios()}
+
+
+def test_el_tag_mas_especifico_gana_sin_depender_del_orden_de_los_tags_efectivos():
+
+    assert _scopes(_FEATURE) == {
+        'Hereda el alcance de la feature': 'feature',
+        'Sobrescribe el alcance de la feature': 'scenario',
+        'Hereda el alcance de la regla': 'worker',
+        'Sobrescribe el alcance de la regla 1 -- @1.1 ': 'scenario',
+    }
+
+
+def test_sin_tags_se_usa_el_default_y_un_valor_invalido_vuelve_a_scenario():
+
+    scopes = _scopes('''
+Feature: Sin tags
+  Scenario: Por defecto
+    Given un paso
+
+  @driver_scope:global
+  Scenario: Inválido
+    Given un paso
+''')
+
+    assert scopes == {'Por defecto': 'scenario', 'Inválido': 'scenario'}
@@ -0,0 +1,118 @@
+import logging
+import queue
+import threading
+import time
+
+import pytest
+
+from src.utils.log_context import lazy
+from src.utils.log_handlers import BoundedQueueHandler, BoundedQueueListener
+
+
+def _record(message: str, *args) -> logging.LogRecord:
+
+    return logging.LogRecord('prueba', logging.INFO, __file__, 1, message, args, None)
+
+
+def _messages(log_queue: queue.Queue) -> list:
+
+    messages = []
+
+    while not log_queue.empty():
+        messages.append(log_queue.get_nowait().getMessage())
+
+    return messages
+
+
+def test_politica_desconocida_es_un_error():
+
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(maxsize=1), overflow_policy='drop_all')
+
+
+def test_drop_new_descarta_los_registros_que_no_caben():
+
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, overflow_policy='drop_new')
+
+    for index in range(5):
+        handler.handle(_record(f"mensaje {index}"))
+
+    assert handler.dropped == 3
+    assert _messages(log_queue) == ['mensaje 0', 'mensaje 1']
+
+
+def test_drop_oldest_conserva_los_registros_mas_recientes():
+
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, overflow_policy='drop_oldest')
+
+    for index in range(5):
+        handler.handle(_record(f"mensaje {index}"))
+
+    assert handler.dropped == 3
+    assert _messages(log_queue) == ['mensaje 3', 'mensaje 4']
+
+
+def test_block_espera_espacio_y_descarta_al_agotar_el_timeout():
+
+    log_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, overflow_policy='block', block_timeout=0.2)
+    handler.handle(_record('mensaje 0'))
+
+    # Sin consumidor: espera block_timeout y descarta
+    started = time.monotonic()
+    handler.handle(_record('mensaje 1'))
+    assert time.monotonic() - started >= 0.2
+    assert handler.dropped == 1
+
+    # Con un consumidor que libera espacio a tiempo, el registro se encola
+    threading.Timer(0.05, log_queue.get_nowait).start()
+    handler.block_timeout = 2
+    handler.handle(_record('mensaje 2'))
+
+    assert handler.dropped == 1
+    assert _messages(log_queue) == ['mensaje 2']
+
+
+def test_el_mensaje_se_resuelve_al_encolar():
+
+    log_queue = queue.Queue(maxsize=10)
+    handler = BoundedQueueHandler(log_queue, overflow_policy='drop_new')
+    payload = {'estado': 'inicial'}
+
+    handler.handle(_record('payload: %s', payload))
+    payload['estado'] = 'modificado'
+
+    assert _messages(log_queue) == ["payload: {'estado': 'inicial'}"]
+
+
+def test_los_payloads_lazy_tambien_se_resuelven_al_encolar():
+
+    log_queue = queue.Queue(maxsize=10)
+    handler = BoundedQueueHandler(log_queue, overflow_policy='drop_new')
+    payload = {'estado': 'inicial'}
+
+    handler.handle(_record('payload: %s / %s', lazy(payload), lazy(lambda: payload['estado'])))
+    payload['estado'] = 'modificado'
+
+    assert _messages(log_queue) == ["payload: {'estado': 'inicial'} / inicial"]
+
+
+def test_listener_se_detiene_con_la_cola_llena():
+
+    log_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, overflow_policy='drop_new')
+    received = []
+    target = logging.Handler()
+    target.emit = lambda record: received.append(record.getMessage())
+
+    listener = BoundedQueueListener(log_queue, target)
+    listener.start()
+
+    for index in range(20):
+        handler.handle(_record(f"mensaje {index}"))
+
+    listener.stop()
+
+    assert len(received) + handler.dropped == 20
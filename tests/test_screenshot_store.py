@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.file_lock import FileLock
+from src.utils.screenshot_store import ScreenshotStore
+
+
+def _store(tmp_path, **options) -> ScreenshotStore:
+
+    return ScreenshotStore(root_dir=tmp_path / 'screenshots', image_format='png', **options)
+
+
+def test_capturas_identicas_comparten_blob(tmp_path):
+
+    store = _store(tmp_path)
+
+    first = store.put(b'captura', 'inicio', scenario='Login')
+    second = store.put(b'captura', 'fin', scenario='Login')
+
+    assert first == second
+    assert [entry['name'] for entry in store.read_index()] == ['inicio', 'fin']
+
+
+def test_retencion_por_tamano_descarta_las_entradas_mas_antiguas(tmp_path):
+
+    store = _store(tmp_path, max_total_mb=1)
+    old_blob = store.put(b'a' * 700 * 1024, 'antigua')
+    new_blob = store.put(b'b' * 700 * 1024, 'reciente')
+
+    summary = store.apply_retention()
+
+    assert summary['removed_entries'] == 1 and summary['removed_blobs'] == 1
+    assert not os.path.exists(old_blob) and os.path.exists(new_blob)
+    assert [entry['name'] for entry in store.read_index()] == ['reciente']
+
+
+def test_retencion_espera_el_lock_del_indice(tmp_path):
+
+    store = _store(tmp_path, max_age_days=0, max_total_mb=0)
+    store.put(b'captura', 'inicio')
+    finished = threading.Event()
+
+    with FileLock(store.lock_path):
+        worker = threading.Thread(target=lambda: (store.apply_retention(), finished.set()))
+        worker.start()
+        time.sleep(0.2)
+        assert not finished.is_set()
+
+    worker.join(5)
+    assert finished.is_set()
+
+
+def test_puts_concurrentes_con_retencion_no_pierden_blobs_registrados(tmp_path):
+
+    store = _store(tmp_path, max_age_days=1, max_total_mb=100)
+
+    def put(index):
+        store.put(f"captura {index}".encode(), f"paso {index}")
+        if index % 5 == 0:
+            store.apply_retention()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(put, range(40)))
+
+    entries = store.read_index()
+
+    assert len(entries) == 40
+    assert all(os.path.exists(os.path.join(store.root_dir, entry['blob'])) for entry in entries)
@@ -0,0 +1,98 @@
+import socket
+import threading
+import time
+
+import pytest
+import requests
+from behave.parser import parse_feature
+
+from src.utils.api_utils import get_pooled_session
+from src.utils.step_watchdog import StepWatchdog, parse_tag_budgets, step_budget
+
+_FEATURE = '''
+@step_timeout:300 @slow
+Feature: Presupuestos de pasos
+
+  Scenario: Hereda el presupuesto de la feature
+    Given un paso
+
+  @step_timeout:30
+  Scenario: Sobrescribe el presupuesto de la feature
+    Given un paso
+'''
+
+
+def test_parse_tag_budgets():
+
+    assert parse_tag_budgets('slow:600, @api:60,') == {'slow': 600.0, 'api': 60.0}
+
+
+def test_step_timeout_del_escenario_tiene_prioridad_sobre_el_de_la_feature():
+
+    budgets = {scenario.name: step_budget(scenario, 0, {'slow': 900})
+               for scenario in parse_feature(_FEATURE).walk_scenarios()}
+
+    assert budgets == {'Hereda el presupuesto de la feature': 300.0,
+                       'Sobrescribe el presupuesto de la feature': 30.0}
+
+
+def test_sin_step_timeout_se_usa_el_mayor_presupuesto_por_tag_o_el_default():
+
+    scenario_with_tags, scenario_without_tags = parse_feature('''
+@slow
+Feature: Presupuestos por tag
+  @api
+  Scenario: Con tags
+    Given un paso
+
+  Scenario: Sin tags configurados
+    Given un paso
+''').walk_scenarios()
+
+    assert step_budget(scenario_with_tags, 10, {'slow': 900, 'api': 60}) == 900
+    assert step_budget(scenario_without_tags, 10, {'api': 60}) == 10
+
+
+def test_watchdog_aborta_una_peticion_api_colgada(tmp_path):
+
+    # Servidor que acepta la conexión y nunca responde
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    accepted = []
+    threading.Thread(target=lambda: accepted.append(server.accept()), daemon=True).start()
+
+    url = f"http://127.0.0.1:{server.getsockname()[1]}/"
+    session = get_pooled_session(url, max_retries=3)
+    watchdog = StepWatchdog(diagnostics_dir=tmp_path).start()
+
+    try:
+        watchdog.arm('When la API no responde', 0.3, scenario_name='API colgada')
+        started = time.monotonic()
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            session.get(url, timeout=30)
+
+        assert time.monotonic() - started < 10
+        assert 'excedió su presupuesto' in watchdog.disarm()
+
+        # Después de desarmar, las peticiones vuelven a enviarse (y agotan su propio timeout)
+        with pytest.raises(requests.exceptions.ConnectionError, match='Read timed out'):
+            get_pooled_session(url, max_retries=0).get(url, timeout=0.2)
+    finally:
+        watchdog.stop()
+        server.close()
+
+
+def test_paso_que_termina_a_tiempo_no_deja_diagnosticos(tmp_path):
+
+    watchdog = StepWatchdog(diagnostics_dir=tmp_path).start()
+
+    try:
+        for _ in range(20):
+            watchdog.arm('When un paso rápido', 0.05, scenario_name='Rápido')
+            assert watchdog.disarm() is None
+    finally:
+        watchdog.stop()
+
+    assert list(tmp_path.iterdir()) == []
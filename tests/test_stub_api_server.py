@@ -0,0 +1,77 @@
+import time
+
+import requests
+
+from src.utils.stub_api_server import StubApiServer
+
+
+def _login(server: StubApiServer, username: str = 'admin') -> str:
+
+    status, payload = server.handle('POST', 'auth/login', {'username': username, 'password': 'admin123'}, '')
+    assert status == 200
+
+    return payload['access_token']
+
+
+def test_login_no_guarda_estado_por_token():
+
+    server = StubApiServer()
+
+    for _ in range(100):
+        _login(server)
+
+    assert server.stats['logins'] == 100
+    assert server._revoked == {}
+
+
+def test_logout_revoca_el_token_una_sola_vez():
+
+    server = StubApiServer()
+    token = _login(server)
+    other = _login(server)
+
+    assert server.handle('POST', 'auth/logout', {}, f"Bearer {token}")[0] == 200
+    assert server.handle('POST', 'auth/logout', {}, f"Bearer {token}")[0] == 401
+    assert server.handle('POST', 'auth/logout', {}, f"Bearer {other}")[0] == 200
+
+
+def test_logout_rechaza_tokens_ajenos_o_expirados(monkeypatch):
+
+    server = StubApiServer(token_ttl=60)
+    foreign = StubApiServer().issue_token('admin')
+
+    assert server.handle('POST', 'auth/logout', {}, f"Bearer {foreign}")[0] == 401
+    assert server.handle('POST', 'auth/logout', {}, 'Bearer no-es-un-jwt')[0] == 401
+
+    token = _login(server)
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 120)
+
+    assert server.handle('POST', 'auth/logout', {}, f"Bearer {token}")[0] == 401
+
+
+def test_revocados_expirados_se_descartan(monkeypatch):
+
+    server = StubApiServer(token_ttl=60)
+    revoked = _login(server)
+    server.handle('POST', 'auth/logout', {}, f"Bearer {revoked}")
+    revoked_jti = server._token_claims(revoked)['jti']
+    assert list(server._revoked) == [revoked_jti]
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 120)
+    server.handle('POST', 'auth/logout', {}, f"Bearer {_login(server)}")
+
+    # Solo queda el revocado vigente
+    assert len(server._revoked) == 1 and revoked_jti not in server._revoked
+
+
+def test_servidor_http():
+
+    with StubApiServer() as server:
+        response = requests.post(f"{server.url}/auth/login", json={'username': 'admin', 'password': 'admin123'},
+                                 timeout=5)
+        token = response.json()['access_token']
+        logout = requests.post(f"{server.url}/auth/logout", headers={'Authorization': f"Bearer {token}"}, timeout=5)
+
+    assert response.status_code == 200 and logout.status_code == 200
@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.actions.api.login import token_cache
+from src.actions.api.login.token_cache import TokenCache, credential_fingerprint, get_token_cache
+
+_QA_URL = 'http://qa.local/api/'
+
+
+def _slow_fetch(calls, token, delay=0.2):
+    """fetch que tarda delay segundos y cuenta sus llamadas, para forzar logins concurrentes."""
+
+    lock = threading.Lock()
+
+    def fetch():
+        with lock:
+            calls.append(token)
+        time.sleep(delay)
+        return token
+
+    return fetch
+
+
+def test_logins_concurrentes_con_la_misma_credencial_hacen_una_sola_peticion():
+
+    cache = TokenCache()
+    calls = []
+    fetch = _slow_fetch(calls, 'token-a')
+    credential = credential_fingerprint('admin', 'admin123')
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        tokens = list(executor.map(lambda _: cache.get_or_fetch('qa', 'admin', fetch, credential=credential),
+                                   range(5)))
+
+    assert tokens == ['token-a'] * 5
+    assert calls == ['token-a']
+
+
+def test_login_en_espera_con_otra_credencial_no_recibe_el_token_en_curso():
+
+    cache = TokenCache()
+    calls = []
+    good = credential_fingerprint('admin', 'admin123')
+    bad = credential_fingerprint('admin', 'incorrecta')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        valid = executor.submit(cache.get_or_fetch, 'qa', 'admin', _slow_fetch(calls, 'token-valido'),
+                                credential=good)
+        time.sleep(0.05)  # El login válido ya está en curso
+        invalid = executor.submit(cache.get_or_fetch, 'qa', 'admin', _slow_fetch(calls, None, delay=0),
+                                  credential=bad)
+
+        assert valid.result() == 'token-valido'
+        assert invalid.result() is None
+
+    assert calls == ['token-valido', None]
+
+
+def test_token_en_cache_solo_se_reutiliza_con_la_misma_credencial():
+
+    cache = TokenCache()
+    calls = []
+    cache.get_or_fetch('qa', 'admin', _slow_fetch(calls, 'token-a', delay=0), credential='c1')
+
+    assert cache.get_or_fetch('qa', 'admin', _slow_fetch(calls, 'token-b', delay=0), credential='c1') == 'token-a'
+    assert cache.get_or_fetch('qa', 'admin', _slow_fetch(calls, 'token-b', delay=0), credential='c2') == 'token-b'
+    assert calls == ['token-a', 'token-b']
+
+
+def test_error_del_login_se_propaga_a_los_que_esperan():
+
+    cache = TokenCache()
+    started = threading.Event()
+
+    def failing_fetch():
+        started.set()
+        time.sleep(0.1)
+        raise ConnectionError('sin red')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        owner = executor.submit(cache.get_or_fetch, 'qa', 'admin', failing_fetch)
+        started.wait()
+        waiter = executor.submit(cache.get_or_fetch, 'qa', 'admin', failing_fetch)
+
+        with pytest.raises(ConnectionError):
+            owner.result()
+        with pytest.raises(ConnectionError):
+            waiter.result()
+
+
+def test_store_compartido_fusiona_las_entradas_de_varias_caches(tmp_path):
+
+    store_path = str(tmp_path / 'tokens.json')
+    first = TokenCache(store_path=store_path)
+    second = TokenCache(store_path=store_path)
+
+    first.get_or_fetch('qa', 'admin', lambda: 'token-admin', base_url=_QA_URL)
+    second.get_or_fetch('qa', 'ess', lambda: 'token-ess', base_url=_QA_URL)
+
+    with open(store_path, 'r', encoding='utf-8') as store_file:
+        stored = json.load(store_file)
+
+    assert {key: entry['token'] for key, entry in stored.items()} == {
+        'qa|http://qa.local/api|admin': 'token-admin',
+        'qa|http://qa.local/api|ess': 'token-ess',
+    }
+
+    # Otro worker reutiliza el token del store sin hacer login
+    third = TokenCache(store_path=store_path)
+    assert third.get_or_fetch('qa', 'admin', lambda: pytest.fail('no debería hacer login'),
+                              base_url=_QA_URL) == 'token-admin'
+
+    first.evict_token('token-admin')
+
+    with open(store_path, 'r', encoding='utf-8') as store_file:
+        assert list(json.load(store_file)) == ['qa|http://qa.local/api|ess']
+
+
+def test_el_mismo_usuario_en_otra_url_base_no_reutiliza_el_token():
+
+    cache = TokenCache()
+
+    assert cache.get_or_fetch('qa', 'admin', lambda: 'token-qa', base_url=_QA_URL) == 'token-qa'
+    assert cache.get_or_fetch('qa', 'admin', lambda: 'token-stub', base_url='http://127.0.0.1:5000/') == 'token-stub'
+    assert cache.get_or_fetch('qa', 'admin', lambda: pytest.fail('no debería hacer login'),
+                              base_url=_QA_URL) == 'token-qa'
+
+
+def test_get_token_cache_rechaza_parametros_distintos_a_los_de_la_cache_existente(monkeypatch):
+
+    monkeypatch.setattr(token_cache, '_token_cache', None)
+
+    cache = get_token_cache(default_ttl=300, refresh_margin=30)
+
+    assert get_token_cache(default_ttl=300, refresh_margin=30, store_path='') is cache
+
+    with pytest.raises(ValueError, match='ya está configurada'):
+        get_token_cache(default_ttl=60, refresh_margin=30)